@@ -1,103 +1,67 @@
-import json
 import frappe
-from frappe.utils import getdate
+from frappe.utils import getdate, add_days
 
 @frappe.whitelist()
 def get_update_item_orders(from_date, to_date, order_id=None):
     """ 
         Fetch orders where workflow_state changed to 'Update Item'
-        within given date range (based on Version creation date)
+        within given date range (first transition per order, from Order Workflow Transition)
     """
 
-    from_date = getdate(from_date)
-    to_date = getdate(to_date)
-    target_state = "Update Item"
-
-    result = []
-    processed_orders = set()
-
     conditions = """
-        ref_doctype = 'Order'
-        AND DATE(creation) BETWEEN %(from_date)s AND %(to_date)s
+        t.to_state = %(target_state)s
+        AND t.transition_time >= %(from_date)s
+        AND t.transition_time < %(to_date)s
+        AND o.workflow_type = 'CAD'
+        AND o.bom_or_cad = 'CAD'
+        AND o.company = 'Gurukrupa Export Private Limited'
     """
 
     params = {
-        "from_date": from_date,
-        "to_date": to_date
+        "target_state": "Update Item",
+        "from_date": getdate(from_date),
+        "to_date": add_days(getdate(to_date), 1),
     }
 
     if order_id:
-        conditions += " AND docname = %(order_id)s"
+        conditions += " AND t.order = %(order_id)s"
         params["order_id"] = order_id
 
-    versions = frappe.db.sql(f"""
+    transitions = frappe.db.sql(f"""
         SELECT
-            name, docname, data, creation
-        FROM `tabVersion`
+            t.name, t.order, t.version, t.transition_time,
+            o.modified, o.bom_or_cad, o.workflow_type, o.company,
+            o.design_type, o.category, o.subcategory, o.setting_type, o.order_type
+        FROM `tabOrder Workflow Transition` t
+        JOIN `tabOrder` o ON o.name = t.order
         WHERE {conditions}
-        ORDER BY creation ASC
+        ORDER BY t.transition_time ASC
     """, params, as_dict=True)
 
-    if not versions:
-        return []
-
-    order_names = list({v.docname for v in versions if v.docname})
-
-    orders = frappe.db.get_all(
-        "Order",
-        filters={
-            "name": ["in", order_names],
-            "workflow_type": "CAD",
-            "bom_or_cad": "CAD",
-            "company": "Gurukrupa Export Private Limited"
-        },
-        fields=[
-            "name", "modified", "bom_or_cad", "workflow_type", "company",
-            "design_type","category","subcategory","setting_type","order_type"
-        ]
-    )
-
-    order_map = {o.name: o for o in orders}
- 
-    # 5️⃣ Cross-check workflow change
-    for v in versions:
-        if not v.data or v.docname not in order_map:
-            continue
-        
-        if v.docname in processed_orders:
-            continue
+    result = []
+    processed_orders = set()
 
-        try:
-            data = json.loads(v.data)
-        except Exception:
+    for t in transitions:
+        if t.order in processed_orders:
             continue
 
-        for change in data.get("changed", []):
-            if len(change) < 3:
-                continue
-
-            field, old, new = change
-
-            if field == "workflow_state" and new == target_state:
-                order = order_map[v.docname]
-
-                result.append({
-                    "order_id": order.name,
-                    "order_modified_date": order.modified.date(),
-                    "bom_or_cad": order.bom_or_cad,
-                    "workflow_type": order.workflow_type,
-                    "company": order.company,
-                    "design_type": order.design_type,
-                    "category": order.category,
-                    "subcategory": order.subcategory,
-                    "setting_type": order.setting_type,
-                    "order_type": order.order_type,
-                    "version_id": v.name,
-                    "version_creation_date": v.creation
-                })
-
-                processed_orders.add(v.docname)
-                break
+        result.append({
+            "order_id": t.order,
+            "order_modified_date": t.modified.date(),
+            "bom_or_cad": t.bom_or_cad,
+            "workflow_type": t.workflow_type,
+            "company": t.company,
+            "design_type": t.design_type,
+            "category": t.category,
+            "subcategory": t.subcategory,
+            "setting_type": t.setting_type,
+            "order_type": t.order_type,
+            # transitions recorded after the backfill have no Version
+            "version_id": t.version or t.name,
+            "version_creation_date": t.transition_time
+        })
+
+        processed_orders.add(t.order)
 
     return result
 
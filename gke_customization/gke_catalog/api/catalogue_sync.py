@@ -0,0 +1,74 @@
+import frappe
+from frappe.utils import get_datetime
+from gke_customization.gke_catalog.api.item_catalog import CATALOGUE_COLUMNS
+from gke_customization.gke_catalog.media import add_derivative_urls
+from gke_customization.gke_catalog.utils import parse_fields
+
+# Rows are stamped when written but become visible when their transaction commits, so a
+# row can appear below a watermark already handed out. The watermark trails the database
+# clock by this many seconds, and newer rows wait for a later pull.
+WATERMARK_LAG_SECONDS = 60
+
+# http://192.168.200.207:8001/api/method/gke_customization.gke_catalog.api.catalogue_sync.get_catalogue_changes?since=2026-10-01 10:00:00.000000
+
+@frappe.whitelist(allow_guest=True)
+def get_catalogue_changes(since=None, fields=None):
+    """
+        Delta sync for the catalogue app, read from Catalogue Row.
+        Returns rows changed after `since` as upserts and deactivated / deleted BOMs
+        and items as tombstones, with the watermark to send as `since` next time.
+        Without `since`, or when the read model was rebuilt after it, only
+        {"full_sync": 1, "watermark"} is returned: pull merge_data1 and sync from the watermark.
+        The watermark trails the database clock by WATERMARK_LAG_SECONDS, so the first delta
+        after a full sync may repeat rows of merge_data1; apply upserts idempotently.
+    """
+    columns = parse_fields(fields, CATALOGUE_COLUMNS)
+
+    latest, lagged = frappe.db.sql(
+        "SELECT MAX(modified), NOW(6) - INTERVAL %s SECOND FROM `tabCatalogue Row`",
+        (WATERMARK_LAG_SECONDS,),
+    )[0]
+    watermark = min(latest, lagged) if latest else None
+    rebuilt_on = frappe.db.get_global("catalogue_rebuilt_on")
+
+    if not since or (rebuilt_on and get_datetime(since) < get_datetime(rebuilt_on)):
+        return {"full_sync": 1, "watermark": watermark}
+
+    if not watermark or watermark <= get_datetime(since):
+        return {"full_sync": 0, "upserts": [], "tombstones": [], "watermark": since}
+
+    select = ",\n            ".join(f"{CATALOGUE_COLUMNS[column]} AS `{column}`" for column in columns)
+    values = {"since": get_datetime(since), "watermark": watermark}
+
+    upserts = frappe.db.sql(f"""
+        SELECT
+            {select}
+        FROM
+            `tabCatalogue Row` AS cr
+        WHERE
+            cr.modified > %(since)s AND cr.modified <= %(watermark)s
+            AND cr.is_active = 1 AND cr.is_deleted = 0
+        ORDER BY
+            cr.modified
+    """, values, as_dict=True)
+
+    # deactivated BOMs (is_active flipped off) and deleted BOMs / items
+    tombstones = frappe.db.sql("""
+        SELECT
+            cr.bom AS name,
+            cr.item
+        FROM
+            `tabCatalogue Row` AS cr
+        WHERE
+            cr.modified > %(since)s AND cr.modified <= %(watermark)s
+            AND (cr.is_active = 0 OR cr.is_deleted = 1)
+        ORDER BY
+            cr.modified
+    """, values, as_dict=True)
+
+    return {
+        "full_sync": 0,
+        "upserts": add_derivative_urls(upserts),
+        "tombstones": tombstones,
+        "watermark": watermark,
+    }
@@ -0,0 +1,193 @@
+import hashlib
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import getdate
+from werkzeug.wrappers import Response
+from gke_customization.gke_catalog.utils import (
+    parse_fields, get_page_size, encode_cursor, decode_cursor, get_child_rows
+)
+
+# http://192.168.200.207:8001/api/method/gke_customization.gke_catalog.api.documents.get_documents?document_type=sales_order&from_date=2025-04-01&page_size=200
+
+# document_type -> doctype, fields, filter fields and child tables ({key: (child doctype, fields)})
+DOCUMENT_TYPES = {
+    "sales_order": {
+        "doctype": "Sales Order",
+        "fields": ["name", "customer", "customer_name", "transaction_date", "delivery_date", "company", "branch", "po_no"],
+        "date_field": "transaction_date",
+        "customer_field": "customer",
+        "branch_field": "branch",
+        "children": {
+            "items": ("Sales Order Item", [
+                "item_code", "qty", "rate", "item_category", "diamond_quality", "metal_touch", "metal_color",
+                "setting_type", "order_form_date", "image", "gold_bom_rate", "diamond_bom_rate",
+                "gemstone_bom_rate", "other_bom_rate", "making_charge", "finding_weight_for_chain",
+                "amount", "custom_product_size", "salesman_name",
+            ]),
+        },
+    },
+    "order": {
+        "doctype": "Order",
+        "fields": [
+            "name", "company", "branch", "customer_code", "order_date", "delivery_date", "po_no", "category",
+            "subcategory", "setting_type", "sub_setting_type1", "qty", "metal_type", "metal_touch", "metal_colour",
+            "diamond_type", "metal_target", "diamond_target", "product_size", "feature", "rhodium",
+            "gemstone_type", "design_image_1", "workflow_state",
+        ],
+        "date_field": "order_date",
+        "customer_field": "customer_code",
+        "branch_field": "branch",
+        "children": {},
+    },
+    "sketch_order": {
+        "doctype": "Sketch Order",
+        "fields": ["name", "company", "customer_code", "order_date", "delivery_date", "po_no"],
+        "date_field": "order_date",
+        "customer_field": "customer_code",
+        "branch_field": "branch",
+        "children": {
+            "order_details": ("Sketch Order Form Detail", [
+                "category", "subcategory", "setting_type", "sub_setting_type1", "qty", "metal_type",
+                "metal_touch", "metal_colour", "metal_target", "diamond_target", "product_size",
+                "gemstone_type", "design_image1",
+            ]),
+        },
+    },
+    "sales_invoice": {
+        "doctype": "Sales Invoice",
+        "fields": ["name", "customer", "customer_name", "posting_date", "posting_time", "company", "branch", "total", "grand_total", "paid_amount"],
+        "date_field": "posting_date",
+        "customer_field": "customer",
+        "branch_field": "branch",
+        "children": {
+            "items": ("Sales Invoice Item", ["item_code", "qty", "rate", "amount", "sales_order", "delivery_note"]),
+        },
+    },
+    "delivery_note": {
+        "doctype": "Delivery Note",
+        "fields": ["name", "customer", "customer_name", "posting_date", "posting_time", "company", "branch", "total", "grand_total"],
+        "date_field": "posting_date",
+        "customer_field": "customer",
+        "branch_field": "branch",
+        "children": {
+            "items": ("Delivery Note Item", ["item_code", "qty", "rate", "amount", "against_sales_order"]),
+        },
+    },
+    "item": {
+        "doctype": "Item",
+        "fields": ["name", "item_category", "item_subcategory", "setting_type", "sub_setting_type", "approx_gold", "approx_diamond"],
+        "date_field": "creation",
+        "customer_field": None,
+        "branch_field": None,
+        "children": {},
+    },
+}
+
+DOCUMENT_VERSION_KEY = "gke_document_version"
+# writes that bypass doc events (db.set_value) show up once the version expires
+DOCUMENT_VERSION_EXPIRY = 10 * 60
+
+
+def get_document_version(doctype):
+    cache = frappe.cache()
+    version = cache.get_value(f"{DOCUMENT_VERSION_KEY}:{doctype}")
+    if not version:
+        version = frappe.generate_hash(length=10)
+        cache.set_value(f"{DOCUMENT_VERSION_KEY}:{doctype}", version, expires_in_sec=DOCUMENT_VERSION_EXPIRY)
+    return version
+
+
+def clear_document_version(doc, method=None):
+    # doc event on the doctypes served by get_documents; dropped once the change is committed,
+    # so no request mints the next version while it still sees the old data
+    frappe.db.after_commit.add(partial(delete_document_version, doc.doctype))
+
+
+def delete_document_version(doctype):
+    frappe.cache().delete_value(f"{DOCUMENT_VERSION_KEY}:{doctype}")
+
+
+def get_filter_field(meta, field, label):
+    if not field or not meta.has_field(field):
+        frappe.throw(_("{0} filter is not available for {1}").format(label, meta.name))
+    return field
+
+
+@frappe.whitelist()
+def get_documents(document_type, from_date=None, to_date=None, customer=None, branch=None,
+                  fields=None, cursor=None, page_size=None):
+    """
+        Paginated read of Sales Order, Order, Sketch Order, Sales Invoice, Delivery Note or Item.
+        Pages are walked by (modified, name); pass `next_cursor` back as `cursor`.
+        `fields` may name header fields and child table keys. Child rows are loaded with
+        one query per child table for the whole page.
+        The response carries an ETag; a matching If-None-Match returns 304 without touching the database.
+    """
+    config = DOCUMENT_TYPES.get(document_type)
+    if not config:
+        frappe.throw(_("Unknown document type: {0}").format(document_type))
+
+    doctype = config["doctype"]
+    etag = '"{0}"'.format(hashlib.sha1(frappe.as_json([
+        get_document_version(doctype), frappe.session.user, document_type, from_date, to_date,
+        customer, branch, fields, cursor, page_size,
+    ]).encode()).hexdigest())
+
+    if frappe.get_request_header("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+
+    keys = parse_fields(fields, [*config["fields"], *config["children"]])
+    header_fields = [key for key in keys if key not in config["children"]]
+    page_size = get_page_size(page_size)
+
+    meta = frappe.get_meta(doctype)
+    filters = {}
+    if from_date and to_date:
+        filters[config["date_field"]] = ["between", [getdate(from_date), getdate(to_date)]]
+    elif from_date:
+        filters[config["date_field"]] = [">=", getdate(from_date)]
+    elif to_date:
+        filters[config["date_field"]] = ["<=", getdate(to_date)]
+    if customer:
+        filters[get_filter_field(meta, config["customer_field"], _("Customer"))] = customer
+    if branch:
+        filters[get_filter_field(meta, config["branch_field"], _("Branch"))] = branch
+
+    or_filters = None
+    if cursor:
+        cursor_modified, cursor_name = decode_cursor(cursor)
+        # (modified, name) > cursor
+        filters["modified"] = [">=", cursor_modified]
+        or_filters = {"modified": [">", cursor_modified], "name": [">", cursor_name]}
+
+    rows = frappe.get_list(
+        doctype,
+        filters=filters,
+        or_filters=or_filters,
+        fields=list(dict.fromkeys(["name", "modified", *header_fields])),
+        order_by="modified asc, name asc",
+        limit_page_length=page_size + 1,
+    )
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].modified, rows[-1].name)
+
+    names = [row.name for row in rows]
+    for key, (child_doctype, child_fields) in config["children"].items():
+        if key not in keys:
+            continue
+        child_rows = get_child_rows(child_doctype, names, child_fields, filters={"parenttype": doctype})
+        for row in rows:
+            row[key] = child_rows.get(row.name, [])
+
+    data = [{key: row.get(key) for key in keys} for row in rows]
+
+    return Response(
+        frappe.as_json({"message": {"data": data, "next_cursor": next_cursor, "page_size": page_size}}, indent=None),
+        mimetype="application/json",
+        headers={"ETag": etag},
+    )
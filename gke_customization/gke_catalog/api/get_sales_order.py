@@ -13,6 +13,7 @@ from frappe.integrations.oauth2 import get_oauth_server
 import json
 
 # http://192.168.200.207:8001/api/method/gke_customization.gke_catalog.api.get_sales_order.get_sales_order
+# filtered / paginated reads of these doctypes: gke_catalog.api.documents.get_documents
 
 @frappe.whitelist()  # or True if needed
 def get_sales_order():
@@ -48,8 +49,6 @@ def get_sales_order():
     JOIN `tabSales Order Item` soi ON soi.parent = so.name
     where so.name = 'SAL-ORD-2025-02007'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -87,8 +86,6 @@ def get_order_form():
     o.design_image_1
     FROM `tabOrder`o where o.name = 'ORD/C/00001-1'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -124,8 +121,6 @@ def get_sketch_order():
     JOIN `tabSketch Order Form Detail` skod ON skod.parent = sko.name
     where sko.name = 'S/ORD/00001-1'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -144,8 +139,6 @@ def get_repair_order_form():
     customer_code
     FROM `tabRepair Order Form` where name = 'ORD/RO/00001'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -207,8 +200,6 @@ def get_quotation_form(id):
     JOIN `tabQuotation Item` qi ON qi.parent = q.name
     where q.name = 'GE-QTN-RP-25-00001'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -227,8 +218,6 @@ def get_sales_invoice():
     paid_amount
     FROM `tabSales Invoice` where name = '1009'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -243,8 +232,6 @@ def get_delivery_note():
     SELECT  *
     FROM `tabDelivery Note` where name = 'DN-24-00001'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -266,8 +253,6 @@ def get_item():
     approx_diamond
     FROM `tabItem` where name = 'EA07271-016'
     """
-    rows = frappe.db.sql(query, as_dict=1)
-
     try:
         rows = frappe.db.sql(query, as_dict=True)
         return {"success": True, "data": rows}
@@ -1,502 +1,309 @@
 import frappe
+from gke_customization.gke_catalog.attribute_registry import attribute_list
+from gke_customization.gke_catalog.codec import Codec
+from gke_customization.gke_catalog.facet_index import get_facet_index, parse_facet_filters
+from gke_customization.gke_catalog.media import add_derivative_urls
+from gke_customization.gke_catalog.utils import (
+    parse_fields, get_page_size, encode_cursor, decode_cursor, get_cached_count
+)
 # /home/frappe/frappe-bench/apps/gke_customization/gke_customization/gke_catalog/api/item_catalog.py
 
-@frappe.whitelist(allow_guest=True)
-def merge_data1():
-    try:
-        sql_query = """
+# columns of the Catalogue Row read model, keyed by the names the catalogue app expects
+CATALOGUE_COLUMNS = {
+    "name": "cr.bom",
+    "company": "cr.company",
+    "creation": "cr.item_creation",
+    "item_code": "cr.item_code",
+    "item_category": "cr.item_category",
+    "image": "cr.image",
+    "sketch_image": "cr.sketch_image",
+    "cad_3d_image": "cr.cad_3d_image",
+    "3d_videos_1": "cr.videos_3d_1",
+    "item_subcategory": "cr.item_subcategory",
+    "tag_no": "cr.tag_no",
+    "setting_type": "cr.setting_type",
+    "gross_metal_weight": "cr.gross_metal_weight",
+    "net_metal_finding_weight": "cr.net_metal_finding_weight",
+    "total_diamond_weight_in_gms": "cr.total_diamond_weight_in_gms",
+    "other_weight": "cr.other_weight",
+    "finding_weight_": "cr.finding_weight_",
+    "metal_colour": "cr.metal_colour",
+    "metal_purity": "cr.metal_purity",
+    "total_gemstone_weight_in_gms": "cr.total_gemstone_weight_in_gms",
+    "total_diamond_pcs": "cr.total_diamond_pcs",
+    "total_gemstone_pcs": "cr.total_gemstone_pcs",
+    "gemstone_weight": "cr.gemstone_weight",
+    "gold_diamond_ratio": "cr.gold_diamond_ratio",
+    "diamond_ratio": "cr.diamond_ratio",
+    "metal_diamond_ratio": "cr.metal_diamond_ratio",
+    "navratna": "cr.navratna",
+    "height": "cr.height",
+    "length": "cr.length",
+    "width": "cr.width",
+    "breadth": "cr.breadth",
+    "product_size": "cr.product_size",
+    "sizer_type": "cr.sizer_type",
+    "design_style": "cr.design_style",
+    "nakshi_from": "cr.nakshi_from",
+    "vanki_type": "cr.vanki_type",
+    "total_length": "cr.total_length",
+    "detachable": "cr.detachable",
+    "back_side_size": "cr.back_side_size",
+    "changeable": "cr.changeable",
+    "variant_of": "cr.variant_of",
+    "variant_name": "cr.variant_name",
+    "design_attributes": "cr.design_attributes",
+    "design_attributes_1": "cr.design_attributes_1",
+    "metal_types": "cr.metal_types",
+    "metal_color": "cr.metal_color",
+    "metal_purities": "cr.metal_purities",
+    "metal_touch": "cr.metal_touch",
+    "gemstone_shape": "cr.gemstone_shape",
+    "cut_or_cab": "cr.cut_or_cab",
+    "diamond_stone_shape": "cr.diamond_stone_shape",
+    "diamond_setting_type": "cr.diamond_setting_type",
+    "diamond_sieve_size": "cr.diamond_sieve_size",
+    "size_in_mm": "cr.size_in_mm",
+    "sieve_size_range": "cr.sieve_size_range",
+    "finding_sub_category": "cr.finding_sub_category",
+    "finding_size": "cr.finding_size",
+}
+
+
+def query_catalogue(conditions, values, fields=None, cursor=None, page_size=None, limit=None):
+    """
+        Read Catalogue Row with an optional `fields` projection.
+        Passing `cursor` or `page_size` switches to keyset pagination on (item, bom)
+        and returns {"data", "next_cursor", "page_size", "total_count"}.
+    """
+    columns = parse_fields(fields, CATALOGUE_COLUMNS)
+    select = ",\n                ".join(f"{CATALOGUE_COLUMNS[column]} AS `{column}`" for column in columns)
+
+    if not cursor and not page_size:
+        return add_derivative_urls(frappe.db.sql(f"""
             SELECT
-                item.name,
-                bom.name,
-                idf.company,
-                item.creation,
-                item.item_code,
-                item.item_category,
-                item.image,
-                item.sketch_image,
-                item.cad_3d_image,
-                item.`3d_videos_1` ,
-                item.item_subcategory,
-                bom.tag_no,
-                item.setting_type,
-                FORMAT(bom.gross_weight,3) AS gross_metal_weight,
-                FORMAT(bom.metal_and_finding_weight, 3) AS net_metal_finding_weight,
-                FORMAT(bom.total_diamond_weight_in_gms,3) AS total_diamond_weight_in_gms,
-                FORMAT(bom.other_weight,3) AS other_weight,
-                FORMAT(bom.finding_weight_,3) AS finding_weight_,
-                bom.metal_colour,
-                bom.metal_purity,
-                FORMAT(bom.total_gemstone_weight_in_gms,3) AS total_gemstone_weight_in_gms,
-                bom.total_diamond_pcs,
-                bom.total_gemstone_pcs,
-                FORMAT(bom.gemstone_weight,3) AS gemstone_weight,
-                FORMAT(bom.gold_to_diamond_ratio,3) AS gold_diamond_ratio,
-                FORMAT(bom.diamond_ratio,3) AS diamond_ratio,
-                FORMAT(bom.metal_to_diamond_ratio_excl_of_finding,3) AS metal_diamond_ratio,
-                bom.navratna,
-                bom.height,
-                bom.length,
-                bom.width,
-                bom.breadth,
-                bom.product_size,
-                bom.sizer_type,
-                bom.design_style,
-                bom.nakshi_from,
-                bom.vanki_type,
-                bom.total_length,
-                bom.detachable,
-                bom.back_side_size,
-                bom.changeable,
-                item.variant_of,
-                GROUP_CONCAT(DISTINCT item.name) as variant_name,
-                GROUP_CONCAT(DISTINCT td.design_attributes) AS design_attributes,
-                GROUP_CONCAT(DISTINCT td.design_attribute_value_1) AS design_attributes_1,
-                GROUP_CONCAT(DISTINCT mt.metal_type) AS metal_types,
-                GROUP_CONCAT(DISTINCT mt.metal_colour) AS metal_color,
-                GROUP_CONCAT(DISTINCT mt.metal_purity) AS metal_purities,
-                GROUP_CONCAT(DISTINCT mt.metal_touch) AS metal_touch,
-                GROUP_CONCAT(DISTINCT gd.stone_shape) AS gemstone_shape,
-                GROUP_CONCAT(DISTINCT gd.cut_or_cab) AS cut_or_cab,
-                GROUP_CONCAT(DISTINCT dd.stone_shape) AS diamond_stone_shape,
-                GROUP_CONCAT(DISTINCT dd.sub_setting_type) AS diamond_setting_type,
-                GROUP_CONCAT(DISTINCT dd.diamond_sieve_size) AS diamond_sieve_size,
-                GROUP_CONCAT(DISTINCT FORMAT(dd.size_in_mm,3)) AS size_in_mm,
-                GROUP_CONCAT(DISTINCT dd.sieve_size_range) AS sieve_size_range,
-                GROUP_CONCAT(DISTINCT fd.finding_category) AS finding_sub_category,
-                GROUP_CONCAT(DISTINCT FORMAT(fd.finding_size,3)) AS finding_size
+                {select}
             FROM
-                `tabItem` AS item
-            LEFT JOIN
-                `tabBOM` AS bom
-            ON
-                item.item_code = bom.item
-            LEFT JOIN
-                `tabDesign Attributes`  AS td
-            ON
-                item.item_code = td.parent
-            LEFT JOIN
-                `tabBOM Metal Detail` AS mt
-            ON
-                bom.name = mt.parent
-            LEFT JOIN
-                `tabBOM Gemstone Detail` AS gd
-            ON
-                bom.name = gd.parent
-            LEFT JOIN
-                `tabBOM Diamond Detail` AS dd
-            ON
-                bom.name = dd.parent
-            LEFT JOIN
-                `tabBOM Finding Detail` AS fd
-            ON
-                bom.name = fd.parent
-            LEFT JOIN
-                `tabItem Default` AS idf
-            ON
-                item.item_name = idf.parent
+                `tabCatalogue Row` AS cr
             WHERE
-                bom.is_active = 1 and bom_type = 'Finish Goods'
-            GROUP BY
-                item.name, item.creation, item.item_code, item.item_category, item.image, item.item_subcategory, bom.tag_no,
-                bom.gross_weight, bom.metal_and_finding_weight, bom.total_diamond_weight_in_gms, bom.other_weight,
-                bom.finding_weight_, bom.total_gemstone_weight_in_gms, item.item_name,item.variant_of
+                {conditions}
             ORDER BY
-                item.name DESC;
+                cr.item DESC
+            {"LIMIT %d" % limit if limit else ""}
+        """, values, as_dict=True))
+
+    page_size = get_page_size(page_size)
+    page_values = dict(values, page_size=page_size + 1)
+    keyset = ""
+    if cursor:
+        page_values["cursor_item"], page_values["cursor_bom"] = decode_cursor(cursor)
+        keyset = """
+                AND (cr.item < %(cursor_item)s
+                    OR (cr.item = %(cursor_item)s AND cr.bom < %(cursor_bom)s))
         """
-       
-        result = frappe.db.sql(sql_query, as_dict=True)
-       
-        return result
 
+    rows = frappe.db.sql(f"""
+        SELECT
+            {select},
+            cr.item AS _cursor_item,
+            cr.bom AS _cursor_bom
+        FROM
+            `tabCatalogue Row` AS cr
+        WHERE
+            {conditions} {keyset}
+        ORDER BY
+            cr.item DESC, cr.bom DESC
+        LIMIT %(page_size)s
+    """, page_values, as_dict=True)
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]._cursor_item, rows[-1]._cursor_bom)
+
+    for row in rows:
+        del row["_cursor_item"], row["_cursor_bom"]
+    add_derivative_urls(rows)
+
+    count_name = frappe.as_json([conditions, values])
+    total_count = get_cached_count(count_name, lambda: frappe.db.sql(f"""
+        SELECT COUNT(*) FROM `tabCatalogue Row` AS cr WHERE {conditions}
+    """, values)[0][0])
+
+    return {
+        "data": rows,
+        "next_cursor": next_cursor,
+        "page_size": page_size,
+        "total_count": total_count,
+    }
+
+
+@frappe.whitelist(allow_guest=True)
+def merge_data1(cursor=None, page_size=None, fields=None):
+    # rows are maintained by gke_catalog.doc_events.catalogue on Item / BOM changes
+    try:
+        return query_catalogue("cr.is_active = 1 AND cr.is_deleted = 0", {}, fields, cursor, page_size)
 
     except Exception as e:
         return {"error": str(e)}
 
 @frappe.whitelist(allow_guest=True)
-def catalogue_data(selectedSubcategory):
+def catalogue_data(selectedSubcategory=None, cursor=None, page_size=None, fields=None):
     selectedSubcategory = frappe.form_dict.get("selectedSubcategory")
     itemCode = frappe.form_dict.get("itemCode")
     itemCategory = frappe.form_dict.get("itemCategory")
 
-    where_clause = """
-        # idf.company = 'Gurukrupa Export Private Limited'AND 
-        bom.bom_type = 'Finish Goods'
-    """
+    conditions = "cr.bom_type = 'Finish Goods' AND cr.is_deleted = 0"
+    values = {}
 
     # Append subcategory condition if provided
     if selectedSubcategory:
-        where_clause = where_clause + f" AND item.item_subcategory = '{selectedSubcategory}' "
+        conditions += " AND cr.item_subcategory = %(item_subcategory)s"
+        values["item_subcategory"] = selectedSubcategory
     if itemCode:
-        where_clause = where_clause + f" AND item.item_code = '{itemCode}' "
+        conditions += " AND cr.item_code = %(item_code)s"
+        values["item_code"] = itemCode
     if itemCategory:
-        where_clause = where_clause + f" AND item.item_category = '{itemCategory}' "
-
-    # frappe.throw(f"{where_clause}")
-
-    db_data = frappe.db.sql(f""" SELECT
-                item.name,
-                bom.name,
-                idf.company,
-                item.creation,
-                item.item_code,
-                item.item_category,
-                item.image,
-                item.sketch_image,
-                item.cad_3d_image,
-                item.`3d_videos_1` ,
-                item.item_subcategory,
-                bom.tag_no,
-                item.setting_type,
-                FORMAT(bom.gross_weight,3) AS gross_metal_weight,
-                FORMAT(bom.metal_and_finding_weight, 3) AS net_metal_finding_weight,
-                FORMAT(bom.total_diamond_weight_in_gms,3) AS total_diamond_weight_in_gms,
-                FORMAT(bom.other_weight,3) AS other_weight,
-                FORMAT(bom.finding_weight_,3) AS finding_weight_,
-                bom.metal_colour,
-                bom.metal_purity,
-                FORMAT(bom.total_gemstone_weight_in_gms,3) AS total_gemstone_weight_in_gms,
-                bom.total_diamond_pcs,
-                bom.total_gemstone_pcs,
-                FORMAT(bom.gemstone_weight,3) AS gemstone_weight,
-                FORMAT(bom.gold_to_diamond_ratio,3) AS gold_diamond_ratio,
-                FORMAT(bom.diamond_ratio,3) AS diamond_ratio,
-                FORMAT(bom.metal_to_diamond_ratio_excl_of_finding,3) AS metal_diamond_ratio,
-                bom.navratna,
-                bom.height,
-                bom.length,
-                bom.width,
-                bom.breadth,
-                bom.product_size,
-                bom.sizer_type,
-                bom.design_style,
-                bom.nakshi_from,
-                bom.vanki_type,
-                bom.total_length,
-                bom.detachable,
-                bom.back_side_size,
-                bom.changeable,
-                item.variant_of,
-                GROUP_CONCAT(DISTINCT item.name) as variant_name,
-                GROUP_CONCAT(DISTINCT td.design_attributes) AS design_attributes,
-                GROUP_CONCAT(DISTINCT td.design_attribute_value_1) AS design_attributes_1,
-                GROUP_CONCAT(DISTINCT mt.metal_type) AS metal_types,
-                GROUP_CONCAT(DISTINCT mt.metal_colour) AS metal_color,
-                GROUP_CONCAT(DISTINCT mt.metal_purity) AS metal_purities,
-                GROUP_CONCAT(DISTINCT mt.metal_touch) AS metal_touch,
-                GROUP_CONCAT(DISTINCT gd.stone_shape) AS gemstone_shape,
-                GROUP_CONCAT(DISTINCT gd.cut_or_cab) AS cut_or_cab,
-                GROUP_CONCAT(DISTINCT dd.stone_shape) AS diamond_stone_shape,
-                GROUP_CONCAT(DISTINCT dd.sub_setting_type) AS diamond_setting_type,
-                GROUP_CONCAT(DISTINCT dd.diamond_sieve_size) AS diamond_sieve_size,
-                GROUP_CONCAT(DISTINCT FORMAT(dd.size_in_mm,3)) AS size_in_mm,
-                GROUP_CONCAT(DISTINCT dd.sieve_size_range) AS sieve_size_range,
-                GROUP_CONCAT(DISTINCT fd.finding_category) AS finding_sub_category,
-                GROUP_CONCAT(DISTINCT FORMAT(fd.finding_size,3)) AS finding_size
-            FROM
-                `tabItem` AS item
-            LEFT JOIN
-                `tabBOM` AS bom
-            ON
-                item.item_code = bom.item
-            LEFT JOIN
-                `tabDesign Attributes`  AS td
-            ON
-                item.item_code = td.parent
-            LEFT JOIN
-                `tabBOM Metal Detail` AS mt
-            ON
-                bom.name = mt.parent
-            LEFT JOIN
-                `tabBOM Gemstone Detail` AS gd
-            ON
-                bom.name = gd.parent
-            LEFT JOIN
-                `tabBOM Diamond Detail` AS dd
-            ON
-                bom.name = dd.parent
-            LEFT JOIN
-                `tabBOM Finding Detail` AS fd
-            ON
-                bom.name = fd.parent
-            LEFT JOIN
-                `tabItem Default` AS idf
-            ON
-                item.item_name = idf.parent
-            WHERE
-                {where_clause}
-            GROUP BY
-                item.name, item.creation, item.item_code, item.item_category, item.image, item.item_subcategory, bom.tag_no,
-                bom.gross_weight, bom.metal_and_finding_weight, bom.total_diamond_weight_in_gms, bom.other_weight,
-                bom.finding_weight_, bom.total_gemstone_weight_in_gms, item.item_name,item.variant_of
-            ORDER BY
-                item.name DESC 
-            limit 20
-    """,as_dict=True)
+        conditions += " AND cr.item_category = %(item_category)s"
+        values["item_category"] = itemCategory
 
-    return db_data
+    return query_catalogue(conditions, values, fields, cursor, page_size, limit=20)
 
 
+def get_catalogue_rows(boms, fields=None):
+    """Catalogue rows of `boms` in the given order, with the `fields` projection"""
+    columns = parse_fields(fields, CATALOGUE_COLUMNS)
+    if not boms:
+        return []
 
-@frappe.whitelist()
-def get_item_category():
-    # Your code to fetch attribute values where is_category is checked
-    itm_category = frappe.get_all("Attribute Value", filters={"is_category": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"item_category": item["name"]} for item in itm_category]
+    select = ",\n            ".join(f"{CATALOGUE_COLUMNS[column]} AS `{column}`" for column in columns)
+    rows = frappe.db.sql(f"""
+        SELECT
+            {select},
+            cr.bom AS _bom
+        FROM
+            `tabCatalogue Row` AS cr
+        WHERE
+            cr.bom IN %(boms)s
+    """, {"boms": boms}, as_dict=True)
 
+    position = {bom: i for i, bom in enumerate(boms)}
+    rows.sort(key=lambda row: position[row._bom])
+    for row in rows:
+        del row["_bom"]
 
-    # Sort the modified_data list in ascending order by the "item_category" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["item_category"])
-   
-    return modified_data
+    return add_derivative_urls(rows)
 
 
-@frappe.whitelist()
-def get_item_subcategory():
-    # Your code to fetch attribute values where is_category is checked
-    itm_subcategory = frappe.get_all("Attribute Value", filters={"is_subcategory": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"item_subcategory": item["name"]} for item in itm_subcategory]
+@frappe.whitelist(allow_guest=True)
+def search_catalogue(filters=None, start=0, page_size=None, fields=None):
+    """
+        Faceted browsing over the in-process facet index.
+        `filters` is {facet: [values]}; values of one facet are OR-ed, facets are AND-ed.
+        Returns the matching rows of the page, the total match count and the
+        row count of every facet value under the current selection.
+    """
+    try:
+        result = get_facet_index().search(
+            parse_facet_filters(filters), frappe.utils.cint(start), get_page_size(page_size)
+        )
+        return {
+            "data": get_catalogue_rows(result["boms"], fields),
+            "total_count": result["total_count"],
+            "facets": result["facets"],
+        }
 
+    except Exception as e:
+        return {"error": str(e)}
 
-    # Sort the modified_data list in ascending order by the "item_subcategory" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["item_subcategory"])
-   
-    return modified_data
 
 
 @frappe.whitelist()
-def get_setting_type():
-    # Your code to fetch attribute values where is_setting_type is checked
-    setting_type = frappe.get_all("Attribute Value", filters={"is_setting_type": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"setting_type": item["name"]} for item in setting_type]
+def get_item_category():
+    return attribute_list("item_category", "is_category")
 
 
-    # Sort the modified_data list in ascending order by the "setting_type" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["setting_type"])
-   
-    return modified_data
+@frappe.whitelist()
+def get_item_subcategory():
+    return attribute_list("item_subcategory", "is_subcategory")
 
 
 @frappe.whitelist()
-def get_finding_subcategory():
-    # Your code to fetch attribute values where is_setting_type is checked
-    finding_sub_category = frappe.get_all("Attribute Value", filters={"is_finding_type": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"finding_subcategory": item["name"]} for item in finding_sub_category]
+def get_setting_type():
+    return attribute_list("setting_type", "is_setting_type")
 
 
-    # Sort the modified_data list in ascending order by the "finding_sub_category" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["finding_subcategory"])
-   
-    return modified_data
+@frappe.whitelist()
+def get_finding_subcategory():
+    return attribute_list("finding_subcategory", "is_finding_type")
 
 
 @frappe.whitelist()
 def get_metal_type():
-    # Your code to fetch attribute values where is_setting_type is checked
-    metal_type = frappe.get_all("Attribute Value", filters={"is_metal_type": 1})
-   
     excluded_values = ["Genia-221","Lux-101","Lux-142","Lux-142 ProGold","Lux-160","Lux-173","Lux-189","Refined Gold"]
-    # Modify the structure of the list
-    modified_data = [{"metal_type": item["name"]} for item in metal_type if item["name"] not in excluded_values]
-    
-
-    # Sort the modified_data list in ascending order by the "metal_type" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["metal_type"])
-   
-    return modified_data
+    return attribute_list("metal_type", "is_metal_type", exclude=excluded_values)
 
 
 @frappe.whitelist()
 def get_metal_touch():
-    # Your code to fetch attribute values where is_setting_type is checked
-    metal_touch = frappe.get_all("Attribute Value", filters={"is_metal_touch": 1})
-   
-    # Modify the structure of the list
-    # modified_data = [{"metal_touch": item["name"]} for item in metal_touch]
     excluded_values = ["24KT"]
-    modified_data = [{"metal_touch": item["name"]} for item in metal_touch if item["name"] not in excluded_values]
-
-    # Sort the modified_data list in ascending order by the "metal_touch" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["metal_touch"])
-   
-    return modified_data
+    return attribute_list("metal_touch", "is_metal_touch", exclude=excluded_values)
 
 
 @frappe.whitelist()
 def get_metal_color():
-    # Your code to fetch attribute values where is_setting_type is checked
-    metal_colour = frappe.get_all("Attribute Value", filters={"is_metal_colour": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"metal_color": item["name"]} for item in metal_colour]
-
-
-    # Sort the modified_data list in ascending order by the "metal_colour" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["metal_color"])
-   
-    return modified_data
+    return attribute_list("metal_color", "is_metal_colour")
 
 
 @frappe.whitelist()
 def get_stone_shape():
-    # Your code to fetch attribute values where is_setting_type is checked
-    stone_shape = frappe.get_all("Attribute Value", filters={"is_stone_shape": 1})
-   
-    # Modify the structure of the list
-    # modified_data = [{"stone_shape": item["name"]} for item in stone_shape]
-
-
-    # Modify the structure of the list and exclude specific values
     excluded_values = ["1 Mukhi","2 Mukhi","3 Mukhi","4 Mukhi","5 Mukhi","6 Mukhi","7 Mukhi","8 Mukhi","9 Mukhi","10 Mukhi", "Beeds", "Trillion"]
-    modified_data = [{"stone_shape": item["name"]} for item in stone_shape if item["name"] not in excluded_values]
-
-
-    # Sort the modified_data list in ascending order by the "stone_shape" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["stone_shape"])
-   
-    return modified_data
+    return attribute_list("stone_shape", "is_stone_shape", exclude=excluded_values)
 
 
 @frappe.whitelist()
 def get_gemstone_stone():
-    # Your code to fetch attribute values where is_setting_type is checked
-    stone_shape = frappe.get_all("Attribute Value", filters={"is_stone_shape": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"gemstone_stone": item["name"]} for item in stone_shape]
-
-
-    # Sort the modified_data list in ascending order by the "gemstone_shape" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["gemstone_stone"])
-   
-    return modified_data
+    return attribute_list("gemstone_stone", "is_stone_shape")
 
 
 @frappe.whitelist()
 def get_finding_size():
-    # Your code to fetch attribute values where is_setting_type is checked
-    finding_size = frappe.get_all("Attribute Value", filters={"is_finding_size": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"finding_size": item["name"]} for item in finding_size]
-
-
-    # Sort the modified_data list in ascending order by the "finding_size" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["finding_size"])
-   
-    return modified_data
+    return attribute_list("finding_size", "is_finding_size")
 
 
 @frappe.whitelist()
 def get_size_range():
-    # Your code to fetch attribute values where is_setting_type is checked
-    diamond_sieve_size_range = frappe.get_all("Attribute Value", filters={"is_diamond_sieve_size_range": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"size_range": item["name"]} for item in diamond_sieve_size_range]
-
-
-    # Sort the modified_data list in ascending order by the "sieve_size_range" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["size_range"])
-   
-    return modified_data
+    return attribute_list("size_range", "is_diamond_sieve_size_range")
 
 
 @frappe.whitelist()
 def get_sieve_size():
-    # Your code to fetch attribute values where is_setting_type is checked
-    diamond_sieve_size = frappe.get_all("Attribute Value", filters={"is_diamond_sieve_size": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"sieve_size": item["name"]} for item in diamond_sieve_size]
-
-
-    # Sort the modified_data list in ascending order by the "diamond_sieve_size" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["sieve_size"])
-   
-    return modified_data
+    return attribute_list("sieve_size", "is_diamond_sieve_size")
 
 
 @frappe.whitelist()
 def get_diamond_size_in_mm():
-    # Your code to fetch attribute values where is_setting_type is checked
-    diamond_size_in_mm = frappe.get_all("Attribute Value", filters={"is_diamond_size_in_mm": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"diamond_size_in_mm": item["name"]} for item in diamond_size_in_mm]
-
-
-    # Sort the modified_data list in ascending order by the "diamond_size_in_mm" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["diamond_size_in_mm"])
-   
-    return modified_data
+    return attribute_list("diamond_size_in_mm", "is_diamond_size_in_mm")
 
 
 @frappe.whitelist()
 def get_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1})
-   
-    # Modify the structure of the list
-    modified_data = [{"design_attributs": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "design_attributs" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["design_attributs"])
-   
-    return modified_data
+    return attribute_list("design_attributs", "is_collection")
 
 
 @frappe.whitelist()
 def get_age_group():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Age Group"})
-   
-    # Modify the structure of the list
-    modified_data = [{"age_group": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "age_group" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["age_group"])
-   
-    return modified_data
+    return attribute_list("age_group", "is_collection", parent="Age Group")
 
 
 @frappe.whitelist()
 def get_animals_birds():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Animal/Birds"})
-   
-    # Modify the structure of the list
-    modified_data = [{"animals_birds": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "animals" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["animals_birds"])
-   
-    return modified_data
+    return attribute_list("animals_birds", "is_collection", parent="Animal/Birds")
 
 
 @frappe.whitelist()
 def get_alphabet_number():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Alphabet/Number"})
-   
-    # Modify the structure of the list
-    modified_data = [{"alphabet_number": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "birds" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["alphabet_number"])
-   
-    return modified_data
+    return attribute_list("alphabet_number", "is_collection", parent="Alphabet/Number")
 
 
 # @frappe.whitelist()
@@ -516,246 +323,126 @@ def get_alphabet_number():
 
 @frappe.whitelist()
 def get_collection():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Collection"})
-   
-    # Modify the structure of the list
-    modified_data = [{"collection": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "collection" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["collection"])
-   
-    return modified_data
+    return attribute_list("collection", "is_collection", parent="Collection")
 
 
 @frappe.whitelist()
 def get_design_style():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Design Style"})
-   
-    # Modify the structure of the list
-    modified_data = [{"design_style": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "design_style" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["design_style"])
-   
-    return modified_data
+    return attribute_list("design_style", "is_collection", parent="Design Style")
 
 
 @frappe.whitelist()
 def get_gender():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Gender"})
-   
-    # Modify the structure of the list
-    modified_data = [{"gender": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "gender" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["gender"])
-   
-    return modified_data
+    return attribute_list("gender", "is_collection", parent="Gender")
 
 
 @frappe.whitelist()
 def get_lines_rows():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Lines & Rows"})
-   
-    # Modify the structure of the list
-    modified_data = [{"lines_rows": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "color_tone" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["lines_rows"])
-   
-    return modified_data
+    return attribute_list("lines_rows", "is_collection", parent="Lines & Rows")
 
 
 @frappe.whitelist()
 def get_language():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Language"})
-   
-    # Modify the structure of the list
-    modified_data = [{"language": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "close_chilan" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["language"])
-   
-    return modified_data
+    return attribute_list("language", "is_collection", parent="Language")
 
 
 @frappe.whitelist()
 def get_occasion():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Occasion"})
-   
-    # Modify the structure of the list
-    modified_data = [{"occasion": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "occasion" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["occasion"])
-   
-    return modified_data
+    return attribute_list("occasion", "is_collection", parent="Occasion")
 
 
 @frappe.whitelist()
 def get_rhodium():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Rhodium"})
-   
-    # Modify the structure of the list
-    modified_data = [{"rhodium": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "finish_type" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["rhodium"])
-   
-    return modified_data
+    return attribute_list("rhodium", "is_collection", parent="Rhodium")
 
 
 @frappe.whitelist()
 def get_religious():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Religious"})
-   
-    # Modify the structure of the list
-    modified_data = [{"religious": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "god" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["religious"])
-   
-    return modified_data
+    return attribute_list("religious", "is_collection", parent="Religious")
 
 
 @frappe.whitelist()
 def get_shape():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Shapes"})
-   
-    # Modify the structure of the list
-    modified_data = [{"shape": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "shape" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["shape"])
-   
-    return modified_data
+    return attribute_list("shape", "is_collection", parent="Shapes")
 
 
 @frappe.whitelist()
 def get_initial():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Initial"})
-   
-    # Modify the structure of the list
-    modified_data = [{"initial": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "initial" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["initial"])
-   
-    return modified_data
+    return attribute_list("initial", "is_collection", parent="Initial")
 
 
 @frappe.whitelist()
 def get_no_of_prong():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "No of Prong"})
-   
-    # Modify the structure of the list
-    modified_data = [{"design_attributes_1": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "design_attributes_1" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["design_attributes_1"])
-   
-    return modified_data
-
-
+    return attribute_list("design_attributes_1", "is_collection", parent="No of Prong")
 
 
 @frappe.whitelist()
 def get_relationship():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Relationship"})
-   
-    # Modify the structure of the list
-    modified_data = [{"relationship": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "relationship" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["relationship"])
-   
-    return modified_data
+    return attribute_list("relationship", "is_collection", parent="Relationship")
 
 
 @frappe.whitelist()
 def get_setting_style():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Setting Style"})
-   
-    # Modify the structure of the list
-    modified_data = [{"setting_style": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "setting_style" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["setting_style"])
-   
-    return modified_data
-
-
+    return attribute_list("setting_style", "is_collection", parent="Setting Style")
 
 
 @frappe.whitelist()
 def get_temple():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Temple"})
-   
-    # Modify the structure of the list
-    modified_data = [{"temple": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "temple" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["temple"])
-   
-    return modified_data
+    return attribute_list("temple", "is_collection", parent="Temple")
 
 
 @frappe.whitelist()
 def get_zodiac():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Zodiac"})
-   
-    # Modify the structure of the list
-    modified_data = [{"zodiac": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "zodiac" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["zodiac"])
-   
-    return modified_data
+    return attribute_list("zodiac", "is_collection", parent="Zodiac")
 
 
 @frappe.whitelist()
 def get_creativity():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_collection": 1, "parent_attribute_value": "Creativity"})
-   
-    # Modify the structure of the list
-    modified_data = [{"creativity": item["name"]} for item in design_attributs]
-
-
-    # Sort the modified_data list in ascending order by the "design_attributes_1" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["creativity"])
-   
-    return modified_data
+    return attribute_list("creativity", "is_collection", parent="Creativity")
+
+
+# every filter list above, served together by get_catalogue_filters
+CATALOGUE_FILTERS = [
+    get_item_category,
+    get_item_subcategory,
+    get_setting_type,
+    get_finding_subcategory,
+    get_metal_type,
+    get_metal_touch,
+    get_metal_color,
+    get_stone_shape,
+    get_gemstone_stone,
+    get_finding_size,
+    get_size_range,
+    get_sieve_size,
+    get_diamond_size_in_mm,
+    get_design_attributs,
+    get_age_group,
+    get_animals_birds,
+    get_alphabet_number,
+    get_collection,
+    get_design_style,
+    get_gender,
+    get_lines_rows,
+    get_language,
+    get_occasion,
+    get_rhodium,
+    get_religious,
+    get_shape,
+    get_initial,
+    get_no_of_prong,
+    get_relationship,
+    get_setting_style,
+    get_temple,
+    get_zodiac,
+    get_creativity,
+]
+
+
+@frappe.whitelist()
+def get_catalogue_filters():
+    """All catalogue filter lists in one response, keyed by endpoint name"""
+    return {method.__name__: method() for method in CATALOGUE_FILTERS}
 
 
 @frappe.whitelist()
@@ -817,50 +504,28 @@ def get_employee_permission():
 
 @frappe.whitelist(allow_guest=True)
 def cat_count():
+    # maintained by gke_catalog.doc_events.catalogue, see Catalogue Counter
     try:
-        sql_query = """
-             SELECT
-                item.item_subcategory,
-                COUNT(DISTINCT CASE
-                    WHEN tav.is_subcategory = 1 AND item.item_subcategory IS NOT NULL THEN item.name
-                    ELSE NULL
-                END) AS item_count,
-                COUNT(DISTINCT CASE
-                    WHEN tav.is_subcategory = 1 AND item.item_subcategory IS NOT NULL
-                        AND bom.bom_type = "Finish Goods" AND bom.is_active = 1 THEN item.name
-                    ELSE NULL
-                END) AS serial_count
-            FROM `tabItem` AS item
-            JOIN `tabAttribute Value` AS tav ON item.item_subcategory = tav.name
-            LEFT JOIN `tabBOM` AS bom ON item.item_code = bom.item
-            WHERE (tav.is_subcategory = 1 AND item.item_subcategory IS NOT NULL)
-            OR (bom.bom_type = "Finish Goods" AND bom.is_active = 1)
-            GROUP BY item.item_subcategory;
-        """
-       
-        result = frappe.db.sql(sql_query, as_dict=True)
-       
-        return result
-
+        return frappe.get_all(
+            "Catalogue Counter",
+            filters={"counter_type": "Subcategory"},
+            fields=["counter_key as item_subcategory", "item_count", "serial_count"],
+            order_by="counter_key asc",
+        )
 
     except Exception as e:
         return {"error": str(e)}
-   
 
 
 @frappe.whitelist(allow_guest=True)
 def var_count():
     try:
-        sql_query = """
-                select item.variant_of as variant_of, count(item.name) as var_count ,
-                GROUP_CONCAT(distinct(item.name)) as item from tabItem item
-                where variant_of is not null group by item.variant_of;
-            """
-       
-        result = frappe.db.sql(sql_query, as_dict=True)
-       
-        return result
-
+        return frappe.get_all(
+            "Catalogue Counter",
+            filters={"counter_type": "Template"},
+            fields=["counter_key as variant_of", "item_count as var_count", "items as item"],
+            order_by="counter_key asc",
+        )
 
     except Exception as e:
         return {"error": str(e)}
@@ -873,7 +538,7 @@ def var_count():
    
 #employee
 @frappe.whitelist(allow_guest=True)
-def employee_data():
+def employee_data(stream=None):
     try:
         sql_query = """
              select employee as employee_code ,employee_name ,designation ,company,branch,user_id  from tabEmployee te ;
@@ -882,6 +547,9 @@ def employee_data():
         result = frappe.db.sql(sql_query, as_dict=True)
     
         # return result
+        if frappe.utils.cint(stream):
+            return codec.response(result)
+
         result_data = encrypt_data(result)
         return result_data
 
@@ -928,7 +596,7 @@ def salesman_data():
    
 #customer    
 @frappe.whitelist(allow_guest=True)
-def customer_data():
+def customer_data(stream=None):
     try:
         sql_query = """
              select name as customer_id,customer_name,territory from tabCustomer tc  ;
@@ -937,6 +605,9 @@ def customer_data():
         result = frappe.db.sql(sql_query, as_dict=True)
        
         # return result
+        if frappe.utils.cint(stream):
+            return codec.response(result)
+
         result_data = encrypt_data(result)
         return result_data
 
@@ -1071,21 +742,12 @@ crypt = {
     "_": "156",
 }
 
+codec = Codec(crypt)
+
 
-import json
 # Common function to encrypt data
 @frappe.whitelist()
 def encrypt_data(modified_data):
-    encrypted_data = {"message": []}
-
-
-    for item in modified_data:
-        encrypted_item = {}
-        for key, value in item.items():
-            encrypted_value = "".join(crypt.get(char, char) for char in str(value))
-            encrypted_item[key] = encrypted_value
-
-
-        encrypted_data["message"].append(encrypted_item)
-    print(encrypted_data["message"])
-    return encrypted_data["message"]
\ No newline at end of file
+    if isinstance(modified_data, str):
+        modified_data = frappe.parse_json(modified_data)
+    return codec.encode_rows(modified_data)
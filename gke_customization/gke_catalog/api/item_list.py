@@ -1,206 +1,193 @@
 import frappe
 from frappe import _
+from gke_customization.gke_catalog.attribute_registry import attribute_list
+from gke_customization.gke_catalog.codec import Codec
+from gke_customization.gke_catalog.media import add_derivative_urls
+from gke_customization.gke_catalog.utils import (
+    get_child_rows, parse_fields, get_page_size, encode_cursor, decode_cursor, get_cached_count
+)
+
+# response key -> BOM field
+BOM_LIST_FIELDS = {
+    "item": "item",
+    "name": "name",
+    "gross_metal_weight": "gross_weight",
+    "Net_metal_finding_weight": "metal_and_finding_weight",
+    "Diamond_weight": "diamond_weight",
+    "other_weight": "other_weight",
+    "gemstone_weight": "gemstone_weight",
+    "finding_weight": "finding_weight_",
+    "metal_color": "metal_colour",
+    "metal_purity": "metal_purity",
+    "total_diamond_pcs": "total_diamond_pcs",
+    "total_gemstone_pcs": "total_gemstone_pcs",
+    "gold_to_diamond_ratio": "gold_to_diamond_ratio",
+    "diamond_ratio": "diamond_ratio",
+    "metal_to_diamond_ratio_excl_of_finding": "metal_to_diamond_ratio_excl_of_finding",
+    "navratna": "navratna",
+    "height": "height",
+    "length": "length",
+    "width": "width",
+    "breadth": "breadth",
+    "product_size": "product_size",
+    "sizer_type": "sizer_type",
+    "design_style": "design_style",
+    "nakshi_from": "nakshi_from",
+    "vanki_type": "vanki_type",
+    "total_length": "total_length",
+    "detachable": "detachable",
+    "back_side_size": "back_side_size",
+    "changeable": "changeable",
+}
 
-@frappe.whitelist(allow_guest=True)
-def get_bom_list():
-    # Implement your logic to fetch items and filter as needed
-    #bom = frappe.get_all('BOM', filters={"docstatus": 1, "is_active": 1 ,"bom_type":'Finished Goods'}, fields=[
-    bom = frappe.get_all('BOM', filters={"is_active": 1,"bom_type":'Finished Goods'}, fields=[
-    
-        'item',
-        'name',
-        'gross_weight',
-        'metal_and_finding_weight',
-        'diamond_weight',
-        'other_weight',
-        'gemstone_weight',
-        'finding_weight_',
-        'metal_colour', 
-        'metal_purity',
-        'total_diamond_pcs',
-        'total_gemstone_pcs',
-        'gold_to_diamond_ratio',
-        'diamond_ratio',
-        'metal_to_diamond_ratio_excl_of_finding',
-        'navratna',
-        'height',
-        'length',
-        'width',
-        'breadth',
-        'product_size',
-        'sizer_type',
-        'design_style',
-        'nakshi_from',
-        'vanki_type',
-        'total_length',
-        'detachable',
-        'back_side_size',
-        'changeable'
-    ])
+# response key -> (child doctype, {child response key: child field})
+BOM_LIST_CHILD_TABLES = {
+    "metal_details": ("BOM Metal Detail", {
+        "metal_type": "metal_type",
+        "metal_touch": "metal_touch",
+        "metal_colour": "metal_colour",
+    }),
+    "finding_details": ("BOM Finding Detail", {
+        "finding_sub_category": "finding_type",
+        "finding_size": "finding_size",
+    }),
+    "diamond_details": ("BOM Diamond Detail", {
+        "stone_shape": "stone_shape",
+        "sub_setting_type": "sub_setting_type",
+        "diamond_sieve_size": "diamond_sieve_size",
+        "size_in_mm": "size_in_mm",
+        "sieve_size_range": "sieve_size_range",
+    }),
+    "gemstone_details": ("BOM Gemstone Detail", {
+        "gemstone_shape": "stone_shape",
+        "sub_setting_type": "sub_setting_type",
+        "cut_or_cab": "cut_or_cab",
+    }),
+}
 
-    bom_list = []
-    
-    # Create a set to store unique item codes from the BOMs
-    item_codes = set()
+# response key -> Item field
+BOM_LIST_ITEM_FIELDS = {
+    "item_image": "image",
+    "item_category": "item_category",
+    "item_subcategory": "item_subcategory",
+    "setting_type": "setting_type",
+}
 
-    for bom_doc in bom:
-        # Fetch data from the 'metal_detail' child table
-        metal_details = frappe.get_all('BOM Metal Detail', filters={"parent": bom_doc['name']}, fields=[
-            'metal_type',
-            'metal_touch',
-            'metal_colour'
-            # Add other fields you need from the child table
-        ])
-
-        # Create a dictionary to store metal details
-        metal_details_list = []
-
-        for metal_detail in metal_details:
-            metal_detail_dict = {
-                "metal_type": metal_detail['metal_type'],
-                "metal_touch": metal_detail['metal_touch'],
-                "metal_colour": metal_detail['metal_colour'],
-                # Add other fields from the child table as needed
-            }
-            metal_details_list.append(metal_detail_dict)
-
-        # Fetch data from the 'finding_detail' child table
-        finding_details = frappe.get_all('BOM Finding Detail', filters={"parent": bom_doc['name']}, fields=[
-            'finding_type','finding_size'
-            # Add other fields you need from the child table
-        ])
-
-        # Create a dictionary to store finding details
-        finding_detail_list = []
-
-        for finding_detail in finding_details:
-            finding_detail_dict = {
-                "finding_sub_category": finding_detail['finding_type'],
-                "finding_size":finding_detail['finding_size']
-                # Add other fields from the child table as needed
-            }
-            finding_detail_list.append(finding_detail_dict)
-
-        # Fetch data from the 'diamond_detail' child table
-        diamond_details = frappe.get_all('BOM Diamond Detail', filters={"parent": bom_doc['name']}, fields=[
-            'stone_shape','sub_setting_type','diamond_sieve_size','size_in_mm','sieve_size_range'
-            # Add other fields you need from the child table
-        ])
-
-        # Create a dictionary to store diamond details
-        diamond_detail_list = []
-
-        for diamond_detail in diamond_details:
-            diamond_detail_dict = {
-                "stone_shape": diamond_detail['stone_shape'],
-                "sub_setting_type":diamond_detail['sub_setting_type'],
-                "diamond_sieve_size":diamond_detail['diamond_sieve_size'],
-                "size_in_mm":diamond_detail['size_in_mm'],
-                "sieve_size_range":diamond_detail['sieve_size_range']
-                # Add other fields from the child table as needed
-            }
-            diamond_detail_list.append(diamond_detail_dict)
-
-        # Fetch data from the 'gemstone_detail' child table
-        gemstone_details = frappe.get_all('BOM Gemstone Detail', filters={"parent": bom_doc['name']}, fields=[
-            'stone_shape','sub_setting_type','cut_or_cab'
-            # Add other fields you need from the child table
-        ])
-
-        # Create a dictionary to store gemstone details
-        gemstone_detail_list = []
-
-        for gemstone_detail in gemstone_details:
-            gemstone_detail_dict = {
-                "gemstone_shape": gemstone_detail['stone_shape'],
-                "sub_setting_type": gemstone_detail['sub_setting_type'],
-                "cut_or_cab":gemstone_detail['cut_or_cab']
-                # Add other fields from the child table as needed
-            }
-            gemstone_detail_list.append(gemstone_detail_dict)
-
-        # Fetch data from the 'design_attribute' child table
-        design_attributes = frappe.get_all('Design Attributes', filters={"parent": bom_doc['name']}, fields=[
+BOM_LIST_KEYS = [*BOM_LIST_FIELDS, *BOM_LIST_CHILD_TABLES, "design_attributes", *BOM_LIST_ITEM_FIELDS]
+
+
+@frappe.whitelist(allow_guest=True)
+def get_bom_list(cursor=None, page_size=None, fields=None):
+    """
+        Finished Goods BOMs with their details.
+        Passing `cursor` or `page_size` pages through the BOMs by (item, name) and returns
+        {"data", "next_cursor", "page_size", "total_count"}; `fields` limits the response keys.
+    """
+    keys = parse_fields(fields, BOM_LIST_KEYS)
+    bom_fields = list(dict.fromkeys(["item", "name", *BOM_LIST_FIELDS.values()]))
+
+    if not cursor and not page_size:
+        #bom = frappe.get_all('BOM', filters={"docstatus": 1, "is_active": 1 ,"bom_type":'Finished Goods'}, fields=[
+        bom = frappe.get_all('BOM', filters={"is_active": 1,"bom_type":'Finished Goods'}, fields=bom_fields)
+        return build_bom_list(bom, keys)
+
+    page_size = get_page_size(page_size)
+    values = {"page_size": page_size + 1}
+    keyset = ""
+    if cursor:
+        values["cursor_item"], values["cursor_name"] = decode_cursor(cursor)
+        keyset = """
+            AND (item > %(cursor_item)s
+                OR (item = %(cursor_item)s AND name > %(cursor_name)s))
+        """
+
+    columns = ", ".join(f"`{field}`" for field in bom_fields)
+    bom = frappe.db.sql(f"""
+        SELECT {columns}
+        FROM `tabBOM`
+        WHERE is_active = 1 AND bom_type = 'Finished Goods' {keyset}
+        ORDER BY item, name
+        LIMIT %(page_size)s
+    """, values, as_dict=True)
+
+    next_cursor = None
+    if len(bom) > page_size:
+        bom = bom[:page_size]
+        next_cursor = encode_cursor(bom[-1]['item'], bom[-1]['name'])
+
+    total_count = get_cached_count("get_bom_list", lambda: frappe.db.count(
+        "BOM", {"is_active": 1, "bom_type": "Finished Goods"}
+    ))
+
+    return {
+        "data": build_bom_list(bom, keys),
+        "next_cursor": next_cursor,
+        "page_size": page_size,
+        "total_count": total_count,
+    }
+
+
+def build_bom_list(bom, keys=None):
+    """
+        Attach child table details to the given BOM rows.
+        Every child doctype is fetched once per chunk of parents (`parent IN (...)`)
+        so the number of queries does not grow with the number of BOMs.
+        Child tables whose key is not in `keys` are not queried.
+    """
+    keys = keys or BOM_LIST_KEYS
+    bom_names = [bom_doc['name'] for bom_doc in bom]
+    item_codes = {bom_doc['item'] for bom_doc in bom}
+
+    child_rows = {
+        key: get_child_rows(doctype, bom_names, list(child_fields.values()))
+        for key, (doctype, child_fields) in BOM_LIST_CHILD_TABLES.items()
+        if key in keys
+    }
+
+    # design attributes are read from the item, not from the BOM
+    design_attributes = {}
+    if "design_attributes" in keys:
+        design_attributes = get_child_rows('Design Attributes', item_codes, [
             'design_attributes',
             'design_attribute_value_1'
-            # Add other fields you need from the child table
-        ])
-
-        # Create a dictionary to store design attribute details
-        design_attribute_list = []
-
-        for design_attribute in design_attributes:
-            design_attribute_dict = {
-                "design_attributes": design_attribute['design_attributes'],
-                "design_attribute_value_1": design_attribute['design_attribute_value_1'],
-                # Add other fields from the child table as needed
-            }
-            design_attribute_list.append(design_attribute_dict)
-
-        item_codes.add(bom_doc['item'])
-        bom_dict = {
-            "item": bom_doc['item'],
-            "name": bom_doc['name'],
-            "gross_metal_weight": bom_doc['gross_weight'],
-            "Net_metal_finding_weight": bom_doc['metal_and_finding_weight'],
-            "Diamond_weight": bom_doc['diamond_weight'],
-            "other_weight": bom_doc['other_weight'],
-            "gemstone_weight": bom_doc['gemstone_weight'],
-            "finding_weight": bom_doc['finding_weight_'],
-            "metal_color": bom_doc['metal_colour'],
-            "metal_purity": bom_doc['metal_purity'],
-            "total_diamond_pcs": bom_doc['total_diamond_pcs'],
-            "total_gemstone_pcs": bom_doc['total_gemstone_pcs'],
-            "gold_to_diamond_ratio": bom_doc['gold_to_diamond_ratio'],
-            "diamond_ratio": bom_doc['diamond_ratio'],
-            "metal_to_diamond_ratio_excl_of_finding": bom_doc['metal_to_diamond_ratio_excl_of_finding'],
-            "navratna": bom_doc['navratna'],
-            "height": bom_doc['height'],
-            "length": bom_doc['length'],
-            "width": bom_doc['width'],
-            "breadth": bom_doc['breadth'],
-            "product_size": bom_doc['product_size'],
-            "sizer_type": bom_doc['sizer_type'],
-            "design_style": bom_doc['design_style'],
-            "nakshi_from": bom_doc['nakshi_from'],
-            "vanki_type": bom_doc['vanki_type'],
-            "total_length": bom_doc['total_length'],
-            "detachable": bom_doc['detachable'],
-            "back_side_size": bom_doc['back_side_size'],
-            "changeable": bom_doc['changeable'],
-            "metal_details": metal_details_list,
-            "finding_details": finding_detail_list,
-            "diamond_details": diamond_detail_list,
-            "gemstone_details": gemstone_detail_list,
-            "design_attributes": design_attribute_list,  # Added design_attributes here
-            "design_attributes": get_design_attributes(bom_doc['item']),  # Fetch design attributes for the item
-        }
-        bom_list.append(bom_dict)
-        
-
-    # Fetch additional fields from the 'Item' doctype for items available in the BOMs
-    item_details = frappe.get_all('Item', filters={"item_code": ["in", list(item_codes)]}, fields=[
-        'item_code',
-        'image',
-        'item_category',
-        'item_subcategory',
-        'setting_type'
-    ])
-
-    # Create a dictionary to map item codes to their details
-    item_details_dict = {item['item_code']: item for item in item_details}
-
-    # Update the bom_list with additional item details
-    for bom_dict in bom_list:
-        item_code = bom_dict['item']
-        if item_code in item_details_dict:
-            item_detail = item_details_dict[item_code]
-            bom_dict['item_image'] = item_detail['image']
-            bom_dict['item_category'] = item_detail['item_category']
-            bom_dict['item_subcategory'] = item_detail['item_subcategory']
-            bom_dict['setting_type'] = item_detail['setting_type']
-
-    return bom_list
+        ], order_by='design_attributes')
+
+    item_details = {}
+    if any(key in keys for key in BOM_LIST_ITEM_FIELDS):
+        item_details = get_child_rows('Item', item_codes, [
+            'item_code',
+            *BOM_LIST_ITEM_FIELDS.values()
+        ], order_by='item_code', key='item_code')
+
+    bom_list = []
+    for bom_doc in bom:
+        bom_dict = {key: bom_doc[field] for key, field in BOM_LIST_FIELDS.items()}
+
+        for key, (doctype, child_fields) in BOM_LIST_CHILD_TABLES.items():
+            if key in child_rows:
+                bom_dict[key] = [
+                    {child_key: row[field] for child_key, field in child_fields.items()}
+                    for row in child_rows[key].get(bom_doc['name'], [])
+                ]
+
+        if "design_attributes" in keys:
+            bom_dict["design_attributes"] = [
+                {
+                    "design_attributes": row['design_attributes'],
+                    "design_attribute_value_1": row['design_attribute_value_1'],
+                }
+                for row in design_attributes.get(bom_doc['item'], [])
+            ]
+
+        if bom_doc['item'] in item_details:
+            item_detail = item_details[bom_doc['item']][0]
+            for key, field in BOM_LIST_ITEM_FIELDS.items():
+                bom_dict[key] = item_detail[field]
+
+        bom_list.append({key: bom_dict[key] for key in bom_dict if key in keys})
+
+    return add_derivative_urls(bom_list, ["item_image"])
+
 def get_design_attributes(item_code):
     # Fetch data from the 'Design Attributes' child table for the specified item
     design_attributes = frappe.get_all('Design Attributes', filters={"parent": item_code}, 
@@ -224,336 +211,135 @@ def get_design_attributes(item_code):
 # for particular field filter api
 @frappe.whitelist()
 def get_category_attribute_values():
-    # Your code to fetch attribute values where is_category is checked
-    itm_category = frappe.get_all("Attribute Value", filters={"is_category": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"item_category": item["name"]} for item in itm_category]
-    
-    return modified_data
+    return attribute_list("item_category", "is_category")
 
 @frappe.whitelist()
 def get_subcategory():
-    # Your code to fetch attribute values where is_category is checked
-    itm_subcategory = frappe.get_all("Attribute Value", filters={"is_subcategory": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"item_subcategory": item["name"]} for item in itm_subcategory]
-    
-    return modified_data
+    return attribute_list("item_subcategory", "is_subcategory")
 
 @frappe.whitelist()
 def get_setting_types():
-    # Your code to fetch attribute values where is_setting_type is checked
-    setting_type = frappe.get_all("Attribute Value", filters={"is_setting_type": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"setting_type": item["name"]} for item in setting_type]
-    
-    return modified_data
+    return attribute_list("setting_type", "is_setting_type")
 
 @frappe.whitelist()
 def get_finding_sub_category():
-    # Your code to fetch attribute values where is_setting_type is checked
-    finding_sub_category = frappe.get_all("Attribute Value", filters={"is_finding_type": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"finding_sub_category": item["name"]} for item in finding_sub_category]
-    
-    return modified_data
+    return attribute_list("finding_sub_category", "is_finding_type")
 
 @frappe.whitelist()
 def get_metal_type():
-    # Your code to fetch attribute values where is_setting_type is checked
-    metal_type = frappe.get_all("Attribute Value", filters={"is_metal_type": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"metal_type": item["name"]} for item in metal_type]
-    
-    return modified_data
+    return attribute_list("metal_type", "is_metal_type")
 
 @frappe.whitelist()
 def get_metal_touch():
-    # Your code to fetch attribute values where is_setting_type is checked
-    metal_touch = frappe.get_all("Attribute Value", filters={"is_metal_touch": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"metal_touch": item["name"]} for item in metal_touch]
-    
-    return modified_data
+    return attribute_list("metal_touch", "is_metal_touch")
 
 @frappe.whitelist()
 def get_metal_colour():
-    # Your code to fetch attribute values where is_setting_type is checked
-    metal_colour = frappe.get_all("Attribute Value", filters={"is_metal_colour": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"metal_colour": item["name"]} for item in metal_colour]
-    
-    return modified_data
+    return attribute_list("metal_colour", "is_metal_colour")
 
 @frappe.whitelist()
 def get_diamond_stone_shape():
-    # Your code to fetch attribute values where is_setting_type is checked
-    stone_shape = frappe.get_all("Attribute Value", filters={"is_stone_shape": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"stone_shape": item["name"]} for item in stone_shape]
-    
-    return modified_data
+    return attribute_list("stone_shape", "is_stone_shape")
 
 @frappe.whitelist()
 def get_gemstone_stone_shape():
-    # Your code to fetch attribute values where is_setting_type is checked
-    stone_shape = frappe.get_all("Attribute Value", filters={"is_stone_shape": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"gemstone_shape": item["name"]} for item in stone_shape]
-    
-    return modified_data
+    return attribute_list("gemstone_shape", "is_stone_shape")
 
 @frappe.whitelist()
 def get_finding_size():
-    # Your code to fetch attribute values where is_setting_type is checked
-    finding_size = frappe.get_all("Attribute Value", filters={"is_finding_size": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"finding_size": item["name"]} for item in finding_size]
-    
-    return modified_data
+    return attribute_list("finding_size", "is_finding_size")
 
 @frappe.whitelist()
 def get_diamond_sieve_size_range():
-    # Your code to fetch attribute values where is_setting_type is checked
-    diamond_sieve_size_range = frappe.get_all("Attribute Value", filters={"is_diamond_sieve_size_range": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"sieve_size_range": item["name"]} for item in diamond_sieve_size_range]
-    
-    return modified_data
+    return attribute_list("sieve_size_range", "is_diamond_sieve_size_range")
 
 @frappe.whitelist()
 def get_diamond_sieve_size():
-    # Your code to fetch attribute values where is_setting_type is checked
-    diamond_sieve_size = frappe.get_all("Attribute Value", filters={"is_diamond_sieve_size": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"diamond_sieve_size": item["name"]} for item in diamond_sieve_size]
-    
-    return modified_data
+    return attribute_list("diamond_sieve_size", "is_diamond_sieve_size")
 
 @frappe.whitelist()
 def get_diamond_size_in_mm():
-    # Your code to fetch attribute values where is_setting_type is checked
-    diamond_size_in_mm = frappe.get_all("Attribute Value", filters={"is_diamond_size_in_mm": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"diamond_size_in_mm": item["name"]} for item in diamond_size_in_mm]
-    
-    return modified_data
-
-
+    return attribute_list("diamond_size_in_mm", "is_diamond_size_in_mm")
 
 @frappe.whitelist()
 def get_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attributs": item["name"]} for item in design_attributs]
-    
-    return modified_data
-
-
+    return attribute_list("design_attributs", "is_design_attribute")
 
 @frappe.whitelist()
 def get_age_group_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Age Group"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Age Group")
 
 @frappe.whitelist()
 def get_animals_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Animals"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Animals")
 
 @frappe.whitelist()
 def get_birds_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Birds"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Birds")
 
 @frappe.whitelist()
 def get_birthstone_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Birthstone"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Birthstone")
 
 @frappe.whitelist()
 def get_collection_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Collection"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Collection")
 
 @frappe.whitelist()
 def get_color_tone_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Color Tone"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Color Tone")
 
 @frappe.whitelist()
 def get_close_chilan_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Close Chilan"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Close Chilan")
 
 @frappe.whitelist()
 def get_design_style_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Design Style"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Design Style")
 
 @frappe.whitelist()
 def get_finish_type_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Finish Type"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Finish Type")
 
 @frappe.whitelist()
 def get_gender_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Gender"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Gender")
 
 @frappe.whitelist()
 def get_god_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"God"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="God")
 
 @frappe.whitelist()
 def get_initial_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Initial"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Initial")
 
 @frappe.whitelist()
 def get_no_of_prong_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"No of Prong"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="No of Prong")
 
 @frappe.whitelist()
 def get_occasion_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Occasion"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Occasion")
 
 @frappe.whitelist()
 def get_relationship_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Relationship"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Relationship")
 
 @frappe.whitelist()
 def get_setting_style_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Setting Style"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Setting Style")
 
 @frappe.whitelist()
 def get_shape_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Shape"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Shape")
 
 @frappe.whitelist()
 def get_temple_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Temple"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
-    
-    return modified_data
-
+    return attribute_list("design_attribute_value_1", "is_design_attribute", parent="Temple")
 
 @frappe.whitelist()
 def get_zodiac_design_attributs():
-    # Your code to fetch attribute values where is_setting_type is checked
-    design_attributs = frappe.get_all("Attribute Value", filters={"is_design_attribute": 1,"parent_attribute_value":"Zodiac"})
-    
-    # Modify the structure of the list
-    modified_data = [{"design_attribute_value_1": item["name"]} for item in design_attributs]
+    modified_data = attribute_list("design_attribute_value_1", "is_design_attribute", parent="Zodiac")
     new_modified_data = encrypt_json(modified_data)
     
     return new_modified_data
@@ -561,10 +347,7 @@ def get_zodiac_design_attributs():
 
 # Common function to fetch and sort data
 def fetch_and_sort_data(filter_key, attribute_name):
-    data = frappe.get_all("Attribute Value", filters={filter_key: 1})
-    modified_data = [{attribute_name: item["name"]} for item in data]
-    sorted_data = sorted(modified_data, key=lambda x: x[attribute_name])
-    return sorted_data
+    return attribute_list(attribute_name, filter_key)
 
 # Example of one of your functions
 @frappe.whitelist()
@@ -609,30 +392,12 @@ crypt = {
     "9": "i",
 }
 
-import json
-# @frappe.whitelist()
-# def encrypt_json(modified_data):
-#     encrypted_data = {"message": []}
-#     for item in modified_data:
-#         encrypted_item = {}
-#         for key, value in item.items():
-#             encrypted_value = "".join(crypt.get(char, char) for char in str(value).lower())
-#             encrypted_item[key] = encrypted_value
-#         encrypted_data["message"].append(encrypted_item)
-#     return encrypted_data["message"]
+codec = Codec(crypt, lower=True)
+
 
 # Common function to encrypt data
 @frappe.whitelist()
 def encrypt_json(modified_data):
-    encrypted_data = {"message": []}
-
-    for item in modified_data:
-        encrypted_item = {}
-        for key, value in item.items():
-            encrypted_value = "".join(crypt.get(char, char) for char in str(value).lower())
-            encrypted_item[key] = encrypted_value
-
-        encrypted_data["message"].append(encrypted_item)
-    print(encrypted_data["message"])
-    return encrypted_data["message"]
-
+    if isinstance(modified_data, str):
+        modified_data = frappe.parse_json(modified_data)
+    return codec.encode_rows(modified_data)
@@ -4,6 +4,8 @@ from frappe.utils import (
     time_diff,get_datetime_str,time_diff_in_hours,time_diff_in_seconds,format_time,format_duration
 )
 from collections import defaultdict 
+from frappe.utils import cint
+from gke_customization.gke_catalog.utils import chunked, get_child_rows, json_response
 
 #/home/frappe/frappe-bench/apps/gke_customization/gke_customization/gke_catalog/api/order_detailed.py
 
@@ -14,8 +16,47 @@ from collections import defaultdict
 
 # for initial loading check: http://192.168.200.207:8001/api/method/gke_customization.gke_catalog.api.order_detailed.get_order?is_initial_load=true
 
+ORDER_DETAIL_FIELDS = [
+    "name", "docstatus", "company", "branch","customer_code","cad_order_form","workflow_state",
+    "order_type","flow_type","order_date","delivery_date","cad_file",
+    "creation","owner","modified","_assign","item","new_bom","category"
+]
+
+ORDER_DETAIL_BOM_FIELDS = [
+    "item",
+    "image",
+    "metal_weight",
+    "total_diamond_weight_in_gms",
+    "total_finding_weight_per_gram",
+    "total_gemstone_weight_in_gms",
+    "other_weight",
+    "finding_weight_",
+    "diamond_weight",
+    "gemstone_weight",
+    "front_view_finish"
+]
+
+
+def get_list_in(doctype, field, values, fields, filters=None):
+    """frappe.db.get_list with `field IN (...)`, one query per chunk of values"""
+    rows = []
+    for chunk in chunked(sorted({value for value in values if value})):
+        rows.extend(frappe.db.get_list(doctype, filters={**(filters or {}), field: ["in", chunk]}, fields=fields))
+    return rows
+
+
+def get_first_assignee(assign_raw):
+    assign_list = json.loads(assign_raw)
+    return assign_list[0] if assign_list else None
+
+
 @frappe.whitelist()
-def get_order_detail(from_date=None, to_date=None, of_docstatus=None, branch=None, order_form=None, customer=None, workflow_state=None, docstatus=None, is_initial_load=None):
+def get_order_detail(from_date=None, to_date=None, of_docstatus=None, branch=None, order_form=None, customer=None, workflow_state=None, docstatus=None, is_initial_load=None, stream=None):
+    """
+        Order Forms with their Orders, items, template BOMs and employee details.
+        Loaded with a fixed number of `IN (...)` queries and assembled in memory;
+        pass stream=1 to get the response streamed for large date ranges.
+    """
     from_date = frappe.utils.getdate(from_date)
     to_date = frappe.utils.getdate(to_date)
     
@@ -36,72 +77,63 @@ def get_order_detail(from_date=None, to_date=None, of_docstatus=None, branch=Non
     if customer:
         filters['customer_code'] = customer
 
+    valid_sketch_order_forms = []
     if to_date and from_date:
         order_forms = frappe.db.get_list("Order Form",
             filters = filters,
             fields=["name", "docstatus", "company", "branch","workflow_state","order_date","customer_code"]
         )
 
-        valid_sketch_order_forms = []
+        order_filters = {}
+        if is_initial_load != "true" and is_initial_load != True:
+            if docstatus:
+               order_filters['docstatus'] = int(docstatus)
+            if workflow_state:
+               order_filters['workflow_state'] = workflow_state
+
+        orders_by_form = defaultdict(list)
+        for order in get_list_in("Order", "cad_order_form", [form.name for form in order_forms], ORDER_DETAIL_FIELDS, order_filters):
+            orders_by_form[order.cad_order_form].append(order)
+        orders = [order for form_orders in orders_by_form.values() for order in form_orders]
+
+        items = {
+            name: rows[0]
+            for name, rows in get_child_rows("Item", [order.item for order in orders],
+                ["name", "item_group", "image", "stock_uom"], order_by="name asc", key="name").items()
+        }
+
+        boms = {}
+        for bom in get_list_in("BOM", "name", [order.new_bom for order in orders], ["name", *ORDER_DETAIL_BOM_FIELDS], {'bom_type': 'Template'}):
+            boms[bom.pop("name")] = bom
+
+        users = {order.owner for order in orders}
+        for order in orders:
+            try:
+                users.add(get_first_assignee(order._assign) if order._assign else None)
+            except Exception:
+                pass
+        employees = {
+            user: rows[0]
+            for user, rows in get_child_rows("Employee", users,
+                ["name", "department", "designation"], order_by="modified desc", key="user_id").items()
+        }
+
         for form in order_forms:
-            order_filters = {'cad_order_form': form.name}
-            
-            if is_initial_load != "true" and is_initial_load != True:
-                if docstatus:
-                   order_filters['docstatus'] = int(docstatus)
-                if workflow_state:
-                   order_filters['workflow_state'] = workflow_state
-
-            orders = frappe.db.get_list(
-                "Order",
-                filters=order_filters,
-                fields=["name", "docstatus", "company", "branch","customer_code","cad_order_form","workflow_state",
-                        "order_type","flow_type","order_date","delivery_date","cad_file",
-                        "creation","owner","modified","_assign","item","new_bom","category"
-                    ]
-                )
+            orders = orders_by_form.get(form.name, [])
 
             for order in orders:
-                final_items = []
                 item_code = order.get("item")
+                final_items = [items[item_code]] if item_code in items else []
+                bom_detail = [boms[order["new_bom"]]] if order["new_bom"] in boms else []
 
-                if item_code:
-                   item_data = frappe.db.get_value("Item", item_code, 
-                            ["name", "item_group", "image", "stock_uom"], as_dict=True
-                            )
-                   if item_data:
-                        final_items.append(item_data)
-
-                bom_detail = frappe.db.get_list("BOM",
-                    filters={
-                        'name': order["new_bom"],
-                        'bom_type': 'Template'
-                    },
-                    fields = [
-                            "item",
-                            "image",
-                            "metal_weight",
-                            "total_diamond_weight_in_gms",
-                            "total_finding_weight_per_gram",
-                            "total_gemstone_weight_in_gms",
-                            "other_weight",
-                            "finding_weight_",
-                            "diamond_weight",
-                            "gemstone_weight",
-                            "front_view_finish"
-                        ]
-                ) 
-                
                 assign_raw = order.get("_assign")
                 if assign_raw:
                     try:
-                        assign_list = json.loads(assign_raw)
-                        first_user = assign_list[0] if assign_list else None
+                        first_user = get_first_assignee(assign_raw)
                         order["_assign"] = first_user
                         order["assigned_depart"] = None
-                        if first_user:
-                            employee_dept = frappe.db.get_value("Employee",{'user_id': order["_assign"]},['department'])
-                            order["assigned_depart"] = employee_dept
+                        if first_user and first_user in employees:
+                            order["assigned_depart"] = employees[first_user].department
                     except Exception:
                         order["_assign"] = None
                         order["assigned_depart"] = None
@@ -110,20 +142,14 @@ def get_order_detail(from_date=None, to_date=None, of_docstatus=None, branch=Non
                 
                 owner_raw = order.get("owner")
                 if owner_raw:
-                    try: 
-                        order["owner_id"] = None
-                        order["owner_dept"] = None
-                        order["owner_desig"] = None
-                        employee = frappe.db.get_value("Employee", {'user_id': owner_raw}, ['name', 'department', 'designation'], as_dict=True)
-                        if employee:
-                            order["owner_id"] = employee.name
-                            order["owner_dept"] = employee.department
-                            order["owner_desig"] = employee.designation
-
-                    except Exception:
-                        order["owner_id"] = None
-                        order["owner_dept"] = None
-                        order["owner_desig"] = None 
+                    order["owner_id"] = None
+                    order["owner_dept"] = None
+                    order["owner_desig"] = None
+                    employee = employees.get(owner_raw)
+                    if employee:
+                        order["owner_id"] = employee.name
+                        order["owner_dept"] = employee.department
+                        order["owner_desig"] = employee.designation
             
                 order["order_id"] = order.pop("name")
                 order["workflow_state"] = order.pop("workflow_state")
@@ -139,6 +165,9 @@ def get_order_detail(from_date=None, to_date=None, of_docstatus=None, branch=Non
                 
                 valid_sketch_order_forms.append(form)
 
+    if cint(stream):
+        return json_response(valid_sketch_order_forms)
+
     return valid_sketch_order_forms
 
 # main
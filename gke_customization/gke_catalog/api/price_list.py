@@ -1,4 +1,6 @@
 import frappe
+from gke_customization.gke_catalog.attribute_registry import attribute_list
+from gke_customization.gke_catalog.codec import Codec
 
 @frappe.whitelist(allow_guest=True)
 def diamond_price_list():
@@ -58,15 +60,8 @@ def customer_diamond_price_list():
 
 @frappe.whitelist()
 def get_stone_shape():
-    # Your code to fetch attribute values where is_setting_type is checked
-    stone_shape = frappe.get_all("Attribute Value", filters={"is_stone_shape": 1})
-
-    # Modify the structure of the list and exclude specific values
     excluded_values = ["1 Mukhi","2 Mukhi","3 Mukhi","4 Mukhi","5 Mukhi","6 Mukhi","7 Mukhi","8 Mukhi","9 Mukhi","10 Mukhi", "Beeds", "Trillion"]
-    modified_data = [{"stone_shape": item["name"]} for item in stone_shape if item["name"] not in excluded_values]
-
-    # Sort the modified_data list in ascending order by the "stone_shape" attribute
-    modified_data = sorted(modified_data, key=lambda x: x["stone_shape"])
+    modified_data = attribute_list("stone_shape", "is_stone_shape", exclude=excluded_values)
     
     # return modified_data
     result_data = encrypt_data(modified_data)
@@ -148,18 +143,12 @@ crypt = {
     # ".": "o",  
 }
 
-import json
+codec = Codec(crypt)
+
+
 # Common function to encrypt data
 @frappe.whitelist()
 def encrypt_data(modified_data):
-    encrypted_data = {"message": []}
-
-    for item in modified_data:
-        encrypted_item = {}
-        for key, value in item.items():
-            encrypted_value = "".join(crypt.get(char, char) for char in str(value))
-            encrypted_item[key] = encrypted_value
-
-        encrypted_data["message"].append(encrypted_item)
-    print(encrypted_data["message"])
-    return encrypted_data["message"]
+    if isinstance(modified_data, str):
+        modified_data = frappe.parse_json(modified_data)
+    return codec.encode_rows(modified_data)
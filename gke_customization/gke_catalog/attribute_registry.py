@@ -0,0 +1,81 @@
+import frappe
+
+# boolean flags on Attribute Value used by the catalogue filter endpoints
+ATTRIBUTE_FLAGS = [
+    "is_category",
+    "is_subcategory",
+    "is_setting_type",
+    "is_finding_type",
+    "is_finding_size",
+    "is_metal_type",
+    "is_metal_touch",
+    "is_metal_colour",
+    "is_stone_shape",
+    "is_diamond_sieve_size_range",
+    "is_diamond_sieve_size",
+    "is_diamond_size_in_mm",
+    "is_design_attribute",
+    "is_collection",
+]
+
+REGISTRY_KEY = "gke_attribute_registry"
+REGISTRY_VERSION_KEY = "gke_attribute_registry_version"
+REGISTRY_EXPIRY = 24 * 60 * 60
+
+
+def get_attribute_registry():
+    """
+        {flag: [[name, parent_attribute_value], ...]} for every flagged Attribute Value,
+        loaded with one query and kept in redis under the current registry version
+    """
+    cache = frappe.cache()
+    version = cache.get_value(REGISTRY_VERSION_KEY) or 0
+    key = f"{REGISTRY_KEY}:{version}"
+
+    registry = cache.get_value(key)
+    if registry is None:
+        registry = _load_attribute_registry()
+        cache.set_value(key, registry, expires_in_sec=REGISTRY_EXPIRY)
+
+    return registry
+
+
+def _load_attribute_registry():
+    rows = frappe.get_all(
+        "Attribute Value",
+        or_filters={flag: 1 for flag in ATTRIBUTE_FLAGS},
+        fields=["name", "parent_attribute_value", *ATTRIBUTE_FLAGS],
+    )
+
+    registry = {flag: [] for flag in ATTRIBUTE_FLAGS}
+    for row in sorted(rows, key=lambda row: row.name):
+        for flag in ATTRIBUTE_FLAGS:
+            if row.get(flag):
+                registry[flag].append([row.name, row.parent_attribute_value])
+
+    return registry
+
+
+def get_attribute_values(flag, parent=None, exclude=()):
+    """Sorted names of Attribute Values with `flag` set, optionally under `parent`"""
+    return [
+        name
+        for name, parent_attribute_value in get_attribute_registry().get(flag, [])
+        if (parent is None or parent_attribute_value == parent) and name not in exclude
+    ]
+
+
+def attribute_list(key, flag, parent=None, exclude=()):
+    """Attribute Values in the [{key: name}] shape returned by the filter endpoints"""
+    return [{key: name} for name in get_attribute_values(flag, parent, exclude)]
+
+
+def clear_attribute_registry():
+    # bumped once the Attribute Value is committed, so no worker caches the new version
+    # from the rows visible before the commit
+    frappe.db.after_commit.add(bump_registry_version)
+
+
+def bump_registry_version():
+    # a new version makes every worker load the registry again; old keys expire on their own
+    frappe.cache().set_value(REGISTRY_VERSION_KEY, frappe.generate_hash(length=10))
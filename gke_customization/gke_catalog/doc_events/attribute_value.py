@@ -0,0 +1,18 @@
+from gke_customization.gke_catalog.attribute_registry import clear_attribute_registry
+from gke_customization.gke_catalog.doctype.catalogue_counter.catalogue_counter import (
+    update_catalogue_counters, SUBCATEGORY
+)
+
+# the catalogue filter endpoints read Attribute Values from a cached registry
+
+def on_update(doc, method=None):
+    clear_attribute_registry()
+
+    # cat_count only counts items whose subcategory is flagged is_subcategory
+    before = doc.get_doc_before_save()
+    if before and before.is_subcategory != doc.is_subcategory:
+        update_catalogue_counters(SUBCATEGORY, [doc.name])
+
+
+def on_trash(doc, method=None):
+    clear_attribute_registry()
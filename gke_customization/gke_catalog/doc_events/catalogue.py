@@ -0,0 +1,52 @@
+import frappe
+from gke_customization.gke_catalog.doctype.catalogue_row.catalogue_row import (
+    update_catalogue_rows, mark_catalogue_rows_deleted
+)
+from gke_customization.gke_catalog.doctype.catalogue_counter.catalogue_counter import (
+    update_catalogue_counters, SUBCATEGORY, TEMPLATE
+)
+from gke_customization.gke_catalog.media import enqueue_derivatives, ITEM_IMAGE_FIELDS
+
+# keep the Catalogue Row read model and the Catalogue Counter table in step with Item and BOM
+
+def on_item_update(doc, method=None):
+    update_catalogue_rows([doc.name])
+
+    before = doc.get_doc_before_save()
+    enqueue_derivatives([
+        doc.get(field) for field in ITEM_IMAGE_FIELDS
+        if doc.get(field) and (not before or before.get(field) != doc.get(field))
+    ])
+
+    if before and before.item_subcategory == doc.item_subcategory and before.variant_of == doc.variant_of:
+        return
+
+    update_catalogue_counters(SUBCATEGORY, [doc.item_subcategory, before and before.item_subcategory])
+    update_catalogue_counters(TEMPLATE, [doc.variant_of, before and before.variant_of])
+
+
+def on_item_trash(doc, method=None):
+    mark_catalogue_rows_deleted({"item": doc.name})
+
+
+def on_item_after_delete(doc, method=None):
+    update_catalogue_counters(SUBCATEGORY, [doc.item_subcategory])
+    update_catalogue_counters(TEMPLATE, [doc.variant_of])
+
+
+def on_bom_update(doc, method=None):
+    update_catalogue_rows([doc.item])
+    update_bom_item_counters(doc)
+
+
+def on_bom_trash(doc, method=None):
+    mark_catalogue_rows_deleted({"bom": doc.name})
+
+
+def on_bom_after_delete(doc, method=None):
+    update_bom_item_counters(doc)
+
+
+def update_bom_item_counters(doc):
+    # serial_count of the item's subcategory depends on its active Finish Goods BOMs
+    update_catalogue_counters(SUBCATEGORY, [frappe.db.get_value("Item", doc.item, "item_subcategory")])
@@ -0,0 +1,7 @@
+from gke_customization.gke_catalog.media import enqueue_derivatives
+
+# catalogue thumbnails are rendered in the background when an image is attached to an Item
+
+def after_insert(doc, method=None):
+    if doc.attached_to_doctype == "Item" and doc.file_url:
+        enqueue_derivatives([doc.file_url])
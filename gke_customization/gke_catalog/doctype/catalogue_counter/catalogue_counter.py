@@ -0,0 +1,174 @@
+# Copyright (c) 2026, Gurukrupa Export and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now_datetime
+from gke_customization.gke_catalog.utils import chunked
+
+
+class CatalogueCounter(Document):
+	pass
+
+
+SUBCATEGORY = "Subcategory"
+TEMPLATE = "Template"
+
+COUNTER_FIELDS = ["item_count", "serial_count", "items"]
+
+
+def _subcategory_counts(keys=None):
+	"""cat_count aggregate, for all subcategories or only `keys`"""
+	condition = "AND item.item_subcategory IN %(keys)s" if keys else ""
+	return frappe.db.sql(
+		f"""
+		SELECT
+			item.item_subcategory AS counter_key,
+			COUNT(DISTINCT CASE
+				WHEN tav.is_subcategory = 1 AND item.item_subcategory IS NOT NULL THEN item.name
+				ELSE NULL
+			END) AS item_count,
+			COUNT(DISTINCT CASE
+				WHEN tav.is_subcategory = 1 AND item.item_subcategory IS NOT NULL
+					AND bom.bom_type = "Finish Goods" AND bom.is_active = 1 THEN item.name
+				ELSE NULL
+			END) AS serial_count,
+			NULL AS items
+		FROM `tabItem` AS item
+		JOIN `tabAttribute Value` AS tav ON item.item_subcategory = tav.name
+		LEFT JOIN `tabBOM` AS bom ON item.item_code = bom.item
+		WHERE ((tav.is_subcategory = 1 AND item.item_subcategory IS NOT NULL)
+			OR (bom.bom_type = "Finish Goods" AND bom.is_active = 1))
+			{condition}
+		GROUP BY item.item_subcategory
+		""",
+		{"keys": tuple(keys or ())},
+		as_dict=True,
+	)
+
+
+def _template_counts(keys=None):
+	"""var_count aggregate, for all templates or only `keys`"""
+	condition = "AND item.variant_of IN %(keys)s" if keys else ""
+	return frappe.db.sql(
+		f"""
+		SELECT
+			item.variant_of AS counter_key,
+			COUNT(item.name) AS item_count,
+			0 AS serial_count,
+			GROUP_CONCAT(DISTINCT item.name ORDER BY item.name) AS items
+		FROM `tabItem` AS item
+		WHERE item.variant_of IS NOT NULL {condition}
+		GROUP BY item.variant_of
+		""",
+		{"keys": tuple(keys or ())},
+		as_dict=True,
+	)
+
+
+COUNTER_QUERIES = {
+	SUBCATEGORY: _subcategory_counts,
+	TEMPLATE: _template_counts,
+}
+
+
+def _write_counters(counter_type, rows):
+	now = now_datetime()
+	user = frappe.session.user
+
+	for chunk in chunked(rows):
+		placeholders = ", ".join(["(%s, %s, %s, %s, 0, 0, %s, %s, %s, %s, %s)"] * len(chunk))
+		values = []
+		for row in chunk:
+			values.extend([
+				f"{counter_type}-{row.counter_key}", now, now, user, user,
+				counter_type, row.counter_key, row.item_count, row.serial_count, row.items,
+			])
+		# two workers may recompute the same key, so upsert instead of delete + insert
+		frappe.db.sql(
+			f"""
+			INSERT INTO `tabCatalogue Counter`
+				(name, creation, modified, modified_by, owner, docstatus, idx,
+				counter_type, counter_key, item_count, serial_count, items)
+			VALUES {placeholders}
+			ON DUPLICATE KEY UPDATE
+				modified = VALUES(modified),
+				modified_by = VALUES(modified_by),
+				item_count = VALUES(item_count),
+				serial_count = VALUES(serial_count),
+				items = VALUES(items)
+			""",
+			values,
+		)
+
+
+def update_catalogue_counters(counter_type, keys):
+	"""Recompute the counters of the given subcategories or templates"""
+	keys = tuple({key for key in keys if key})
+	if not keys:
+		return
+
+	rows = COUNTER_QUERIES[counter_type](keys)
+	_write_counters(counter_type, rows)
+
+	stale = set(keys) - {row.counter_key for row in rows}
+	if stale:
+		frappe.db.delete("Catalogue Counter", {"counter_type": counter_type, "counter_key": ["in", list(stale)]})
+
+
+def _sync_counters(counter_type):
+	"""Bring every counter of `counter_type` in line with a full recount and return the drift"""
+	expected = {row.counter_key: row for row in COUNTER_QUERIES[counter_type]()}
+	current = {
+		row.counter_key: row
+		for row in frappe.get_all(
+			"Catalogue Counter",
+			filters={"counter_type": counter_type},
+			fields=["counter_key", *COUNTER_FIELDS],
+		)
+	}
+
+	drift = []
+	for key in expected.keys() | current.keys():
+		row, counter = expected.get(key), current.get(key)
+		if row and counter and all(row[field] == counter[field] for field in COUNTER_FIELDS):
+			continue
+		drift.append({
+			"counter_type": counter_type,
+			"counter_key": key,
+			"expected": {field: row[field] for field in COUNTER_FIELDS} if row else None,
+			"actual": {field: counter[field] for field in COUNTER_FIELDS} if counter else None,
+		})
+
+	_write_counters(counter_type, [expected[entry["counter_key"]] for entry in drift if entry["expected"]])
+	stale = [entry["counter_key"] for entry in drift if not entry["expected"]]
+	if stale:
+		frappe.db.delete("Catalogue Counter", {"counter_type": counter_type, "counter_key": ["in", stale]})
+
+	return drift
+
+
+@frappe.whitelist()
+def reconcile_catalogue_counters():
+	"""
+	Recount all subcategory and template counters, fix the ones that drifted
+	and log the differences. Runs daily.
+	"""
+	frappe.only_for("System Manager")
+
+	drift = []
+	for counter_type in COUNTER_QUERIES:
+		drift.extend(_sync_counters(counter_type))
+	frappe.db.commit()
+
+	if drift:
+		frappe.log_error(frappe.as_json(drift), "Catalogue Counter Drift")
+
+	return {"drift_count": len(drift), "drift": drift}
+
+
+def rebuild_catalogue_counters():
+	frappe.db.delete("Catalogue Counter")
+	for counter_type, query in COUNTER_QUERIES.items():
+		_write_counters(counter_type, query())
+	frappe.db.commit()
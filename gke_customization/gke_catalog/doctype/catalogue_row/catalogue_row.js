@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Gurukrupa Export and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Catalogue Row", {
+	// refresh: function(frm) {
+
+	// }
+});
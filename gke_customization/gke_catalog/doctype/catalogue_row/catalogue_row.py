@@ -0,0 +1,201 @@
+# Copyright (c) 2026, Gurukrupa Export and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from gke_customization.gke_catalog.facet_index import clear_facet_index
+from gke_customization.gke_catalog.utils import clear_cached_counts
+
+
+class CatalogueRow(Document):
+	pass
+
+
+def on_doctype_update():
+	# keyset pagination walks (item, bom)
+	frappe.db.add_index("Catalogue Row", ["item", "bom"])
+
+
+# Catalogue Row field -> expression over the Item/BOM joins used by the catalogue APIs
+CATALOGUE_ROW_COLUMNS = {
+	"item": "item.name",
+	"bom": "bom.name",
+	"is_active": "bom.is_active",
+	"bom_type": "bom.bom_type",
+	"company": "idf.company",
+	"item_creation": "item.creation",
+	"item_code": "item.item_code",
+	"item_category": "item.item_category",
+	"item_subcategory": "item.item_subcategory",
+	"setting_type": "item.setting_type",
+	"variant_of": "item.variant_of",
+	"tag_no": "bom.tag_no",
+	"image": "item.image",
+	"sketch_image": "item.sketch_image",
+	"cad_3d_image": "item.cad_3d_image",
+	"videos_3d_1": "item.`3d_videos_1`",
+	"gross_metal_weight": "FORMAT(bom.gross_weight,3)",
+	"net_metal_finding_weight": "FORMAT(bom.metal_and_finding_weight, 3)",
+	"total_diamond_weight_in_gms": "FORMAT(bom.total_diamond_weight_in_gms,3)",
+	"other_weight": "FORMAT(bom.other_weight,3)",
+	"finding_weight_": "FORMAT(bom.finding_weight_,3)",
+	"metal_colour": "bom.metal_colour",
+	"metal_purity": "bom.metal_purity",
+	"total_gemstone_weight_in_gms": "FORMAT(bom.total_gemstone_weight_in_gms,3)",
+	"total_diamond_pcs": "bom.total_diamond_pcs",
+	"total_gemstone_pcs": "bom.total_gemstone_pcs",
+	"gemstone_weight": "FORMAT(bom.gemstone_weight,3)",
+	"gold_diamond_ratio": "FORMAT(bom.gold_to_diamond_ratio,3)",
+	"diamond_ratio": "FORMAT(bom.diamond_ratio,3)",
+	"metal_diamond_ratio": "FORMAT(bom.metal_to_diamond_ratio_excl_of_finding,3)",
+	"navratna": "bom.navratna",
+	"height": "bom.height",
+	"length": "bom.length",
+	"width": "bom.width",
+	"breadth": "bom.breadth",
+	"product_size": "bom.product_size",
+	"sizer_type": "bom.sizer_type",
+	"design_style": "bom.design_style",
+	"nakshi_from": "bom.nakshi_from",
+	"vanki_type": "bom.vanki_type",
+	"total_length": "bom.total_length",
+	"detachable": "bom.detachable",
+	"back_side_size": "bom.back_side_size",
+	"changeable": "bom.changeable",
+	"variant_name": "GROUP_CONCAT(DISTINCT item.name)",
+	"design_attributes": "GROUP_CONCAT(DISTINCT td.design_attributes)",
+	"design_attributes_1": "GROUP_CONCAT(DISTINCT td.design_attribute_value_1)",
+	"metal_types": "GROUP_CONCAT(DISTINCT mt.metal_type)",
+	"metal_color": "GROUP_CONCAT(DISTINCT mt.metal_colour)",
+	"metal_purities": "GROUP_CONCAT(DISTINCT mt.metal_purity)",
+	"metal_touch": "GROUP_CONCAT(DISTINCT mt.metal_touch)",
+	"gemstone_shape": "GROUP_CONCAT(DISTINCT gd.stone_shape)",
+	"cut_or_cab": "GROUP_CONCAT(DISTINCT gd.cut_or_cab)",
+	"diamond_stone_shape": "GROUP_CONCAT(DISTINCT dd.stone_shape)",
+	"diamond_setting_type": "GROUP_CONCAT(DISTINCT dd.sub_setting_type)",
+	"diamond_sieve_size": "GROUP_CONCAT(DISTINCT dd.diamond_sieve_size)",
+	"size_in_mm": "GROUP_CONCAT(DISTINCT FORMAT(dd.size_in_mm,3))",
+	"sieve_size_range": "GROUP_CONCAT(DISTINCT dd.sieve_size_range)",
+	"finding_sub_category": "GROUP_CONCAT(DISTINCT fd.finding_category)",
+	"finding_size": "GROUP_CONCAT(DISTINCT FORMAT(fd.finding_size,3))",
+}
+
+
+def get_db_now():
+	"""
+	Timestamp of the database clock. Every Catalogue Row write is stamped with it, so
+	`modified` is ordered by one clock however many app servers write.
+	"""
+	return frappe.db.sql("SELECT NOW(6)")[0][0]
+
+
+def _insert_catalogue_rows(condition="", values=None):
+	"""
+	Aggregate the Item/BOM universe (or the part matching `condition`) into Catalogue Row.
+	Existing rows, tombstones included, are overwritten.
+	"""
+	values = dict(values or {})
+	values["user"] = frappe.session.user
+	values["now"] = get_db_now()
+
+	columns = ", ".join(f"`{column}`" for column in CATALOGUE_ROW_COLUMNS)
+	expressions = ",\n\t\t\t".join(CATALOGUE_ROW_COLUMNS.values())
+	updates = ",\n\t\t\t".join(f"`{column}` = VALUES(`{column}`)" for column in CATALOGUE_ROW_COLUMNS)
+
+	frappe.db.sql(
+		f"""
+		INSERT INTO `tabCatalogue Row`
+			(name, creation, modified, modified_by, owner, docstatus, idx, {columns})
+		SELECT
+			bom.name, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0,
+			{expressions}
+		FROM
+			`tabItem` AS item
+		JOIN
+			`tabBOM` AS bom ON item.item_code = bom.item
+		LEFT JOIN
+			`tabDesign Attributes` AS td ON item.item_code = td.parent
+		LEFT JOIN
+			`tabBOM Metal Detail` AS mt ON bom.name = mt.parent
+		LEFT JOIN
+			`tabBOM Gemstone Detail` AS gd ON bom.name = gd.parent
+		LEFT JOIN
+			`tabBOM Diamond Detail` AS dd ON bom.name = dd.parent
+		LEFT JOIN
+			`tabBOM Finding Detail` AS fd ON bom.name = fd.parent
+		LEFT JOIN
+			`tabItem Default` AS idf ON item.item_name = idf.parent
+		WHERE
+			bom.bom_type = 'Finish Goods' {condition}
+		GROUP BY
+			bom.name
+		ON DUPLICATE KEY UPDATE
+			modified = VALUES(modified),
+			modified_by = VALUES(modified_by),
+			is_deleted = 0,
+			{updates}
+		""",
+		values,
+	)
+
+
+def update_catalogue_rows(items):
+	"""
+	Recompute the catalogue rows of the given items.
+	BOMs that no longer qualify are kept as tombstones for delta sync.
+	"""
+	items = tuple({item for item in items if item})
+	if not items:
+		return
+
+	previous = frappe.get_all("Catalogue Row", filters={"item": ["in", items]}, fields=["name", "item"])
+
+	frappe.db.delete("Catalogue Row", {"item": ["in", items]})
+	# upserts: a BOM moved from another item, or an overlapping save, may already hold the row
+	_insert_catalogue_rows("AND item.name IN %(items)s", {"items": items})
+
+	current = set(frappe.get_all("Catalogue Row", filters={"item": ["in", items]}, pluck="name"))
+	_insert_tombstones([row for row in previous if row.name not in current])
+	clear_cached_counts()
+	clear_facet_index()
+
+
+def _insert_tombstones(rows):
+	if not rows:
+		return
+
+	now = get_db_now()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Catalogue Row",
+		fields=["name", "creation", "modified", "modified_by", "owner", "docstatus", "idx", "item", "bom", "is_deleted"],
+		values=[(row.name, now, now, user, user, 0, 0, row.item, row.name, 1) for row in rows],
+		ignore_duplicates=True,
+	)
+
+
+def mark_catalogue_rows_deleted(filters):
+	frappe.db.set_value("Catalogue Row", filters, {"is_deleted": 1, "is_active": 0}, modified=get_db_now())
+	clear_cached_counts()
+	clear_facet_index()
+
+
+@frappe.whitelist()
+def rebuild_catalogue_rows():
+	"""
+	Rebuild the whole catalogue read model from Item and BOM.
+	Tombstones are dropped, so sync clients older than the rebuild are asked for a full sync.
+	Use for recovery: bench --site <site> execute
+	gke_customization.gke_catalog.doctype.catalogue_row.catalogue_row.rebuild_catalogue_rows
+	"""
+	frappe.only_for("System Manager")
+
+	frappe.db.delete("Catalogue Row")
+	_insert_catalogue_rows()
+	frappe.db.set_global("catalogue_rebuilt_on", str(get_db_now()))
+	# registered before the commit, which runs the facet index bump
+	clear_facet_index()
+	frappe.db.commit()
+	clear_cached_counts()
+
+	return frappe.db.count("Catalogue Row")
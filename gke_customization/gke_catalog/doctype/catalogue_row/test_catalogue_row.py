@@ -0,0 +1,42 @@
+# Copyright (c) 2026, Gurukrupa Export and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gke_customization.gke_catalog.doctype.catalogue_row.catalogue_row import update_catalogue_rows
+
+ITEM_CODE = "_Test Catalogue Row Item"
+BOM_NAME = "BOM-_Test Catalogue Row Item-001"
+
+
+class TestCatalogueRow(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		# written without validation: only the rows read by the catalogue matter
+		frappe.get_doc({
+			"doctype": "Item",
+			"name": ITEM_CODE,
+			"item_code": ITEM_CODE,
+			"item_name": ITEM_CODE,
+		}).db_insert()
+		frappe.get_doc({
+			"doctype": "BOM",
+			"name": BOM_NAME,
+			"item": ITEM_CODE,
+			"is_active": 1,
+			"bom_type": "Finish Goods",
+		}).db_insert()
+		update_catalogue_rows([ITEM_CODE])
+
+	def test_item_and_bom_with_catalogue_rows_can_be_deleted(self):
+		self.assertTrue(frappe.db.exists("Catalogue Row", BOM_NAME))
+
+		frappe.delete_doc("BOM", BOM_NAME)
+		frappe.delete_doc("Item", ITEM_CODE)
+
+		self.assertFalse(frappe.db.exists("BOM", BOM_NAME))
+		self.assertFalse(frappe.db.exists("Item", ITEM_CODE))
+		# kept as a tombstone for delta sync
+		self.assertEqual(frappe.db.get_value("Catalogue Row", BOM_NAME, "is_deleted"), 1)
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, Gurukrupa Export and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class MediaDerivative(Document):
+	pass
+
+
+def on_doctype_update():
+	# one row per source image and size, even when upload jobs race
+	frappe.db.add_unique("Media Derivative", ["source_url", "size"], constraint_name="unique_source_url_size")
@@ -0,0 +1,224 @@
+import json
+
+import frappe
+from frappe import _
+
+# Catalogue Row fields browsable as facets
+FACET_FIELDS = [
+    "item_category",
+    "item_subcategory",
+    "setting_type",
+    "variant_of",
+    "metal_touch",
+    "metal_types",
+    "metal_color",
+    "metal_purities",
+    "gemstone_shape",
+    "diamond_stone_shape",
+    "diamond_setting_type",
+    "diamond_sieve_size",
+    "sieve_size_range",
+    "finding_sub_category",
+    "design_attributes",
+    "design_attributes_1",
+]
+
+# GROUP_CONCAT columns of Catalogue Row, one row can carry several values
+MULTI_VALUE_FIELDS = {
+    "metal_touch",
+    "metal_types",
+    "metal_color",
+    "metal_purities",
+    "gemstone_shape",
+    "diamond_stone_shape",
+    "diamond_setting_type",
+    "diamond_sieve_size",
+    "sieve_size_range",
+    "finding_sub_category",
+    "design_attributes",
+    "design_attributes_1",
+}
+
+# facets with thousands of values, one per row: kept as sorted position lists instead of
+# bitmaps, which would each be as wide as the catalogue
+SPARSE_FIELDS = {"variant_of"}
+
+FACET_INDEX_VERSION_KEY = "gke_facet_index_version"
+
+# site -> (version, FacetIndex), built once per worker and version
+_indexes = {}
+
+
+class FacetIndex:
+    """
+        One bitmap per facet value over the catalogue rows. Rows are numbered in
+        catalogue order (item desc, bom desc) and a bitmap is a python int with bit n
+        set when row n carries the value, so filters and counts are int `&` / `|`.
+        SPARSE_FIELDS keep the positions of each value and the value of each row instead.
+    """
+
+    def __init__(self, rows):
+        self.boms = [row.bom for row in rows]
+        self.size = len(rows)
+        self.everything = (1 << len(rows)) - 1
+
+        positions = {field: {} for field in FACET_FIELDS}
+        for position, row in enumerate(rows):
+            for field in FACET_FIELDS:
+                for value in split_value(field, row.get(field)):
+                    positions[field].setdefault(value, []).append(position)
+
+        self.bitmaps = {
+            field: {value: to_bitmap(value_positions, len(rows)) for value, value_positions in values.items()}
+            for field, values in positions.items()
+            if field not in SPARSE_FIELDS
+        }
+        self.postings = {field: positions[field] for field in SPARSE_FIELDS}
+        self.row_values = {field: [row.get(field) for row in rows] for field in SPARSE_FIELDS}
+
+    def select(self, field, values):
+        """Rows carrying any of `values` of `field`"""
+        if field in SPARSE_FIELDS:
+            postings = self.postings[field]
+            return to_bitmap([position for value in values for position in postings.get(value, [])], self.size)
+
+        bitmaps = self.bitmaps[field]
+        selected = 0
+        for value in values:
+            selected |= bitmaps.get(value, 0)
+        return selected
+
+    def match(self, filters, skip=None):
+        """Rows having any of the values of every facet in `filters`, `skip` left out"""
+        result = self.everything
+        for field, values in filters.items():
+            if field != skip:
+                result &= self.select(field, values)
+
+        return result
+
+    def facet_counts(self, filters):
+        """
+            {facet: {value: rows}} for the current selection. A facet is counted
+            without its own filter so the other values of that facet stay visible.
+        """
+        counts = {}
+        for field in FACET_FIELDS:
+            matched = self.match(filters, skip=field)
+            field_counts = {}
+            if field in SPARSE_FIELDS:
+                row_values = self.row_values[field]
+                for position in iter_positions(matched):
+                    value = row_values[position]
+                    if value:
+                        field_counts[value] = field_counts.get(value, 0) + 1
+            else:
+                for value, bitmap in self.bitmaps[field].items():
+                    count = (bitmap & matched).bit_count()
+                    if count:
+                        field_counts[value] = count
+            counts[field] = field_counts
+
+        return counts
+
+    def page(self, bitmap, start=0, page_size=20):
+        """BOM names of the set bits `start` .. `start + page_size` of `bitmap`, in catalogue order"""
+        bits = bin(bitmap)[:1:-1]  # least significant bit first
+        position = bits.find("1")
+        skipped = 0
+        while position >= 0 and skipped < start:
+            position = bits.find("1", position + 1)
+            skipped += 1
+
+        boms = []
+        while position >= 0 and len(boms) < page_size:
+            boms.append(self.boms[position])
+            position = bits.find("1", position + 1)
+
+        return boms
+
+    def search(self, filters, start=0, page_size=20):
+        matched = self.match(filters)
+        return {
+            "boms": self.page(matched, start, page_size),
+            "total_count": matched.bit_count(),
+            "facets": self.facet_counts(filters),
+        }
+
+
+def split_value(field, value):
+    if not value:
+        return []
+    if field in MULTI_VALUE_FIELDS:
+        return [part for part in value.split(",") if part]
+    return [value]
+
+
+def iter_positions(bitmap):
+    """Set bits of `bitmap`, least significant first"""
+    bits = bin(bitmap)[:1:-1]
+    position = bits.find("1")
+    while position >= 0:
+        yield position
+        position = bits.find("1", position + 1)
+
+
+def to_bitmap(positions, size):
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def get_facet_index():
+    """Facet index of the catalogue rows listed by catalogue_data, rebuilt when Catalogue Row changes"""
+    version = frappe.cache().get_value(FACET_INDEX_VERSION_KEY) or 0
+
+    cached = _indexes.get(frappe.local.site)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    rows = frappe.get_all(
+        "Catalogue Row",
+        filters={"bom_type": "Finish Goods", "is_deleted": 0},
+        fields=["bom", *FACET_FIELDS],
+        order_by="item desc, bom desc",
+    )
+    index = FacetIndex(rows)
+    _indexes[frappe.local.site] = (version, index)
+
+    return index
+
+
+def parse_facet_filters(filters):
+    """{facet: value or [values]} from the request, validated against FACET_FIELDS"""
+    if not filters:
+        return {}
+
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+
+    invalid = [field for field in filters if field not in FACET_FIELDS]
+    if invalid:
+        frappe.throw(_("Unknown facets: {0}").format(", ".join(invalid)))
+
+    parsed = {}
+    for field, values in filters.items():
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        values = [value for value in values if value]
+        if values:
+            parsed[field] = values
+
+    return parsed
+
+
+def clear_facet_index():
+    # bumped once the Catalogue Rows are committed; a worker rebuilding before that would
+    # keep the old rows under the new version
+    frappe.db.after_commit.add(bump_facet_index_version)
+
+
+def bump_facet_index_version():
+    # workers compare versions on the next search and rebuild their copy
+    frappe.cache().set_value(FACET_INDEX_VERSION_KEY, frappe.generate_hash(length=10))
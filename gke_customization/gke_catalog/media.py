@@ -0,0 +1,194 @@
+import hashlib
+import io
+import os
+from urllib.parse import unquote
+
+import frappe
+from PIL import Image, ImageOps
+from gke_customization.gke_catalog.utils import chunked, get_child_rows
+
+# derivative size -> longest side in pixels
+DERIVATIVE_SIZES = {
+    "thumbnail": 240,
+    "medium": 800,
+}
+WEBP_QUALITY = 80
+
+# public folder of the derivative files, named by content hash and size
+DERIVATIVE_FOLDER = "catalogue_derivatives"
+
+# Item fields holding catalogue images; 3d_videos_1 is served as is
+ITEM_IMAGE_FIELDS = ["image", "sketch_image", "cad_3d_image"]
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+
+
+def get_source_path(file_url):
+    """
+        Local path of an uploaded public image, None for external, private or non-image urls.
+        Derivatives are public files, so private images get none.
+    """
+    if not file_url or not file_url.lower().endswith(IMAGE_EXTENSIONS):
+        return None
+
+    if file_url.startswith("/files/"):
+        path = frappe.get_site_path("public", "files", unquote(file_url[len("/files/"):]))
+    else:
+        return None
+
+    return path if os.path.isfile(path) else None
+
+
+def get_derivative_url(content_hash, size):
+    return f"/files/{DERIVATIVE_FOLDER}/{content_hash}-{size}.webp"
+
+
+def get_derivative_path(content_hash, size):
+    return frappe.get_site_path("public", "files", DERIVATIVE_FOLDER, f"{content_hash}-{size}.webp")
+
+
+def open_image(content):
+    image = Image.open(io.BytesIO(content))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def write_derivative(image, content_hash, size):
+    derivative = image.copy()
+    derivative.thumbnail((DERIVATIVE_SIZES[size], DERIVATIVE_SIZES[size]))
+
+    path = get_derivative_path(content_hash, size)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    derivative.save(path, "WEBP", quality=WEBP_QUALITY, method=4)
+
+    return derivative.width, derivative.height
+
+
+def generate_derivatives(file_url):
+    """
+        Create the missing WebP derivatives of an uploaded image.
+        The source is hashed first; derivatives already rendered for the same content
+        are reused, so an image attached to many Items is resized once.
+    """
+    path = get_source_path(file_url)
+    if not path:
+        return
+
+    derivatives = {
+        row.size: row
+        for row in frappe.get_all("Media Derivative", filters={"source_url": file_url}, fields=["name", "size", "content_hash"])
+    }
+
+    with open(path, "rb") as f:
+        content = f.read()
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    image = None
+    for size in DERIVATIVE_SIZES:
+        row = derivatives.get(size)
+        derivative_path = get_derivative_path(content_hash, size)
+        if row and row.content_hash == content_hash and os.path.isfile(derivative_path):
+            continue
+
+        shared = frappe.db.get_value(
+            "Media Derivative", {"content_hash": content_hash, "size": size}, ["width", "height"], as_dict=True
+        )
+        if shared and os.path.isfile(derivative_path):
+            width, height = shared.width, shared.height
+        else:
+            if image is None:
+                image = open_image(content)
+            width, height = write_derivative(image, content_hash, size)
+
+        values = {
+            "content_hash": content_hash,
+            "width": width,
+            "height": height,
+            "file_url": get_derivative_url(content_hash, size),
+        }
+        if not row:
+            try:
+                frappe.get_doc({"doctype": "Media Derivative", "source_url": file_url, "size": size, **values}).insert(
+                    ignore_permissions=True
+                )
+                continue
+            except (frappe.DuplicateEntryError, frappe.UniqueValidationError):
+                # another job inserted the (source_url, size) row first; update it instead
+                row = frappe._dict(name=frappe.db.get_value("Media Derivative", {"source_url": file_url, "size": size}))
+
+        frappe.db.set_value("Media Derivative", row.name, values)
+
+
+def generate_derivatives_for(file_urls):
+    # background job; one broken image must not stop the batch
+    for file_url in file_urls:
+        try:
+            generate_derivatives(file_url)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), f"Media Derivative: {file_url}")
+
+
+def enqueue_derivatives(file_urls):
+    file_urls = [file_url for file_url in dict.fromkeys(file_urls) if get_source_path(file_url)]
+    for chunk in chunked(file_urls, 100):
+        frappe.enqueue(
+            "gke_customization.gke_catalog.media.generate_derivatives_for",
+            queue="long",
+            file_urls=chunk,
+            enqueue_after_commit=True,
+        )
+
+
+@frappe.whitelist()
+def regenerate_missing_derivatives(now=False):
+    """
+        Generate derivatives for every Item image that has none, or whose files are gone.
+        bench --site <site> execute gke_customization.gke_catalog.media.regenerate_missing_derivatives --kwargs "{'now': 1}"
+    """
+    frappe.only_for("System Manager")
+
+    items = frappe.get_all("Item", fields=ITEM_IMAGE_FIELDS)
+    file_urls = {item[field] for item in items for field in ITEM_IMAGE_FIELDS if item[field]}
+
+    derivatives = get_child_rows("Media Derivative", file_urls, ["size", "content_hash"], order_by="size asc", key="source_url")
+    missing = [
+        file_url
+        for file_url in sorted(file_urls)
+        if {row.size for row in derivatives.get(file_url, [])} != set(DERIVATIVE_SIZES)
+        or any(not os.path.isfile(get_derivative_path(row.content_hash, row.size)) for row in derivatives[file_url])
+    ]
+
+    if frappe.utils.cint(now):
+        generate_derivatives_for(missing)
+    else:
+        enqueue_derivatives(missing)
+
+    return len(missing)
+
+
+def add_derivative_urls(rows, keys=ITEM_IMAGE_FIELDS):
+    """
+        Add `<key>_thumbnail` / `<key>_medium` urls next to each image key present in `rows`.
+        Images without derivatives yet get None and clients fall back to the original.
+    """
+    keys = [key for key in keys if any(key in row for row in rows)]
+    if not keys:
+        return rows
+
+    file_urls = {row.get(key) for row in rows for key in keys if row.get(key)}
+    derivatives = get_child_rows("Media Derivative", file_urls, ["size", "file_url"], order_by="size asc", key="source_url")
+
+    for row in rows:
+        for key in keys:
+            if key not in row:
+                continue
+            urls = {derivative.size: derivative.file_url for derivative in derivatives.get(row[key], [])}
+            for size in DERIVATIVE_SIZES:
+                row[f"{key}_{size}"] = urls.get(size)
+
+    return rows
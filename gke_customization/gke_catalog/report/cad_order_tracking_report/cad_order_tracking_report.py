@@ -212,16 +212,15 @@ def enrich_assignment_dates(orders, order_names):
     
     query = """
         SELECT 
-            docname as order_name,
-            DATE_FORMAT(MIN(creation), '%%d-%%m-%%Y %%H:%%i:%%s') as assign_date
+            `order` as order_name,
+            DATE_FORMAT(MIN(transition_time), '%%d-%%m-%%Y %%H:%%i:%%s') as assign_date
         FROM 
-            `tabVersion`
+            `tabOrder Workflow Transition`
         WHERE 
-            ref_doctype = 'Order'
-            AND docname IN %(order_names)s
-            AND data LIKE '%%Assigned%%'
+            `order` IN %(order_names)s
+            AND to_state = 'Assigned'
         GROUP BY 
-            docname
+            `order`
     """
     
     data = frappe.db.sql(query, {"order_names": order_names}, as_dict=1)
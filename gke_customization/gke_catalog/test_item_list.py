@@ -0,0 +1,76 @@
+# Copyright (c) 2026, Gurukrupa Export and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gke_customization.gke_catalog.api.item_list import get_bom_list
+from gke_customization.gke_catalog.utils import encode_cursor
+
+ITEM_PREFIX = "_Test BOM List Item"
+BOM_COUNT = 110
+
+# BOM table field -> (child doctype, row)
+CHILD_ROWS = {
+    "metal_detail": ("BOM Metal Detail", {"metal_type": "Gold", "metal_touch": "18KT", "metal_colour": "Yellow"}),
+    "diamond_detail": ("BOM Diamond Detail", {"stone_shape": "Round", "sieve_size_range": "+2-6.5"}),
+    "gemstone_detail": ("BOM Gemstone Detail", {"stone_shape": "Oval", "cut_or_cab": "Cut"}),
+    "finding_detail": ("BOM Finding Detail", {"finding_type": "Lock", "finding_size": 1}),
+}
+
+
+class TestItemList(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # written without validation: only the rows read by get_bom_list matter
+        for index in range(BOM_COUNT):
+            item_code = f"{ITEM_PREFIX} {index:03}"
+            frappe.get_doc({
+                "doctype": "Item",
+                "name": item_code,
+                "item_code": item_code,
+                "item_name": item_code,
+            }).db_insert()
+
+            bom = frappe.get_doc({
+                "doctype": "BOM",
+                "name": f"BOM-{item_code}",
+                "item": item_code,
+                "is_active": 1,
+                "bom_type": "Finished Goods",
+            })
+            for table_field, (child_doctype, row) in CHILD_ROWS.items():
+                for idx in (1, 2):
+                    bom.append(table_field, {"doctype": child_doctype, "idx": idx, **row})
+            bom.db_insert()
+            for child in bom.get_all_children():
+                child.db_insert()
+
+    def get_page(self, page_size):
+        return get_bom_list(cursor=encode_cursor(ITEM_PREFIX, ""), page_size=page_size)
+
+    def count_queries(self, page_size):
+        with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+            response = self.get_page(page_size)
+        return sql.call_count, response
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        # warms the meta and total count caches
+        self.get_page(10)
+
+        small_count, small = self.count_queries(10)
+        large_count, large = self.count_queries(100)
+
+        self.assertEqual(len(small["data"]), 10)
+        self.assertEqual(len(large["data"]), 100)
+        self.assertEqual(small_count, large_count)
+
+    def test_child_rows_are_attached(self):
+        row = self.get_page(10)["data"][0]
+        self.assertEqual(row["item"], f"{ITEM_PREFIX} 000")
+        for key in ("metal_details", "diamond_details", "gemstone_details", "finding_details"):
+            self.assertEqual(len(row[key]), 2)
+        self.assertEqual(row["metal_details"][0]["metal_touch"], "18KT")
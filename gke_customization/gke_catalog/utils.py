@@ -0,0 +1,108 @@
+import base64
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+from collections import defaultdict
+from werkzeug.wrappers import Response
+
+# number of parent names sent in one `IN (...)` clause
+CHUNK_SIZE = 500
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# redis hash holding the total-count hints of the paginated catalogue endpoints
+CATALOGUE_COUNT_KEY = "gke_catalogue_count"
+
+
+def chunked(values, size=CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def get_child_rows(doctype, parents, fields, order_by="idx asc", filters=None, key="parent"):
+    """
+        Fetch rows of `doctype` for all `parents` in fixed-size chunks
+        and return them grouped as {parent: [rows]}
+    """
+    grouped = defaultdict(list)
+    parents = {p for p in parents if p}
+    if not parents:
+        return grouped
+
+    keep_key = key in fields
+    query_fields = list(fields) if keep_key else [key, *fields]
+
+    for chunk in chunked(sorted(parents)):
+        chunk_filters = dict(filters or {})
+        chunk_filters[key] = ["in", chunk]
+        rows = frappe.get_all(doctype, filters=chunk_filters, fields=query_fields, order_by=order_by)
+        for row in rows:
+            parent = row[key] if keep_key else row.pop(key)
+            grouped[parent].append(row)
+
+    return grouped
+
+
+def get_page_size(page_size):
+    return min(cint(page_size) or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+
+def encode_cursor(*values):
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        frappe.throw(_("Invalid cursor"))
+
+
+def parse_fields(fields, allowed):
+    """Validate the `fields` projection (JSON list or comma separated) against `allowed`"""
+    if not fields:
+        return list(allowed)
+
+    if isinstance(fields, str):
+        fields = frappe.parse_json(fields) if fields.strip().startswith("[") else fields.split(",")
+
+    fields = [field.strip() for field in fields if field and field.strip()]
+    invalid = [field for field in fields if field not in allowed]
+    if invalid:
+        frappe.throw(_("Unknown fields: {0}").format(", ".join(invalid)))
+
+    return fields
+
+
+def get_cached_count(name, count_fn):
+    """Total-count hint, computed once and kept until Item/BOM data changes"""
+    count = frappe.cache().hget(CATALOGUE_COUNT_KEY, name)
+    if count is None:
+        count = count_fn()
+        frappe.cache().hset(CATALOGUE_COUNT_KEY, name, count)
+    return count
+
+
+def clear_cached_counts():
+    frappe.cache().delete_value(CATALOGUE_COUNT_KEY)
+
+
+def stream_json(rows, chunk_size=500):
+    """Yield the {"message": [...]} body for `rows` a chunk at a time"""
+    yield '{"message": ['
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        yield ("," if start else "") + ",".join(frappe.as_json(row, indent=None) for row in chunk)
+    yield "]}"
+
+
+def json_response(rows):
+    """
+        Streamed JSON response, returned as is by whitelisted methods.
+        Rows must be fully loaded: the body is written after the request has released the database.
+    """
+    return Response(stream_json(list(rows)), mimetype="application/json")
@@ -11,24 +11,37 @@ from frappe import json
 from frappe.utils import flt
 from frappe.utils import now,getdate
 from frappe.model.document import Document
+from frappe.model.naming import getseries
 from forex_python.converter import CurrencyRates
 import requests
 from bs4 import BeautifulSoup
 
 
+def get_sequence_series(year):
+    return f"SC-{year}-"
+
+
+def seed_sequence_series():
+    """Move every year's counter up to the highest sequence used in that year"""
+    for row in frappe.db.sql("""
+        select year, max(cast(sequence as unsigned)) as sequence
+        from `tabSolitaire Calculator`
+        where ifnull(year, '') != ''
+        group by year
+    """, as_dict=1):
+        frappe.db.sql("""
+            insert into `tabSeries` (name, current) values (%s, %s)
+            on duplicate key update current = greatest(current, values(current))
+        """, (get_sequence_series(row.year), row.sequence or 0))
+
+
 class SolitaireCalculator(Document):
     def before_insert(self):
         current_date = getdate()
         current_year = current_date.year
         self.year = current_year
-        max_sequence = frappe.db.get_list("Solitaire Calculator", pluck="sequence")
-        max_sequence.sort()
-        if max_sequence:
-            sequence = int(max_sequence[-1]) + 1
-            sequence = f"{sequence:04}"
-        else:
-            sequence = '0001'
-        self.sequence = sequence
+        # per-year counter in tabSeries, incremented under a row lock
+        self.sequence = getseries(get_sequence_series(current_year), 4)
     
     def before_save(self):
         rate = flt(self.rate) or 0
@@ -0,0 +1,113 @@
+import frappe
+from frappe import _
+
+DOMAINS_KEY = "gke_item_attribute_domains"
+DOMAINS_VERSION_KEY = "gke_item_attribute_domains_version"
+DOMAINS_EXPIRY = 24 * 60 * 60
+
+# Order Form Detail field -> Item Attribute holding its allowed values
+ORDER_FORM_ATTRIBUTE_FIELDS = {
+    "design_type": "Design Type",
+    "diamond_quality": "Diamond Quality",
+    "setting_type": "Setting Type",
+    "sub_setting_type1": "Sub Setting Type1",
+    "sub_setting_type2": "Sub Setting Type2",
+    "metal_type": "Metal Type",
+    "metal_touch": "Metal Touch",
+    "metal_colour": "Metal Colour",
+    "diamond_type": "Diamond Type",
+    "sizer_type": "Sizer Type",
+    "stone_changeable": "Stone Changeable",
+    "feature": "Feature",
+    "rhodium": "Rhodium",
+    "enamal": "Enamal",
+    "gemstone_type": "Gemstone Type",
+    "gemstone_quality": "Gemstone Quality",
+    "mod_reason": "Mod Reason",
+    "finding_category": "Finding Category",
+    "finding_subcategory": "Finding Sub-Category",
+    "finding_size": "Finding Size",
+    "metal_target_from_range": "Metal Target Range",
+    "diamond_target_from_range": "Diamond Target Range",
+    "detachable": "Detachable",
+    "lock_type": "Lock Type",
+    "capganthan": "Cap/Ganthan",
+    "charm": "Charm",
+    "back_chain": "Back Chain",
+    "back_belt": "Back Belt",
+    "black_bead": "Black Bead",
+    "two_in_one": "2 in 1",
+    "chain_type": "Chain Type",
+    "nakshi_from": "Nakshi From",
+}
+
+
+def get_attribute_domains():
+    """
+        {Item Attribute: set of attribute values}, loaded with one query, kept in redis under
+        the current version and held on frappe.flags for the rest of the request
+    """
+    if frappe.flags.item_attribute_domains is not None:
+        return frappe.flags.item_attribute_domains
+
+    cache = frappe.cache()
+    version = cache.get_value(DOMAINS_VERSION_KEY) or 0
+    key = f"{DOMAINS_KEY}:{version}"
+
+    domains = cache.get_value(key)
+    if domains is None:
+        domains = _load_attribute_domains()
+        cache.set_value(key, domains, expires_in_sec=DOMAINS_EXPIRY)
+
+    frappe.flags.item_attribute_domains = {attribute: set(values) for attribute, values in domains.items()}
+    return frappe.flags.item_attribute_domains
+
+
+def _load_attribute_domains():
+    domains = {}
+    for row in frappe.get_all(
+        "Item Attribute Value",
+        filters={"parenttype": "Item Attribute"},
+        fields=["parent", "attribute_value"],
+        order_by="parent asc, idx asc",
+    ):
+        domains.setdefault(row.parent, []).append(row.attribute_value)
+    return domains
+
+
+def get_invalid_values(rows, fields=ORDER_FORM_ATTRIBUTE_FIELDS):
+    """(row, fieldname, attribute) for every set value of `rows` outside its Item Attribute"""
+    domains = get_attribute_domains()
+    invalid = []
+    for row in rows:
+        for fieldname, attribute in fields.items():
+            value = row.get(fieldname)
+            if value and value not in domains.get(attribute, ()):
+                invalid.append((row, fieldname, attribute))
+    return invalid
+
+
+def validate_attribute_values(rows, fields=ORDER_FORM_ATTRIBUTE_FIELDS):
+    """Throw once, listing every invalid cell"""
+    invalid = get_invalid_values(rows, fields)
+    if not invalid:
+        return
+
+    messages = [
+        _("Row #{0}: {1} {2} is not Correct").format(row.idx, _(attribute), frappe.bold(row.get(fieldname)))
+        for row, fieldname, attribute in invalid
+    ]
+    frappe.throw("<br>".join(messages), title=_("Invalid Attribute Values"))
+
+
+def clear_attribute_domains(doc=None, method=None):
+    # doc event on Item Attribute. The version is bumped once the values are committed, so no
+    # worker caches the new version from the rows visible before the commit; this request
+    # sees its own changes and drops its copy now.
+    frappe.db.after_commit.add(bump_domains_version)
+    frappe.flags.item_attribute_domains = None
+
+
+def bump_domains_version():
+    # a new version makes every worker load the domains again
+    frappe.cache().set_value(DOMAINS_VERSION_KEY, frappe.generate_hash(length=10))
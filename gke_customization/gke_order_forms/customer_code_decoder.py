@@ -0,0 +1,367 @@
+from functools import partial
+
+import frappe
+from frappe import _
+from gke_customization.gke_catalog.utils import chunked
+from gke_customization.gke_order_forms.order_form_export import get_tolerance_data, set_tolerance
+
+DECODER_VERSION_KEY = "gke_customer_code_decoder_version"
+
+# (site, customer) -> (version, CustomerCodeDecoder), built once per worker and version
+_decoders = {}
+
+DESIGN_SHEET_FIELDS = [
+    "design_code", "bom", "item_category", "item_subcategory", "setting_type",
+    "metal_type", "metal_colour", "design_image", "serial_no",
+]
+
+BOM_DETAIL_FIELDS = [
+    "feature", "metal_target", "diamond_target", "product_size", "chain", "rhodium",
+    "diamond_weight", "metal_and_finding_weight",
+]
+
+CODE_FORMATS = ("digit14", "digit18", "digit15", "sku", "theme")
+
+# Customer Order Form Detail field -> code format it holds
+ROW_CODE_FIELDS = {"digit14_code": "digit14", "digit18_code": "digit18", "digit15_code": "digit15", "sku_code": "sku"}
+
+
+class ThemeCodeNotFoundError(frappe.ValidationError):
+    pass
+
+
+class CustomerCodeDecoder:
+    """
+        Decoding tables of one customer: the code tables of Customer Attributes, theme codes,
+        Customer Design Information Sheets, size masters and diamond tolerance, each loaded
+        with one query. Item categories and template BOMs are read per batch by ItemDetails.
+    """
+
+    def __init__(self, customer):
+        self.customer = customer
+
+        self.metal_touch = self._codes("Customer Metal Touch Detail", "code_touch", "gk_metal_touch")
+        self.metal_type = self._codes("Customer Metal Type Detail", "code_type", "gk_metal_type")
+        self.metal_color = self._codes("Customer Metal Color Detail", "code_color", "gk_metal_color")
+        self.finding = self._codes("Customer Finding Detail", "code_finding", "description_finding")
+        self.prolif = self._codes("Customer Prolif Detail", "code_prolif", "gk_d")
+
+        self.theme_codes = {}
+        for row in frappe.get_all(
+            "Item Theme Code Detail", filters={"customer": customer}, fields=["theme_code", "parent"]
+        ):
+            self.theme_codes.setdefault(row.theme_code, row.parent)
+
+        self.design_sheets = {}
+        for row in frappe.get_all(
+            "Customer Design Information Sheet", filters={"customer_code": customer}, fields=DESIGN_SHEET_FIELDS
+        ):
+            self.design_sheets.setdefault(row.design_code, row)
+
+        self.titan_sizes = self._sizes("Titan Size Master", ["code", "item_category", "country"])
+        self.reliance_sizes = self._sizes("Reliance Size Master", ["code", "item_category"])
+        self.novel_sizes = self._sizes("Novel Size Master", ["code", "item_category"])
+
+        self.tolerance_data = get_tolerance_data(customer)
+
+    def _codes(self, doctype, code_field, value_field):
+        codes = {}
+        for row in frappe.get_all(
+            doctype, filters={"parent": self.customer}, fields=[code_field, value_field], order_by="idx asc"
+        ):
+            codes.setdefault(row[code_field], row[value_field])
+        return codes
+
+    def _sizes(self, doctype, key_fields):
+        sizes = {}
+        for row in frappe.get_all(
+            doctype, filters={"customer": self.customer}, fields=key_fields + ["product_size"]
+        ):
+            sizes.setdefault(tuple(row[field] for field in key_fields), row.product_size)
+        return sizes
+
+    def get_design_code(self, theme_code):
+        design_code = self.theme_codes.get(theme_code)
+        if not design_code:
+            raise ThemeCodeNotFoundError(_("Please Set the Theme code <b>{0}</b> in Item ").format(theme_code))
+        return design_code
+
+    def get_code_design(self, code, code_format):
+        """Design code a code resolves to, None when the code is too short to hold a theme code"""
+        theme_code = {
+            "digit14": lambda: len(code) > 2 and code[2:9],
+            "digit18": lambda: len(code) > 3 and code[2:11],
+            "digit15": lambda: len(code) > 13 and code[8:15],
+            "sku": lambda: len(code) > 7 and code[0:7],
+            "theme": lambda: code,
+        }[code_format]()
+        return self.theme_codes.get(theme_code) if theme_code else None
+
+    def set_design_detail(self, data_json, design_code, details, sheet_fields, bom_fields=BOM_DETAIL_FIELDS[:6]):
+        design_sheet = self.design_sheets.get(design_code)
+        if not design_sheet:
+            return
+
+        data_json["bom"] = design_sheet.bom
+        for field in sheet_fields:
+            data_json[field] = design_sheet[field]
+
+        bom_detail = details.get_bom(design_code, design_sheet.bom)
+        if bom_detail:
+            for field in bom_fields:
+                data_json[field] = bom_detail[field]
+
+    def decode_digit14(self, code, details):
+        data_json = {}
+        if len(code) > 1:
+            data_json["metal_touch"] = self.metal_touch.get(code[:2])
+
+        design_code = ""
+        if len(code) > 2:
+            data_json["theme_code"] = code[2:9]
+            design_code = data_json["design_code"] = self.get_design_code(code[2:9])
+            self.set_design_detail(data_json, design_code, details, [
+                "item_category", "item_subcategory", "setting_type", "metal_type", "metal_colour", "design_image", "serial_no",
+            ])
+
+        if design_code:
+            if len(code) > 9:
+                country = "United States" if code[0] == "U" else "India"
+                data_json["size_data"] = self.titan_sizes.get((code[9], details.get_category(design_code), country))
+            if len(code) > 10:
+                data_json["finding_data"] = self.finding.get(code[10]) or ""
+            if len(code) > 12:
+                data_json["stone_data"] = self.prolif.get(code[12:14]) or ""
+
+        return data_json
+
+    def decode_digit18(self, code, details):
+        data_json = {}
+        if len(code) > 1:
+            data_json["metal_touch"] = self.metal_touch.get(code[0])
+        if len(code) > 2:
+            data_json["metal_type"] = self.metal_type.get(code[1])
+
+        design_code = ""
+        if len(code) > 3:
+            data_json["theme_code"] = code[2:11]
+            design_code = data_json["design_code"] = self.get_design_code(code[2:11])
+            self.set_design_detail(data_json, design_code, details, [
+                "item_category", "item_subcategory", "setting_type", "design_image", "serial_no",
+            ])
+
+        if design_code:
+            if len(code) > 11:
+                data_json["size_data"] = self.reliance_sizes.get((code[11:13], details.get_category(design_code)))
+            if len(code) > 13:
+                data_json["finding_data"] = self.finding.get(code[13:15]) or ""
+            if len(code) > 15:
+                data_json["metal_color"] = self.metal_color.get(code[15]) or ""
+            if len(code) > 16:
+                data_json["stone_data"] = self.prolif.get(code[16:18]) or ""
+
+        return data_json
+
+    def decode_digit15(self, code, details):
+        data_json = {}
+        if len(code) > 1 and code[0] == "D":
+            data_json["product_type"] = "Studded - DIS"
+        if len(code) > 2:
+            data_json["metal_touch"] = self.metal_touch.get(code[1])
+
+        design_code = ""
+        if len(code) > 13:
+            data_json["theme_code"] = code[8:15]
+            design_code = data_json["design_code"] = self.get_design_code(code[8:15])
+            self.set_design_detail(data_json, design_code, details, [
+                "item_category", "item_subcategory", "setting_type", "metal_type", "design_image", "serial_no",
+            ])
+
+        if design_code and len(code) > 2:
+            data_json["size_data"] = self.novel_sizes.get((code[2], details.get_category(design_code)))
+        if len(code) > 3:
+            data_json["metal_color"] = self.metal_color.get(code[3]) or ""
+        if len(code) > 4:
+            data_json["finding_data"] = self.finding.get(code[4]) or ""
+        if len(code) > 6:
+            data_json["stone"] = self.prolif.get(code[5:7]) or ""
+
+        return data_json
+
+    def decode_sku(self, code, details):
+        data_json = {}
+        if len(code) > 7:
+            data_json["theme_code"] = code[0:7]
+            design_code = data_json["design_code"] = self.get_design_code(code[0:7])
+            self.set_design_detail(data_json, design_code, details, [
+                "item_category", "item_subcategory", "setting_type", "metal_type", "design_image", "serial_no",
+            ], BOM_DETAIL_FIELDS)
+            if "diamond_weight" in data_json:
+                # only the bounds; diamond_weight stays as read from the BOM
+                tolerance = set_tolerance(data_json["diamond_weight"], self.customer, self.tolerance_data)
+                data_json.update({key: tolerance[key] for key in ("max_diamond", "min_diamond") if key in tolerance})
+
+        if len(code) > 10:
+            metal_data = code[8:10]
+            if metal_data in ["1Y", "2Y", "1R", "2R"]:
+                data_json["metal_color"] = self.metal_color.get(code[9]) or ""
+                data_json["metal_touch"] = self.metal_touch.get(metal_data) or ""
+                data_json["metal_type"] = "Gold"
+            if metal_data in ["YG", "RG", "WG"]:
+                data_json["metal_color"] = self.metal_color.get(code[8]) or ""
+                data_json["metal_type"] = self.metal_type.get(code[9]) or "Gold"
+                data_json["metal_touch"] = self.metal_touch.get(metal_data)
+
+        if len(code) > 14:
+            stone_data = self.prolif.get(code[10:14])
+            if stone_data:
+                data_json["diamond_quality"] = stone_data
+
+        if len(code) > 16:
+            data_json["product_size"] = code[15:17]
+
+        return data_json
+
+    def decode_theme(self, theme_code, details):
+        # PROTO orders of Novel carry only the theme code
+        data_json = {"design_code": self.get_design_code(theme_code)}
+        self.set_design_detail(data_json, data_json["design_code"], details, [
+            "item_category", "item_subcategory", "setting_type", "metal_type", "design_image", "serial_no",
+        ])
+        return data_json
+
+    def decode(self, code, code_format, details=None):
+        if code_format not in CODE_FORMATS:
+            frappe.throw(_("Unknown code format {0}").format(code_format))
+        if details is None:
+            details = ItemDetails()
+        return getattr(self, f"decode_{code_format}")(code, details)
+
+
+class ItemDetails:
+    """
+        Item categories and template BOMs of a batch of design codes; these change with the Item,
+        not the customer. A design outside the batch is loaded on first use.
+    """
+
+    def __init__(self, design_codes=None):
+        self.categories = {}
+        self.boms = {}
+        self.loaded = set()
+        if isinstance(design_codes, str):
+            design_codes = [design_codes]
+        self.load(design_codes or [])
+
+    def load(self, design_codes):
+        design_codes = {design_code for design_code in design_codes if design_code} - self.loaded
+        self.loaded.update(design_codes)
+
+        for chunk in chunked(sorted(design_codes)):
+            for row in frappe.get_all("Item", filters={"name": ["in", chunk]}, fields=["name", "item_category"]):
+                self.categories[row.name] = row.item_category
+            for row in frappe.get_all(
+                "BOM",
+                filters={"item": ["in", chunk], "bom_type": "Template"},
+                fields=["name", "item"] + BOM_DETAIL_FIELDS,
+            ):
+                self.boms[(row.item, row.name)] = row
+
+    def get_category(self, design_code):
+        self.load([design_code])
+        return self.categories.get(design_code)
+
+    def get_bom(self, design_code, bom):
+        self.load([design_code])
+        return self.boms.get((design_code, bom))
+
+
+def get_decoder(customer):
+    version = frappe.cache().get_value(f"{DECODER_VERSION_KEY}:{customer}") or 0
+
+    key = (frappe.local.site, customer)
+    cached = _decoders.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    decoder = CustomerCodeDecoder(customer)
+    _decoders[key] = (version, decoder)
+    return decoder
+
+
+def get_rows_item_details(rows, with_theme=False):
+    """ItemDetails of the designs every code of `rows` resolves to"""
+    fields = dict(ROW_CODE_FIELDS, **({"theme_code": "theme"} if with_theme else {}))
+    design_codes = []
+    for row in rows:
+        if not row.customer_code:
+            continue
+        decoder = get_decoder(row.customer_code)
+        for fieldname, code_format in fields.items():
+            if row.get(fieldname):
+                design_codes.append(decoder.get_code_design(row.get(fieldname), code_format))
+    return ItemDetails(design_codes)
+
+
+def decode_code(code, customer, code_format, details=None):
+    """Decode one customer code; a missing theme code is raised as frappe.throw, as before"""
+    try:
+        return get_decoder(customer).decode(code, code_format, details)
+    except ThemeCodeNotFoundError as e:
+        frappe.throw(str(e))
+
+
+@frappe.whitelist()
+def decode_codes(codes, customer, code_format):
+    """
+        Decode a list of codes of one customer and format in one request. Returns
+        {"code", "data"} or {"code", "error"} per code, in the order given.
+    """
+    codes = frappe.parse_json(codes) if isinstance(codes, str) else codes
+    decoder = get_decoder(customer)
+    details = ItemDetails([decoder.get_code_design(code, code_format) for code in codes if code])
+
+    results = []
+    for code in codes:
+        if not code:
+            results.append({"code": code, "error": _("Code is empty")})
+            continue
+        try:
+            results.append({"code": code, "data": decoder.decode(code, code_format, details)})
+        except frappe.ValidationError as e:
+            results.append({"code": code, "error": str(e)})
+    return results
+
+
+def clear_customer_decoder(customers):
+    # bumped once the tables are committed; a decoder built before that would keep the old
+    # tables under the new version
+    customers = {customer for customer in customers if customer}
+    if customers:
+        frappe.db.after_commit.add(partial(bump_decoder_versions, customers))
+
+
+def bump_decoder_versions(customers):
+    cache = frappe.cache()
+    for customer in customers:
+        cache.set_value(f"{DECODER_VERSION_KEY}:{customer}", frappe.generate_hash(length=10))
+
+
+# doc events on the source doctypes of the decoder tables
+def clear_decoder_for_customer_attributes(doc, method=None):
+    clear_customer_decoder([doc.customer or doc.name])
+
+
+def clear_decoder_for_design_sheet(doc, method=None):
+    clear_customer_decoder([doc.customer_code])
+
+
+def clear_decoder_for_size_master(doc, method=None):
+    clear_customer_decoder([doc.customer])
+
+
+def clear_decoder_for_item(doc, method=None):
+    customers = {row.customer for row in doc.get("custom_item_theme_code") or []}
+    before = doc.get_doc_before_save()
+    if before:
+        customers.update(row.customer for row in before.get("custom_item_theme_code") or [])
+    clear_customer_decoder(customers)
@@ -1,5 +1,6 @@
 import frappe
 from frappe.utils import now_datetime, time_diff_in_hours
+from gke_customization.gke_order_forms.doctype.order_workflow_transition.order_workflow_transition import insert_transitions
 
 def validate(doc, method):
     validate_workflow(doc)
@@ -185,13 +186,12 @@ import frappe
 
 def update_order_status_from_timesheets(order_name):
    
-    workflow_type = frappe.db.get_value("Order", order_name, "workflow_type")
-    bom_or_cad = frappe.db.get_value("Order", order_name, "bom_or_cad")
-    item_remark = frappe.db.get_value("Order", order_name, "item_remark")  
-    bom_type = frappe.db.get_value("Order", order_name, "bom_type")  # added line
-
-    if workflow_type != "CAD":
+    order = frappe.db.get_value(
+        "Order", order_name, ["workflow_type", "bom_or_cad", "item_remark", "bom_type", "workflow_state"], as_dict=True
+    )
+    if not order or order.workflow_type != "CAD":
         return
+    bom_or_cad, item_remark, bom_type = order.bom_or_cad, order.item_remark, order.bom_type
 
     #  Fetch all timesheets linked to this order excluding cancelled
     timesheets = frappe.get_all(
@@ -204,7 +204,7 @@ def update_order_status_from_timesheets(order_name):
     if not timesheets:
         return
 
-    current_order_state = frappe.db.get_value("Order", order_name, "workflow_state")
+    current_order_state = order.workflow_state
 
     #  Handle Update Designer case
     if current_order_state == "Update Designer" and len(timesheets) > 1:
@@ -243,9 +243,10 @@ def update_order_status_from_timesheets(order_name):
             new_state = latest_state
 
         #  Update Order only if state actually changed
+        # committed with the Timesheet save that triggered it
         if current_order_state != new_state:
             frappe.db.set_value("Order", order_name, "workflow_state", new_state)
-            frappe.db.commit()
+            insert_transitions([(order_name, current_order_state, new_state, frappe.session.user, now_datetime(), None)])
     else:
         return
 
@@ -72,48 +72,13 @@ frappe.ui.form.on("Code Creation Tool", {
         }
 
         frm.page.set_primary_action(__("Update"), function () {
-            frm.get_field("code_creation_log").$wrapper.html("<p>Updating...</p>");
-
-            frappe.call({
-                method: "gke_customization.gke_order_forms.doctype.code_creation_tool.code_creation_tool.upload",
-                args: {
-                    select_doctype: frm.doc.select_doctype,
-                },
-                callback: function (r) {
-                    if (r.message) {
-                        let data = r.message;
-
-                        if (Array.isArray(data) && data.length > 0) {
-                            let html = "<table class='table table-bordered'>";
-                            html += "<thead><tr>";
-
-                            let headers = data[0];
-                            headers.forEach(header => {
-                                html += `<th>${header}</th>`;
-                            });
-                            html += "</tr></thead><tbody>";
-
-                            for (let i = 1; i < data.length; i++) {
-                                html += "<tr>";
-                                data[i].forEach(value => {
-                                    html += `<td>${value || ""}</td>`;
-                                });
-                                html += "</tr>";
-                            }
-                            html += "</tbody></table>";
-
-                            frm.get_field("code_creation_log").$wrapper.html(html);
-                        } else {
-                            frm.get_field("code_creation_log").$wrapper.html("<p>No data available.</p>");
-                        }
-                    } else {
-                        frm.get_field("code_creation_log").$wrapper.html("<p>Error occurred while fetching data.</p>");
-                    }
-                },
-            });
+            upload_codes(frm, 0);
         });
 
-		
+        // dry run: shows what Update would insert without saving any Item
+        frm.page.set_secondary_action(__("Preview"), function () {
+            upload_codes(frm, 1);
+        });
     },
 
     onload(frm) {
@@ -130,3 +95,47 @@ frappe.ui.form.on("Code Creation Tool", {
 		);
     }
 });
+
+
+function upload_codes(frm, dry_run) {
+    frm.get_field("code_creation_log").$wrapper.html(dry_run ? "<p>Checking...</p>" : "<p>Updating...</p>");
+
+    frappe.call({
+        method: "gke_customization.gke_order_forms.doctype.code_creation_tool.code_creation_tool.upload",
+        args: {
+            select_doctype: frm.doc.select_doctype,
+            dry_run: dry_run,
+        },
+        callback: function (r) {
+            if (r.message) {
+                let data = r.message;
+
+                if (Array.isArray(data) && data.length > 0) {
+                    let html = "<table class='table table-bordered'>";
+                    html += "<thead><tr>";
+
+                    let headers = data[0];
+                    headers.forEach(header => {
+                        html += `<th>${header}</th>`;
+                    });
+                    html += "</tr></thead><tbody>";
+
+                    for (let i = 1; i < data.length; i++) {
+                        html += "<tr>";
+                        data[i].forEach(value => {
+                            html += `<td>${value || ""}</td>`;
+                        });
+                        html += "</tr>";
+                    }
+                    html += "</tbody></table>";
+
+                    frm.get_field("code_creation_log").$wrapper.html(html);
+                } else {
+                    frm.get_field("code_creation_log").$wrapper.html("<p>No data available.</p>");
+                }
+            } else {
+                frm.get_field("code_creation_log").$wrapper.html("<p>Error occurred while fetching data.</p>");
+            }
+        },
+    });
+}
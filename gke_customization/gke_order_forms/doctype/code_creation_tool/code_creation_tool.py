@@ -2,16 +2,44 @@
 # # For license information, please see license.txt
 
 import frappe
+from frappe import _
 from frappe.model.document import Document
 from frappe.utils.csvutils import read_csv_content_from_attached_file
-from frappe.utils import add_days, cstr, date_diff, getdate
+from frappe.utils import add_days, cint, cstr, date_diff, getdate
+from gke_customization.gke_catalog.utils import chunked, get_child_rows
 from frappe.utils.csvutils import UnicodeWriter
 
 class CodeCreationTool(Document):
     pass
 
+CHILD_TABLE_FIELDNAME = "custom_item_theme_code"
+
+CODE_FIELDS = ["customer", "theme_code", "digit_14code", "digit_15code", "digit_18code", "sku_code"]
+
+# template column -> Item Theme Code Detail field
+CODE_COLUMNS = {
+    "customer": "customer",
+    "theme_code": "theme_code",
+    "14_digit_code": "digit_14code",
+    "15_digit_code": "digit_15code",
+    "18_digit_code": "digit_18code",
+    "sku_code": "sku_code",
+}
+
+# Items saved between two commits
+ITEM_CHUNK_SIZE = 50
+
+# files with more data rows are applied by a background job
+UPLOAD_BACKGROUND_ROWS = 2000
+
+
+def get_code_key(values):
+    # blank cells and empty child fields compare equal
+    return tuple(cstr(values.get(field)).strip() for field in CODE_FIELDS)
+
+
 @frappe.whitelist()
-def upload():
+def upload(dry_run=0):
     # Read the uploaded CSV file
     rows = read_csv_content_from_attached_file(frappe.get_doc("Code Creation Tool", "Code Creation Tool"))
 
@@ -20,70 +48,108 @@ def upload():
 
     headers = rows[4]  # First row is headers
     data_rows = rows[5:]  # Remaining rows are data
-    processed_data = [headers + ["Status"]]  # Add "Status" column for response
 
+    if not cint(dry_run) and len(data_rows) > UPLOAD_BACKGROUND_ROWS:
+        frappe.enqueue(
+            "gke_customization.gke_order_forms.doctype.code_creation_tool.code_creation_tool.upload_job",
+            queue="long",
+            timeout=7200,
+            headers=headers,
+            data_rows=data_rows,
+        )
+        return [["Status"], [_("{0} rows are being applied in the background. You will be notified when done.").format(len(data_rows))]]
+
+    statuses = apply_upload(headers, data_rows, dry_run=cint(dry_run))
+    return [headers + ["Status"]] + [row + [status] for row, status in zip(data_rows, statuses) if status]
+
+
+def upload_job(headers, data_rows):
+    statuses = apply_upload(headers, data_rows, progress=True)
+
+    counts = {}
+    for status in statuses:
+        if status:
+            counts[status] = counts.get(status, 0) + 1
+    frappe.publish_realtime(
+        "msgprint",
+        _("Code Creation Tool: {0}").format(", ".join(f"{status}: {count}" for status, count in counts.items())),
+        user=frappe.session.user,
+    )
+
+
+def plan_upload(headers, data_rows):
+    """
+        Status of every data row and the theme code rows to append per Item. Rows are diffed
+        against the existing rows of their Item, and rows seen earlier in the file, by key.
+        Rows missing ID or Theme Code get no status, as they were skipped before.
+    """
     # Create a mapping of headers to indexes
     header_map = {col.lower().strip().replace(' ','_'): idx for idx, col in enumerate(headers)}
+    id_index = header_map.get("id", -1)
 
-    child_table_fieldname = "custom_item_theme_code"  # Update with your actual child table fieldname
-
+    values = []
     for row in data_rows:
-        item_name = row[header_map.get("id", -1)]
-        customer = row[header_map.get("customer", -1)]
-        theme_code = row[header_map.get("theme_code", -1)]
-        digit_14 = row[header_map.get("14_digit_code", -1)] if "14_digit_code" in header_map else None
-        digit_18 = row[header_map.get("18_digit_code", -1)] if "18_digit_code" in header_map else None
-        digit_15 = row[header_map.get("15_digit_code", -1)] if "15_digit_code" in header_map else None
-        sku_code = row[header_map.get("sku_code", -1)] if "sku_code" in header_map else None
-
-        if not item_name or not theme_code:
-            continue  # Skip if required fields are missing
-        
-        # Fetch the Item document
-        item_doc = frappe.get_doc("Item", item_name)
-
-        if not hasattr(item_doc, child_table_fieldname):
-            frappe.throw(f"Child table not found in Item: {item_name}")
-
-        child_table = getattr(item_doc, child_table_fieldname)
-
-        # Check if the combination (theme_code + customer + 14_digit_code) exists
-        already_exists = False
-        insert_required = True
-
-        for child in child_table:
-            if child.theme_code == theme_code and child.customer == customer:
-                # Check all codes
-                match_14 = child.digit_14code == digit_14
-                match_15 = child.digit_15code == digit_15
-                match_18 = child.digit_18code == digit_18
-                match_sku = child.sku_code == sku_code
-
-                if match_14 and match_15 and match_18 and match_sku:
-                    already_exists = True
-                    insert_required = False
-                    break
-                else:
-                    # Same customer and theme, but any code is different → Insert required
-                    insert_required = True
-
-        if already_exists:
-            processed_data.append(row + ["Already Exists"])
-        elif insert_required:
-            item_doc.append(child_table_fieldname, {
-                "customer": customer,
-                "theme_code": theme_code,
-                "digit_14code": digit_14,
-                "digit_15code": digit_15,
-                "digit_18code": digit_18,
-                "sku_code": sku_code
-            })
-            item_doc.save()
-            processed_data.append(row + ["Inserted"])
+        code_row = {
+            field: (row[header_map[column]] if column in header_map else None)
+            for column, field in CODE_COLUMNS.items()
+        }
+        values.append((row[id_index], code_row))
+
+    items = {item_name for item_name, code_row in values if item_name and code_row["theme_code"]}
+    existing_items = set()
+    for chunk in chunked(sorted(items)):
+        existing_items.update(frappe.get_all("Item", filters={"name": ["in", chunk]}, pluck="name"))
+
+    existing_rows = get_child_rows(
+        "Item Theme Code Detail", existing_items, CODE_FIELDS,
+        filters={"parenttype": "Item", "parentfield": CHILD_TABLE_FIELDNAME},
+    )
+    seen = {item: {get_code_key(child) for child in existing_rows.get(item, [])} for item in existing_items}
+
+    statuses = []
+    to_insert = {}
+    for idx, (item_name, code_row) in enumerate(values):
+        if not item_name or not code_row["theme_code"]:
+            statuses.append(None)  # Skip if required fields are missing
+        elif item_name not in existing_items:
+            statuses.append("Item Not Found")
+        elif get_code_key(code_row) in seen[item_name]:
+            statuses.append("Already Exists")
         else:
-            processed_data.append(row + ["Skipped"])
-
-    return processed_data
+            seen[item_name].add(get_code_key(code_row))
+            to_insert.setdefault(item_name, []).append((idx, code_row))
+            statuses.append("Inserted")
+
+    return statuses, to_insert
+
+
+def apply_upload(headers, data_rows, dry_run=False, progress=False):
+    """Append the new theme code rows; every Item is loaded and saved once, committed in chunks"""
+    statuses, to_insert = plan_upload(headers, data_rows)
+    if dry_run:
+        return [("To Insert" if status == "Inserted" else status) for status in statuses]
+
+    items = list(to_insert)
+    for chunk_idx, chunk in enumerate(chunked(items, ITEM_CHUNK_SIZE)):
+        for item_name in chunk:
+            frappe.db.savepoint("code_creation_tool")
+            try:
+                item_doc = frappe.get_doc("Item", item_name)
+                for idx, code_row in to_insert[item_name]:
+                    item_doc.append(CHILD_TABLE_FIELDNAME, code_row)
+                item_doc.save()
+            except Exception as e:
+                frappe.db.rollback(save_point="code_creation_tool")
+                frappe.log_error(frappe.get_traceback(), f"Code Creation Tool: {item_name}")
+                for idx, code_row in to_insert[item_name]:
+                    statuses[idx] = f"Error: {cstr(e)}"
+
+        frappe.db.commit()
+        if progress:
+            done = min((chunk_idx + 1) * ITEM_CHUNK_SIZE, len(items))
+            frappe.publish_progress(done * 100 / len(items), title=_("Creating Theme Codes"))
+
+    return statuses
 
 @frappe.whitelist()
 def get_template():
@@ -4,6 +4,7 @@
 import frappe,json
 from frappe import _
 from frappe.model.document import Document
+from gke_customization.gke_order_forms.customer_code_decoder import decode_code, get_rows_item_details
 
 class CustomerOrderForm(Document):
 	def before_save(self):
@@ -107,10 +108,12 @@ def get_order_form_detail(design_code):
 
 def set_data(self):
 	if self.customer_order_form_detail:
+		# categories and template BOMs of every row's design, read once for the table
+		details = get_rows_item_details(self.customer_order_form_detail, with_theme=self.flow_type == 'PROTO')
 		for row in self.customer_order_form_detail:
 			if row.digit14_code != None:
 				# frappe.throw(f"here {row.digit14_code}")
-				json_14digit = get_14code_detail(row.digit14_code, row.customer_code)
+				json_14digit = decode_code(row.digit14_code, row.customer_code, "digit14", details)
 				if isinstance(json_14digit, dict):
 					row.theme_code = json_14digit.get("theme_code")
 					row.design_code = json_14digit.get("design_code")
@@ -134,7 +137,7 @@ def set_data(self):
 					row.chain = json_14digit.get("chain")
 					row.rhodium = json_14digit.get("rhodium")
 			if row.digit18_code:
-				json_18digit = get_18code_detail(row.digit18_code, row.customer_code)
+				json_18digit = decode_code(row.digit18_code, row.customer_code, "digit18", details)
 				if isinstance(json_18digit, dict):
 					row.theme_code = json_18digit.get("theme_code")
 					row.design_code = json_18digit.get("design_code")
@@ -158,7 +161,7 @@ def set_data(self):
 					row.chain = json_18digit.get("chain")
 					row.rhodium = json_18digit.get("rhodium")
 			if row.digit15_code:
-				json_15digit = get_15code_detail(row.digit15_code, row.customer_code)
+				json_15digit = decode_code(row.digit15_code, row.customer_code, "digit15", details)
 				if isinstance(json_15digit, dict):
 					row.theme_code = json_15digit.get("theme_code")
 					row.product_type = json_15digit.get("product_type")
@@ -184,7 +187,7 @@ def set_data(self):
 					row.rhodium = json_15digit.get("rhodium")
 			if row.theme_code and self.flow_type == 'PROTO':
 				# if row.customer_name in ("Novel"):
-					theme_data = get_item_detail(row.theme_code, row.customer_code)
+					theme_data = decode_code(row.theme_code, row.customer_code, "theme", details)
 					if isinstance(theme_data, dict):
 						row.design_code = theme_data.get("design_code")
 						row.design_code_bom = theme_data.get("bom")
@@ -203,7 +206,7 @@ def set_data(self):
 						row.rhodium = theme_data.get("rhodium")
 
 			if row.sku_code:
-				json_skucode = get_sku_code_detail(row.sku_code, row.customer_code)
+				json_skucode = decode_code(row.sku_code, row.customer_code, "sku", details)
 				if isinstance(json_skucode, dict):
 					row.theme_code = json_skucode.get("theme_code")
 					# row.product_type = json_skucode.get("product_type")
@@ -242,383 +245,21 @@ def get_temp_bom_details(design_code, bom):
 #for novel, in proto they give only theme_code
 @frappe.whitelist()
 def get_item_detail(theme_code, customer):
-	data_json = {}
-	design_code = frappe.db.get_value('Item Theme Code Detail', {'customer': customer, 'theme_code': theme_code}, 'parent')
-	if design_code:
-		data_json['design_code'] = design_code
-	else:
-		frappe.throw(f"Please Set the Theme code <b>{theme_code}</b> in Item ")
-
-	# details from design information sheet as per design code
-	if design_code:
-		design_sheet = frappe.db.get_value('Customer Design Information Sheet', {'customer_code': customer, 'design_code': design_code}, 
-				['bom','item_category','item_subcategory','setting_type','metal_type','design_image','serial_no'])
-		
-		if design_sheet:
-			bom_detail = get_temp_bom_details(design_code, design_sheet[0])
-			data_json['bom'] = design_sheet[0]
-			data_json['item_category'] = design_sheet[1]
-			data_json['item_subcategory'] = design_sheet[2]
-			data_json['setting_type'] = design_sheet[3]
-			data_json['metal_type'] = design_sheet[4]
-			data_json['design_image'] = design_sheet[5]
-			data_json['serial_no'] = design_sheet[6]
-			if bom_detail:
-				data_json['feature'] = bom_detail[0]
-				data_json['metal_target'] = bom_detail[1]
-				data_json['diamond_target'] = bom_detail[2]
-				data_json['product_size'] = bom_detail[3]
-				data_json['chain'] = bom_detail[4]
-				data_json['rhodium'] = bom_detail[5]
-	
-	return data_json
+	return decode_code(theme_code, customer, "theme")
 
 
 # # get detail from 14 digit code 
 # @frappe.whitelist()
 def get_14code_detail(digit14_code, customer):
-	data_json = {}
-	# frappe.throw(f"{digit14_code} here")
-	# metal touch
-	if len(digit14_code) > 1:
-		metal_touch = frappe.db.get_value('Customer Metal Touch Detail',{'code_touch': digit14_code[:2], 'parent': customer}, 'gk_metal_touch' )
-		data_json['metal_touch'] = metal_touch
-		
-	# theme code and design code 
-	design_code = ''
-	if len(digit14_code) > 2: 
-		theme_code = digit14_code[2:9]
-		data_json['theme_code'] = theme_code
-
-		design_code = frappe.db.get_value('Item Theme Code Detail', {'customer': customer, 'theme_code': theme_code}, 'parent')
-		if design_code:
-			data_json['design_code'] = design_code
-		else:
-			frappe.throw(f"Please Set the Theme code <b>{theme_code}</b> in Item ")
-
-		# details from design information sheet as per design code
-		# 'metal_touch',
-		if design_code:
-			design_sheet = frappe.db.get_value('Customer Design Information Sheet', 
-					{'customer_code': customer, 'design_code': design_code}, 
-					['bom','item_category','item_subcategory','setting_type','metal_type','metal_colour','design_image','serial_no'])
-			# frappe.throw(f"{bom_detail}")
-			if design_sheet:
-				bom_detail = get_temp_bom_details(design_code, design_sheet[0])
-				data_json['bom'] = design_sheet[0]
-				data_json['item_category'] = design_sheet[1]
-				data_json['item_subcategory'] = design_sheet[2]
-				data_json['setting_type'] = design_sheet[3]
-				data_json['metal_type'] = design_sheet[4]
-				# data_json['metal_touch'] = design_sheet[5]
-				data_json['metal_colour'] = design_sheet[5]
-				data_json['design_image'] = design_sheet[6]
-				data_json['serial_no'] = design_sheet[7]
-				if bom_detail:
-					# data_json[feature,metal_target,diamond_target,product_size,chain,rhodium]
-					data_json['feature'] = bom_detail[0]
-					data_json['metal_target'] = bom_detail[1]
-					data_json['diamond_target'] = bom_detail[2]
-					data_json['product_size'] = bom_detail[3]
-					data_json['chain'] = bom_detail[4]
-					data_json['rhodium'] = bom_detail[5]
-
-	if design_code:
-		# for size as per category
-		if len(digit14_code) > 9:
-			size_data = get_size(customer, digit14_code, design_code)
-			data_json['size_data'] = size_data
-	
-		# finding data
-		if len(digit14_code) > 10:
-			finding_data = frappe.db.get_value('Customer Finding Detail',{'code_finding': digit14_code[10], 'parent': customer}, 'description_finding' )
-			if finding_data:
-				data_json['finding_data'] = finding_data
-			else:
-				data_json['finding_data'] = ''
-		
-		# diamond Quality
-		if len(digit14_code) > 12:
-			stone_data = frappe.db.get_value('Customer Prolif Detail',{'code_prolif': digit14_code[12:14], 'parent': customer}, 'gk_d' )
-			if stone_data:
-				data_json['stone_data'] = stone_data
-			else:
-				data_json['stone_data'] = ''
-				
-	return data_json
-
-# get size from titan size master
-def get_size(customer,titan_code,design_code):
-	item_category = frappe.db.get_value('Item',design_code,'item_category')
-	
-	if titan_code[0] == 'U':
-		size_data = frappe.db.get_value('Titan Size Master',{'customer':customer,'code':titan_code[9],'item_category':item_category,'country':'United States'},'product_size')
-	else:
-		size_data = frappe.db.get_value('Titan Size Master',{'customer':customer,'code':titan_code[9],'item_category':item_category,'country':'India'},'product_size')
-
-	return size_data
+	return decode_code(digit14_code, customer, "digit14")
 
 @frappe.whitelist()
 def get_18code_detail(digit18_code, customer):
-	data_json = {}
-
-	# metal touch
-	if len(digit18_code) > 1:
-		metal_touch = frappe.db.get_value('Customer Metal Touch Detail',{'code_touch': digit18_code[0], 'parent': customer}, 'gk_metal_touch' )
-		data_json['metal_touch'] = metal_touch
-	
-	if len(digit18_code) > 2:
-		metal_type = frappe.db.get_value('Customer Metal Type Detail',{'code_type': digit18_code[1], 'parent': customer}, 'gk_metal_type' )
-		data_json['metal_type'] = metal_type
-	
-	design_code = ''
-	if len(digit18_code) > 3: 
-		theme_code = digit18_code[2:11]
-		data_json['theme_code'] = theme_code
-
-		design_code = frappe.db.get_value('Item Theme Code Detail', {'customer': customer, 'theme_code': theme_code}, 'parent')
-		if design_code:
-			data_json['design_code'] = design_code
-		else:
-			frappe.throw(f"Please Set the Theme code <b>{theme_code}</b> in Item ")
-	
-	# 	# details from design information sheet as per design code
-		if design_code:
-			design_sheet = frappe.db.get_value('Customer Design Information Sheet', 
-						{'customer_code': customer, 'design_code': design_code}, 
-					['bom','item_category','item_subcategory','setting_type','design_image','serial_no'])
-			
-			if design_sheet:
-				bom_detail = get_temp_bom_details(design_code, design_sheet[0])
-				data_json['bom'] = design_sheet[0]
-				data_json['item_category'] = design_sheet[1]
-				data_json['item_subcategory'] = design_sheet[2]
-				data_json['setting_type'] = design_sheet[3]
-				data_json['design_image'] = design_sheet[4]
-				data_json['serial_no'] = design_sheet[5]
-			if bom_detail:
-				data_json['feature'] = bom_detail[0]
-				data_json['metal_target'] = bom_detail[1]
-				data_json['diamond_target'] = bom_detail[2]
-				data_json['product_size'] = bom_detail[3]
-				data_json['chain'] = bom_detail[4]
-				data_json['rhodium'] = bom_detail[5]
-
-	if design_code:
-	# 	# for size as per category
-		if len(digit18_code) > 11:
-			size_data = get_realiance_size(customer, digit18_code[11:13], design_code)
-			data_json['size_data'] = size_data
-	
-		# finding data
-		if len(digit18_code) > 13:
-			finding_data = frappe.db.get_value('Customer Finding Detail',{'code_finding': digit18_code[13:15], 'parent': customer}, 'description_finding' )
-			if finding_data:
-				data_json['finding_data'] = finding_data
-			else:
-				data_json['finding_data'] = ''
-		
-		if len(digit18_code) > 15:
-			metal_color = frappe.db.get_value('Customer Metal Color Detail',{'code_color': digit18_code[15], 'parent': customer}, 'gk_metal_color' )
-			if metal_color:
-				data_json['metal_color'] = metal_color
-			else:
-				data_json['metal_color'] = ''
-
-		# diamond Quality
-		if len(digit18_code) > 16:
-			stone_data = frappe.db.get_value('Customer Prolif Detail',{'code_prolif': digit18_code[16:18], 'parent': customer}, 'gk_d' )
-			if stone_data:
-				data_json['stone_data'] = stone_data
-			else:
-				data_json['stone_data'] = ''
-	# frappe.throw(f"{data_json}")
-	return data_json
-
-# get size from titan size master
-def get_realiance_size(customer,reliance_code,design_code):
-	item_category = frappe.db.get_value('Item',design_code,'item_category')
-	size_data = frappe.db.get_value('Reliance Size Master',{'customer':customer,'code':reliance_code,'item_category':item_category},'product_size')
-	
-	return size_data
+	return decode_code(digit18_code, customer, "digit18")
 
 @frappe.whitelist()
 def get_15code_detail(digit15_code, customer):
-	data_json = {}
-	if len(digit15_code) > 1:
-		product_type = digit15_code[0]
-		if product_type == 'D':
-			data_json['product_type'] = 'Studded - DIS'
-
-	# metal touch
-	if len(digit15_code) > 2:
-		metal_touch = frappe.db.get_value('Customer Metal Touch Detail',{'code_touch': digit15_code[1], 'parent': customer}, 'gk_metal_touch' )
-		data_json['metal_touch'] = metal_touch
-		
-	design_code = ''
-	if len(digit15_code) > 13: 
-		theme_code = digit15_code[8:15]
-		data_json['theme_code'] = theme_code
-
-		design_code = frappe.db.get_value('Item Theme Code Detail', {'customer': customer, 'theme_code': theme_code}, 'parent')
-		if design_code:
-			data_json['design_code'] = design_code
-		else:
-			frappe.throw(f"Please Set the Theme code <b>{theme_code}</b> in Item ")
-	
-	# 	# details from design information sheet as per design code
-		if design_code:
-			design_sheet = frappe.db.get_value('Customer Design Information Sheet', {'customer_code': customer, 'design_code': design_code}, 
-					['bom','item_category','item_subcategory','setting_type','metal_type','design_image','serial_no'])
-			
-			if design_sheet:
-				bom_detail = get_temp_bom_details(design_code, design_sheet[0])
-				data_json['bom'] = design_sheet[0]
-				data_json['item_category'] = design_sheet[1]
-				data_json['item_subcategory'] = design_sheet[2]
-				data_json['setting_type'] = design_sheet[3]
-				data_json['metal_type'] = design_sheet[4]
-				data_json['design_image'] = design_sheet[5]
-				data_json['serial_no'] = design_sheet[6]
-				
-				if bom_detail:
-					data_json['feature'] = bom_detail[0]
-					data_json['metal_target'] = bom_detail[1]
-					data_json['diamond_target'] = bom_detail[2]
-					data_json['product_size'] = bom_detail[3]
-					data_json['chain'] = bom_detail[4]
-					data_json['rhodium'] = bom_detail[5]
-
-	if design_code:
-		# for size as per category
-		if len(digit15_code) > 2:
-			size_data = get_novel_size(customer, digit15_code[2], design_code)
-			data_json['size_data'] = size_data
-	
-	if len(digit15_code) > 3:
-		metal_color = frappe.db.get_value('Customer Metal Color Detail',{'code_color': digit15_code[3], 'parent': customer}, 'gk_metal_color' )
-		if metal_color:
-			data_json['metal_color'] = metal_color
-		else:
-			data_json['metal_color'] = ''
-
-	# finding data
-	if len(digit15_code) > 4:
-		finding_data = frappe.db.get_value('Customer Finding Detail',{'code_finding': digit15_code[4], 'parent': customer}, 'description_finding' )
-		if finding_data:
-			data_json['finding_data'] = finding_data
-		else:
-			data_json['finding_data'] = ''
-	
-
-	# diamond Quality
-	if len(digit15_code) > 6:
-		stone_data = frappe.db.get_value('Customer Prolif Detail',{'code_prolif': digit15_code[5:7], 'parent': customer}, 'gk_d' )
-		if stone_data:
-			data_json['stone'] = stone_data
-		else:
-			data_json['stone'] = ''
-
-	# frappe.throw(f"{data_json}")
-	return data_json
-
-# get size from titan size master
-def get_novel_size(customer,novel_code,design_code):
-	item_category = frappe.db.get_value('Item',design_code,'item_category')
-	
-	size_data = frappe.db.get_value('Novel Size Master',{'customer':customer,'code':novel_code,'item_category':item_category},'product_size')
-	
-	return size_data
+	return decode_code(digit15_code, customer, "digit15")
 
 def get_sku_code_detail(sku_code, customer):
-	data_json = {}
-	len_sku = len(sku_code)
-
-	design_code = ''
-	if len_sku > 7:
-		theme_code = sku_code[0:7]
-		data_json['theme_code'] = theme_code
-		
-		design_code = frappe.db.get_value('Item Theme Code Detail', {'customer': customer, 'theme_code': theme_code}, 'parent')
-		if design_code:
-			data_json['design_code'] = design_code
-		else:
-			frappe.throw(f"Please Set the Theme code <b>{theme_code}</b> in Item ")
-		
-		if design_code:
-			design_sheet = frappe.db.get_value('Customer Design Information Sheet', {'customer_code': customer, 'design_code': design_code}, 
-					['bom','item_category','item_subcategory','setting_type','metal_type','design_image','serial_no'])
-			
-			if design_sheet:
-				bom_detail = get_temp_bom_details(design_code, design_sheet[0])
-				data_json['bom'] = design_sheet[0] 
-				data_json['item_category'] = design_sheet[1]
-				data_json['item_subcategory'] = design_sheet[2]
-				data_json['setting_type'] = design_sheet[3]
-				data_json['metal_type'] = design_sheet[4]
-				data_json['design_image'] = design_sheet[5]
-				data_json['serial_no'] = design_sheet[6]
-			if bom_detail:
-				data_json['feature'] = bom_detail[0]
-				data_json['metal_target'] = bom_detail[1]
-				data_json['diamond_target'] = bom_detail[2]
-				data_json['product_size'] = bom_detail[3]
-				data_json['chain'] = bom_detail[4]
-				data_json['rhodium'] = bom_detail[5]
-				data_json['diamond_weight'] = bom_detail[6]
-				data_json['metal_and_finding_weight'] = bom_detail[7]
-				
-				data_json.update(set_diamond_tolerance(data_json['diamond_weight'], customer))
-
-	if len_sku > 10:
-		metal_data = sku_code[8:10]
-		if metal_data in ['1Y', '2Y', '1R', '2R']:
-			metal_touch = frappe.db.get_value('Customer Metal Touch Detail',{'code_touch': metal_data, 'parent': customer}, 'gk_metal_touch' )
-			metal_color = frappe.db.get_value('Customer Metal Color Detail',{'code_color': sku_code[9], 'parent': customer}, 'gk_metal_color' )
-			
-			data_json['metal_color'] = metal_color if metal_color else ''
-			data_json['metal_touch'] = metal_touch if metal_touch else ''
-			data_json['metal_type'] = 'Gold'
-			
-		if metal_data in ['YG','RG','WG']:
-			metal_touch = frappe.db.get_value('Customer Metal Touch Detail',{'code_touch': metal_data, 'parent': customer}, 'gk_metal_touch' )
-			metal_color = frappe.db.get_value('Customer Metal Color Detail',{'code_color': sku_code[8], 'parent': customer}, 'gk_metal_color' )
-			metal_type = frappe.db.get_value('Customer Metal Type Detail',{'code_type': sku_code[9], 'parent': customer}, 'gk_metal_type' )
-			
-			data_json['metal_color'] = metal_color if metal_color else ''
-			data_json['metal_type'] = metal_type if metal_type else 'Gold'
-			data_json['metal_touch'] = metal_touch
-
-	if len_sku > 14:
-		diamond_quality = sku_code[10:14]
-		if diamond_quality:
-			stone_data = frappe.db.get_value('Customer Prolif Detail',{'code_prolif': diamond_quality, 'parent': customer}, 'gk_d' )
-			if stone_data:
-				data_json['diamond_quality'] = stone_data
-
-	if len_sku > 16:
-		product_size = sku_code[15:17]
-		data_json['product_size'] = product_size
-	
-	# frappe.throw(f"{data_json}")
-	return data_json
-
-def set_diamond_tolerance(diamond_weight, customer):
-	data_json = {}
-	if diamond_weight:
-		tolerance_data = frappe.db.get_all('Diamond Tolerance Table',
-			filters={'weight_type': 'Weight wise', 'parent': customer}, 
-			fields=['from_diamond', 'to_diamond', 'plus_percent', 'minus_percent'])
-
-		for row in tolerance_data:
-			if row['from_diamond'] <= diamond_weight <= row['to_diamond']:
-				plus_percent = row['plus_percent']
-				minus_percent = row['minus_percent']
-
-				max_diamond_weight = diamond_weight + plus_percent
-				min_diamond_weight = diamond_weight - minus_percent
-				
-				data_json['max_diamond'] = round(max_diamond_weight, 3)
-				data_json['min_diamond'] = round(min_diamond_weight, 3)
-
-	return data_json
\ No newline at end of file
+	return decode_code(sku_code, customer, "sku")
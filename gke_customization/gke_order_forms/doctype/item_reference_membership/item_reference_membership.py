@@ -0,0 +1,291 @@
+# Copyright (c) 2026, Gurukrupa Export and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now_datetime
+from gke_customization.gke_catalog.utils import chunked, get_child_rows
+
+# Item Reference Type -> (child doctype, Item table field, Item Reference Group table field, Item flag)
+REFERENCE_TYPES = {
+	"Similar": ("Similar Item Table", "custom_similar_item_table", "similar_item_table", "custom_is_similar_item"),
+	"Set": ("Set Item Table", "custom_set_item_table", "set_item_table", "custom_is_set_item"),
+	"Sufix": ("Sufix Item Table", "custom_sufix_item_table", "sufix_item_table", "custom_is_sufix_item"),
+}
+
+
+class ItemReferenceMembership(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Item Reference Membership", ["item_reference_type", "reference_group"])
+
+
+class DisjointSet:
+	"""Union by size with path halving"""
+
+	def __init__(self, items=()):
+		self.parent = {}
+		self.size = {}
+		for item in items:
+			self.add(item)
+
+	def add(self, item):
+		if item not in self.parent:
+			self.parent[item] = item
+			self.size[item] = 1
+
+	def find(self, item):
+		self.add(item)
+		while self.parent[item] != item:
+			self.parent[item] = self.parent[self.parent[item]]
+			item = self.parent[item]
+		return item
+
+	def union(self, a, b):
+		a, b = self.find(a), self.find(b)
+		if a == b:
+			return a
+		if self.size[a] < self.size[b]:
+			a, b = b, a
+		self.parent[b] = a
+		self.size[a] += self.size[b]
+		return a
+
+	def groups(self):
+		groups = {}
+		for item in self.parent:
+			groups.setdefault(self.find(item), []).append(item)
+		return list(groups.values())
+
+
+def get_linked_items(doc, reference_type):
+	"""Items an Item links to in its table of `reference_type`; none while its flag is off"""
+	child_doctype, table_field, group_field, flag = REFERENCE_TYPES[reference_type]
+	if not doc or not doc.get(flag):
+		return set()
+	return {row.item_code for row in doc.get(table_field) or [] if row.item_code and row.item_code != doc.name}
+
+
+def get_edges(reference_type, items):
+	"""(item, linked item) of every flagged Item in `items`, read in bulk"""
+	child_doctype, table_field, group_field, flag = REFERENCE_TYPES[reference_type]
+
+	flagged = []
+	for chunk in chunked(sorted(set(items))):
+		flagged.extend(frappe.get_all("Item", filters={"name": ["in", chunk], flag: 1}, pluck="name"))
+
+	rows = get_child_rows(child_doctype, flagged, ["item_code"], filters={"parenttype": "Item", "parentfield": table_field})
+	return [(parent, row.item_code) for parent, children in rows.items() for row in children if row.item_code]
+
+
+def get_memberships(reference_type, items):
+	memberships = {}
+	for chunk in chunked(sorted(set(items))):
+		for row in frappe.get_all(
+			"Item Reference Membership",
+			filters={"item_reference_type": reference_type, "item": ["in", chunk]},
+			fields=["item", "reference_group"],
+		):
+			memberships[row.item] = row.reference_group
+	return memberships
+
+
+def get_group_members(reference_type, groups):
+	members = {group: [] for group in groups}
+	for chunk in chunked(sorted(set(groups))):
+		for row in frappe.get_all(
+			"Item Reference Membership",
+			filters={"item_reference_type": reference_type, "reference_group": ["in", chunk]},
+			fields=["item", "reference_group"],
+			order_by="creation asc",
+		):
+			members[row.reference_group].append(row.item)
+	return members
+
+
+def _write_memberships(reference_type, group, items):
+	now = now_datetime()
+	user = frappe.session.user
+
+	for chunk in chunked(items):
+		placeholders = ", ".join(["(%s, %s, %s, %s, %s, 0, 0, %s, %s, %s)"] * len(chunk))
+		values = []
+		for item in chunk:
+			values.extend([f"{reference_type}-{item}", now, now, user, user, item, reference_type, group])
+		frappe.db.sql(
+			f"""
+			INSERT INTO `tabItem Reference Membership`
+				(name, creation, modified, modified_by, owner, docstatus, idx,
+				item, item_reference_type, reference_group)
+			VALUES {placeholders}
+			ON DUPLICATE KEY UPDATE
+				modified = VALUES(modified),
+				modified_by = VALUES(modified_by),
+				reference_group = VALUES(reference_group)
+			""",
+			values,
+		)
+
+
+def _delete_memberships(reference_type, items):
+	for chunk in chunked(items):
+		frappe.db.delete("Item Reference Membership", {"name": ["in", [f"{reference_type}-{item}" for item in chunk]]})
+
+
+def _save_group(reference_type, group, members):
+	"""Item Reference Group holding exactly `members`; a new one when `group` is None"""
+	child_doctype, table_field, group_field, flag = REFERENCE_TYPES[reference_type]
+
+	if group:
+		doc = frappe.get_doc("Item Reference Group", group)
+		existing = [row.item_code for row in doc.get(group_field)]
+		if len(existing) == len(members) and set(existing) == set(members):
+			return group
+		doc.set(group_field, [row for row in doc.get(group_field) if row.item_code in members])
+	else:
+		doc = frappe.new_doc("Item Reference Group")
+		doc.item_reference_type = reference_type
+		existing = []
+
+	for item in members:
+		if item not in existing:
+			doc.append(group_field, {"item_code": item})
+	if doc.item_code not in members:
+		doc.item_code = members[0]
+
+	# maintained on behalf of whoever saves the Item; only System Manager may write groups directly
+	doc.save(ignore_permissions=True)
+	return doc.name
+
+
+def union_items(reference_type, items):
+	"""
+		Merge the groups of `items` into one: the largest existing group absorbs the others
+		and any item without a group. Nothing is written when they already share a group.
+	"""
+	items = list(dict.fromkeys(item for item in items if item))
+	if len(items) < 2:
+		return
+
+	memberships = get_memberships(reference_type, items)
+	groups = set(memberships.values())
+	if len(groups) == 1 and len(memberships) == len(items):
+		return
+
+	members = get_group_members(reference_type, groups)
+	target = max(groups, key=lambda group: (len(members[group]), group)) if groups else None
+
+	merged = list(members.get(target, []))
+	for group in sorted(groups - {target}):
+		merged.extend(members[group])
+	merged.extend(item for item in items if item not in memberships)
+	merged = list(dict.fromkeys(merged))
+
+	target = _save_group(reference_type, target, merged)
+	_write_memberships(reference_type, target, [item for item in merged if memberships.get(item) != target])
+
+	for group in groups - {target}:
+		frappe.delete_doc("Item Reference Group", group, ignore_permissions=True, force=True)
+
+
+def split_group(reference_type, group, exclude=()):
+	"""
+		Recompute one group from the edges of its members after a link was removed. The largest
+		component keeps the group, other components get new groups, lone items leave.
+	"""
+	members = [item for item in get_group_members(reference_type, [group])[group] if item not in exclude]
+
+	sets = DisjointSet(members)
+	for item, linked in get_edges(reference_type, members):
+		if item in sets.parent and linked in sets.parent:
+			sets.union(item, linked)
+
+	components = sorted(sets.groups(), key=len, reverse=True)
+	loners = [component[0] for component in components if len(component) == 1]
+	components = [component for component in components if len(component) > 1]
+
+	_delete_memberships(reference_type, loners + list(exclude))
+
+	if not components:
+		frappe.delete_doc("Item Reference Group", group, ignore_permissions=True, force=True)
+		return
+
+	_save_group(reference_type, group, components[0])
+	for component in components[1:]:
+		_write_memberships(reference_type, _save_group(reference_type, None, component), component)
+
+
+def update_reference_groups(doc, method=None):
+	# doc event on Item: merge on added links, recompute the group when a link is removed
+	before = doc.get_doc_before_save()
+	for reference_type in REFERENCE_TYPES:
+		current = get_linked_items(doc, reference_type)
+		previous = get_linked_items(before, reference_type)
+		if current == previous:
+			continue
+
+		if current - previous:
+			union_items(reference_type, [doc.name, *sorted(current)])
+
+		if previous - current:
+			group = get_memberships(reference_type, [doc.name]).get(doc.name)
+			if group:
+				split_group(reference_type, group)
+
+
+def remove_from_reference_groups(doc, method=None):
+	# doc event on Item (on_trash)
+	for reference_type in REFERENCE_TYPES:
+		group = get_memberships(reference_type, [doc.name]).get(doc.name)
+		if group:
+			split_group(reference_type, group, exclude={doc.name})
+
+
+def rebuild_reference_groups():
+	"""
+		Recompute every group from its current members and the Similar/Set/Sufix tables of the
+		whole item master. Existing groups are kept: a component reuses its largest group and
+		absorbs the others, so groups maintained by hand before lose no member.
+	"""
+	for reference_type, (child_doctype, table_field, group_field, flag) in REFERENCE_TYPES.items():
+		sets = DisjointSet()
+
+		groups = frappe.get_all("Item Reference Group", filters={"item_reference_type": reference_type}, pluck="name")
+		members = {
+			group: [row.item_code for row in rows if row.item_code]
+			for group, rows in get_child_rows(
+				child_doctype, groups, ["item_code"],
+				filters={"parenttype": "Item Reference Group", "parentfield": group_field},
+			).items()
+		}
+		for group_members in members.values():
+			for item in group_members[1:]:
+				sets.union(group_members[0], item)
+
+		items = frappe.get_all("Item", filters={flag: 1}, pluck="name")
+		for item, linked in get_edges(reference_type, items):
+			sets.union(item, linked)
+
+		# root -> existing groups holding its component
+		component_groups = {}
+		for group, group_members in members.items():
+			if group_members:
+				component_groups.setdefault(sets.find(group_members[0]), []).append(group)
+
+		frappe.db.delete("Item Reference Membership", {"item_reference_type": reference_type})
+		frappe.db.commit()
+
+		components = [sorted(component) for component in sets.groups() if len(component) > 1]
+		for chunk in chunked(components, 100):
+			for component in chunk:
+				existing = component_groups.get(sets.find(component[0]), [])
+				target = max(existing, key=lambda group: (len(members[group]), group)) if existing else None
+
+				target = _save_group(reference_type, target, component)
+				_write_memberships(reference_type, target, component)
+				for group in existing:
+					if group != target:
+						frappe.delete_doc("Item Reference Group", group, ignore_permissions=True, force=True)
+			frappe.db.commit()
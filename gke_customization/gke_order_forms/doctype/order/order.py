@@ -13,6 +13,14 @@ from erpnext.setup.utils import get_exchange_rate
 from erpnext.controllers.item_variant import create_variant, get_variant
 import frappe
 from frappe.desk.form.assign_to import add as add_assignment
+from gke_customization.gke_order_forms.doctype.order_workflow_transition.order_workflow_transition import (
+	log_workflow_transition, insert_transitions, delete_transitions
+)
+from gke_customization.gke_order_forms.doctype.variant_signature.variant_signature import (
+	find_variants, update_variant_signatures
+)
+from gke_customization.gke_order_forms.gc_rating import get_gc_rating
+from gke_customization.gke_order_forms.timesheet_state import cancel_order_timesheets
 
 
 class Order(Document):
@@ -22,36 +30,22 @@ class Order(Document):
 
 
 	def on_update(self):
+		log_workflow_transition(self)
 		if self.workflow_state == "Assigned":
 			create_timesheet(self)
 
 		if self.workflow_state == "Cancelled":
-			timesheets = frappe.get_all(
-				"Timesheet",
-				filters={"order": self.name},
-				fields=["name", "docstatus"]
-			)
+			# drafts are closed here, submitted Timesheets are cancelled in the background
+			timesheets = cancel_order_timesheets([self.name])
 
 			if not timesheets:
 				frappe.msgprint("No Timesheets found for this Order")
 				return
 
-			for ts in timesheets:
-				ts_doc = frappe.get_doc("Timesheet", ts.name)
-
-				if ts_doc.docstatus == 1:
-					# Proper cancel for submitted doc
-					ts_doc.cancel()
-				elif ts_doc.docstatus == 0:
-					# Draft ko forcefully cancel karna (bypass transition)
-					frappe.db.set_value("Timesheet", ts.name, "docstatus", 2)
-
-				# Workflow state update
-				frappe.db.set_value("Timesheet", ts.name, "workflow_state", "Cancelled")
-
 			frappe.msgprint(f"All linked Timesheets for Order {self.name} have been cancelled.")
 
 	def on_submit(self):
+		# the transition is logged by on_update, which frappe runs before on_submit
 		item_variant = create_line_items(self)
 		if self.bom_or_cad == 'Duplicate BOM' or (self.design_type == 'Mod - Old Stylebio & Tag No' and self.bom_type == 'Duplicate BOM'):
 			if (self.mod_reason == 'Change in Metal Touch'):
@@ -74,27 +68,18 @@ class Order(Document):
 		# if self.order_type != 'Purchase':
 		# 	cerate_timesheet(self)
 		assign_designer(self)
-		calculate_metal_weights(self)
-		calculate_finding_weights(self)
-		calculate_diamond_weights(self)
-		calculate_gemstone_weights(self)
-		calculate_other_weights(self)
-		calculate_total(self)
+		calculate_weights(self)
 		if self.is_finding_order and self.workflow_state == 'Update Item':
 			check_finding_code(self)
 		
 	def on_update_after_submit(self):
+		log_workflow_transition(self)
 		create_timesheet_copy_paste_item_bom(self)
 		if self.workflow_state == "Creating BOM" and self.docstatus == 1:
 			bom_creation(self)
 		if self.is_repairing == 0 and (self.design_type == 'Mod - Old Stylebio & Tag No' and self.bom_type != 'Duplicate BOM'):
 			cerate_bom_timesheet(self)
-		calculate_metal_weights(self)
-		calculate_finding_weights(self)
-		calculate_diamond_weights(self)
-		calculate_gemstone_weights(self)
-		calculate_other_weights(self)
-		calculate_total(self)
+		calculate_weights(self)
 		if (self.workflow_state == 'Approved' and self.mod_reason not in ['Change in Metal Touch','Change in Metal Colour']) and (self.is_finding_order==0) and (self.is_repairing==0) and self.bom_type != 'Duplicate BOM':
 			timesheet = frappe.get_doc("Timesheet",{"order":self.name},"name")
 			timesheet.run_method('submit')
@@ -102,13 +87,17 @@ class Order(Document):
 			update_variant_attributes(self)
 	
 	def on_cancel(self):
-		if frappe.db.get_list("Timesheet",filters={"order":self.name},fields="name"):
-			for timesheet in frappe.db.get_list("Timesheet",filters={"order",self.name},fields="name"):
-				frappe.db.set_value("Timesheet",timesheet["name"],"docstatus","2")
+		log_workflow_transition(self)
+		cancel_order_timesheets([self.name])
 
+		if self.workflow_state != "Cancelled":
+			insert_transitions([(self.name, self.workflow_state, "Cancelled", frappe.session.user, now_datetime(), None)])
 		frappe.db.set_value("Order",self.name,"workflow_state","Cancelled")
 		self.reload()
 
+	def on_trash(self):
+		delete_transitions([self.name])
+
 
 
 
@@ -298,116 +287,76 @@ def assign_designer(self):
 					frappe.msgprint(f"User ID not found for Employee: {row.designer}")
 
 
-def calculate_metal_weights(self):
-	total_metal_weight = 0
-	for i in self.metal_detail:
-		total_metal_weight += i.finish_product_weight
-	self.total_metal_weight = total_metal_weight
+def calculate_weights(self):
+	"""Totals of the metal, finding, diamond, gemstone and other details, the gross weight and the ratios, in one pass"""
+	total_metal_weight = sum(flt(i.finish_product_weight) for i in self.metal_detail)
 
-def calculate_finding_weights(self):
-	# total_finding_weightin_gms = 0
-	total_finding_weight = 0
-	total_finding_pcs = 0
+	finding_weight = finding_pcs = 0
 	for i in self.finding_detail:
-		total_finding_weight += i.quantity
-		total_finding_pcs += i.qty
-	self.total_finding_pcs = total_finding_pcs
-	self.total_finding_weightin_gms = total_finding_weight
+		finding_weight += flt(i.quantity)
+		finding_pcs += flt(i.qty)
 
-def calculate_diamond_weights(self):
-	total_diamond_weight = 0
-	total_diamond_pcs = 0
+	diamond_weight = diamond_pcs = 0
 	for i in self.diamond_detail:
-		total_diamond_weight += i.quantity
-		total_diamond_pcs += i.pcs
-		i.weight_in_gms = i.quantity/5
-	self.total_diamond_weight = total_diamond_weight
-	self.total_diamond_pcs = total_diamond_pcs
-	self.total_diamond_weightin_gms = total_diamond_weight/5
-
-def calculate_gemstone_weights(self):
-	total_gemstone_weight = 0
-	total_gemstone_pcs = 0
+		diamond_weight += flt(i.quantity)
+		diamond_pcs += flt(i.pcs)
+		i.weight_in_gms = flt(i.quantity)/5
+
+	gemstone_weight = gemstone_pcs = 0
 	for i in self.gemstone_detail:
-		total_gemstone_weight += i.quantity
-		total_gemstone_pcs += i.pcs
-		i.weight_in_gms = i.quantity/5
-	self.total_gemstone_weight = total_gemstone_weight
-	self.total_gemstone_pcs = total_gemstone_pcs
-	self.total_gemstone_weightin_gms = total_gemstone_weight/5
-
-def calculate_other_weights(self):
-	total_other_pcs = 0
-	total_other_weight = 0
+		gemstone_weight += flt(i.quantity)
+		gemstone_pcs += flt(i.pcs)
+		i.weight_in_gms = flt(i.quantity)/5
+
+	other_weight = other_pcs = 0
 	for i in self.other_detail:
-		total_other_weight += i.quantity
-		total_other_pcs += i.qty
-	self.total_other_weight = total_other_weight
-	self.total_other_pcs = total_other_pcs
-
-def calculate_total(self):
-	"""Calculate the total weight of metal, diamond, gemstone, and finding.
-	Also calculate the gold to diamond ratio, and the diamond ratio.
-	"""
-	self.metal_weight = self.total_metal_weight
-	self.diamond_weight = sum(row.quantity for row in self.diamond_detail)
-	self.gemstone_weight = sum(row.quantity for row in self.gemstone_detail)
-	self.other_weight = sum(row.quantity for row in self.other_detail)
-	self.finding_weight = sum(row.quantity for row in self.finding_detail)
-	self.metal_and_finding_weight = flt(self.metal_weight) + flt(self.finding_weight)
+		other_weight += flt(i.quantity)
+		other_pcs += flt(i.qty)
+
+	self.total_metal_weight = total_metal_weight
+	self.total_finding_pcs = finding_pcs
+	self.total_finding_weightin_gms = finding_weight
+	self.total_diamond_weight = diamond_weight
+	self.total_diamond_pcs = diamond_pcs
+	self.total_diamond_weightin_gms = diamond_weight/5
+	self.total_gemstone_weight = gemstone_weight
+	self.total_gemstone_pcs = gemstone_pcs
+	self.total_gemstone_weightin_gms = gemstone_weight/5
+	self.total_other_weight = other_weight
+	self.total_other_pcs = other_pcs
+
+	self.metal_weight = total_metal_weight
+	self.diamond_weight = diamond_weight
+	self.gemstone_weight = gemstone_weight
+	self.other_weight = other_weight
+	self.finding_weight = finding_weight
+	self.metal_and_finding_weight = total_metal_weight + finding_weight
 
 	self.total_diamond_weight_in_gms = self.total_diamond_weightin_gms
 	self.total_gemstone_weight_in_gms = self.total_gemstone_weightin_gms
-	
+
 	self.gross_weight = (
-		flt(self.metal_and_finding_weight)
-		+ flt(self.total_diamond_weight_in_gms)
-		+ flt(self.total_gemstone_weight_in_gms)
-		+ flt(self.total_other_weight)
+		self.metal_and_finding_weight
+		+ self.total_diamond_weight_in_gms
+		+ self.total_gemstone_weight_in_gms
+		+ other_weight
 	)
 
 	self.gold_to_diamond_ratio = (
-		flt(self.metal_and_finding_weight) / flt(self.diamond_weight) if self.diamond_weight else 0
+		self.metal_and_finding_weight / diamond_weight if diamond_weight else 0
 	)
 	self.diamond_ratio = (
-		flt(self.diamond_weight) / flt(self.total_diamond_pcs) if self.total_diamond_pcs else 0
+		diamond_weight / diamond_pcs if diamond_pcs else 0
 	)
 
 	self.metal_to_diamond_ratio_excl_of_finding = (
-		flt(self.metal_weight) / flt(self.diamond_weight) if self.diamond_weight else 0
+		total_metal_weight / diamond_weight if diamond_weight else 0
 	)
 	if self.gold_to_diamond_ratio:
-		ratio_value = float(self.gold_to_diamond_ratio)
-
-		# Fetch the single GC Ratio Master document
-		gc_ratio_master = frappe.get_single("GC Ratio Master")
-		for row in gc_ratio_master.gc_ratio:
-			range_text = row.metal_to_gold_ratio_group.strip()
-
-			try:
-				if '-' in range_text:
-					lower, upper = [float(x.strip()) for x in range_text.split('-')]
-					if lower <= ratio_value <= upper:
-						self.rating = row.rating
-						# frappe.msgprint(f"Found rating: {row.rating} for ratio {ratio_value} in range {lower}-{upper}")
-						break
-
-				elif 'Above' in range_text:
-					threshold = float(range_text.replace('Above', '').strip())
-					if ratio_value > threshold:
-						self.rating = row.rating
-						# frappe.msgprint(f"Found rating: {row.rating} for ratio {ratio_value} above {threshold}")
-						break
-
-				elif 'Below' in range_text:
-					threshold = float(range_text.replace('Below', '').strip())
-					if ratio_value < threshold:
-						self.rating = row.rating
-						# frappe.msgprint(f"Found rating: {row.rating} for ratio {ratio_value} below {threshold}")
-						break
-
-			except ValueError:
-				frappe.msgprint(f"Skipping invalid range value: {range_text}")
+		# GC Ratio Master bands, compiled and cached until the master is saved
+		rating = get_gc_rating(self.gold_to_diamond_ratio)
+		if rating is not None:
+			self.rating = rating
 	# net_wt_add_on
 
 # def cerate_timesheet(self):
@@ -1671,7 +1620,7 @@ def create_line_items(self):
 
 		if template:
 			args = make_atribute_list(self.name)
-			possible_variants = get_item_codes_by_attributes(args, template)
+			possible_variants = find_variants(template, args)
 			actual_variants = [code for code in possible_variants if code != template]
 
 			for variant_code in actual_variants:
@@ -1688,6 +1637,7 @@ def create_line_items(self):
 			"custom_sketch_order_id": sketch_order_form_id,
 			"custom_sketch_order_form_id": custom_sketch_order_form_id
 		})
+		update_variant_signatures([item_variant[0]])
 		if purchase_type_for_design:
 			frappe.db.set_value("Item", item_variant, "custom_purchase_type", purchase_type_for_design)
 		if supplier_for_design:
@@ -1732,8 +1682,13 @@ def create_line_items(self):
 
 
 def get_item_codes_by_attributes(attribute_filters, template_item_code=None):
-	items = []
-
+	"""
+	Items having, for every attribute, one of the given values. The (attribute, attribute_value)
+	posting lists are intersected in one query: an item matches when it hits every attribute.
+	"""
+	wheres = []
+	query_values = []
+	attribute_count = 0
 	for attribute, values in attribute_filters.items():
 		attribute_values = values
 
@@ -1743,51 +1698,39 @@ def get_item_codes_by_attributes(attribute_filters, template_item_code=None):
 		if not attribute_values:
 			continue
 
-		wheres = []
-		query_values = []
-		for attribute_value in attribute_values:
-			wheres.append("( attribute = %s and attribute_value = %s )")
-			query_values += [attribute, attribute_value]
+		wheres.append("( t1.attribute = %s and t1.attribute_value in %s )")
+		query_values += [attribute, tuple(attribute_values)]
+		attribute_count += 1
 
-		attribute_query = " or ".join(wheres)
+	if not attribute_count:
+		return []
 
-		if template_item_code:
-			variant_of_query = "AND t2.variant_of = %s"
-			query_values.append(template_item_code)
-		else:
-			variant_of_query = ""
-
-		query = f"""
-			SELECT
-				t1.parent
-			FROM
-				`tabItem Variant Attribute` t1
-			WHERE
-				1 = 1
-				AND (
-					{attribute_query}
-				)
-				AND EXISTS (
-					SELECT
-						1
-					FROM
-						`tabItem` t2
-					WHERE
-						t2.name = t1.parent
-						{variant_of_query}
-				)
-			GROUP BY
-				t1.parent
-			ORDER BY
-				NULL
-		"""
-
-		item_codes = set([r[0] for r in frappe.db.sql(query, query_values)])
-		items.append(item_codes)
-
-	res = list(set.intersection(*items))
-
-	return res
+	if template_item_code:
+		variant_of_query = "AND t2.variant_of = %s"
+		query_values.append(template_item_code)
+	else:
+		variant_of_query = ""
+
+	query_values.append(attribute_count)
+
+	return frappe.db.sql_list(
+		f"""
+		SELECT
+			t1.parent
+		FROM
+			`tabItem Variant Attribute` t1
+		JOIN
+			`tabItem` t2 ON t2.name = t1.parent
+		WHERE
+			( {" or ".join(wheres)} )
+			{variant_of_query}
+		GROUP BY
+			t1.parent
+		HAVING
+			COUNT(DISTINCT t1.attribute) = %s
+		""",
+		query_values,
+	)
 
 
 
@@ -2128,6 +2071,7 @@ def update_item_variant(item_variant,item_template):
 		"is_design_code":1,
 		"variant_of" : item_template
 	})
+	update_variant_signatures([item_variant])
 
 
 
@@ -2360,6 +2304,8 @@ def update_variant_attributes(self):
 		if self.get(attribute_lower) != attribute['attribute_value']:
 			frappe.db.set_value('Item Variant Attribute',attribute['name'],'attribute_value',self.get(attribute_lower))
 
+	update_variant_signatures([self.design_id])
+
 def check_finding_code(self):
 	if self.metal_touch == '22KT':
 		metal_purity = 91.9
@@ -2439,23 +2385,60 @@ def validate_variant_attributes(variant_of,attribute_list):
 
 
 
+# Order fields copied to Quotation Items, plus the ones read by make_quotation_fill_defaults
+QUOTATION_ORDER_FIELDS = [
+	"name", "branch", "project", "item", "tag_no", "metal_colour", "metal_purity", "metal_touch",
+	"gemstone_quality", "category", "diamond_quality", "subcategory", "setting_type", "delivery_date",
+	"salesman_name", "order_date", "customer_sample", "customer_voucher_no", "customer_gold",
+	"customer_diamond", "customer_stone", "customer_good", "po_no", "jewelex_batch_no", "qty",
+	"company", "customer_code", "order_type",
+]
+
+# larger selections are mapped and saved by a background job
+QUOTATION_BACKGROUND_ORDERS = 200
+
+
 @frappe.whitelist()
 def make_quotation_batch(order_names, target_doc=None):
 	if isinstance(order_names, str):
 		order_names = json.loads(order_names)
 	if isinstance(target_doc, str):
 		target_doc = json.loads(target_doc)
+
+	if len(order_names) > QUOTATION_BACKGROUND_ORDERS:
+		frappe.enqueue(
+			"gke_customization.gke_order_forms.doctype.order.order.make_quotation_batch_job",
+			queue="long",
+			timeout=3600,
+			order_names=order_names,
+			target_doc=target_doc,
+		)
+		frappe.msgprint(_("{0} Orders are being added to the Quotation in the background. The form will be reloaded when it is saved.").format(len(order_names)))
+		return
+
 	if not target_doc:
 		target_doc = frappe.new_doc("Quotation")
 	else:
 		target_doc = frappe.get_doc(target_doc)
 
-	# target_doc.items = []
-	for name in order_names:
-		order = frappe.db.get_value("Order", name, "*", as_dict=True)
-		if not order:
-			continue
+	map_orders_to_quotation(target_doc, order_names)
+	return target_doc
+
+
+def get_quotation_orders(order_names):
+	"""Orders of `order_names` with QUOTATION_ORDER_FIELDS, one query per chunk, in selection order"""
+	orders = {}
+	for start in range(0, len(order_names), 500):
+		chunk = order_names[start:start + 500]
+		for order in frappe.get_all("Order", filters={"name": ["in", chunk]}, fields=QUOTATION_ORDER_FIELDS):
+			orders[order.name] = order
+	return [orders[name] for name in order_names if name in orders]
+
 
+def map_orders_to_quotation(target_doc, order_names, progress=False):
+	orders = get_quotation_orders(order_names)
+
+	for idx, order in enumerate(orders, 1):
 		target_doc.append("items", {
 			"branch": order.branch,
 			"project": order.project,
@@ -2484,12 +2467,39 @@ def make_quotation_batch(order_names, target_doc=None):
 			"custom_jewelex_batch_no": order.jewelex_batch_no,
 			"qty": order.qty
 		})
-
-	# Only run set_missing_values once
-	first_order = frappe.db.get_value("Order", order_names[0], "*", as_dict=True)
-	make_quotation_fill_defaults(target_doc, first_order)
-
-	return target_doc
+		if progress and idx % 100 == 0:
+			frappe.publish_progress(idx * 100 / len(orders), title=_("Adding Orders to Quotation"))
+
+	# Only run set_missing_values once, with the first selected order
+	if orders:
+		make_quotation_fill_defaults(target_doc, orders[0])
+
+
+def make_quotation_batch_job(order_names, target_doc=None):
+	# name of the form the Orders were picked from, "new-quotation-..." while it is unsaved
+	source = target_doc.get("name") if target_doc else None
+	target_doc = frappe.get_doc(target_doc) if target_doc else frappe.new_doc("Quotation")
+	try:
+		map_orders_to_quotation(target_doc, order_names, progress=True)
+		target_doc.save()
+		frappe.db.commit()
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), "Quotation from Orders")
+		frappe.publish_realtime("msgprint", _("Quotation could not be created from the selected Orders"), user=frappe.session.user)
+		return
+
+	frappe.publish_realtime(
+		"msgprint",
+		_("{0} Orders added to {1}").format(len(target_doc.items), get_link_to_form("Quotation", target_doc.name)),
+		user=frappe.session.user,
+	)
+	# the form still holds the snapshot sent to the job; quotation.js reloads or opens the saved one
+	frappe.publish_realtime(
+		"quotation_batch_saved",
+		{"source": source, "name": target_doc.name},
+		user=frappe.session.user,
+	)
 
 
 def make_quotation_fill_defaults(quotation, order):
@@ -398,6 +398,20 @@ frappe.ui.form.on('Order Form', {
 				});
 			}, __("Get File"))
 		}
+
+		if(frm.doc.docstatus == '1' && frm.doc.cad_order_status == 'Failed'){
+			frm.add_custom_button(__("Retry Order Creation"), function(){
+				frappe.call({
+					method: 'gke_customization.gke_order_forms.doctype.order_form.order_form.retry_cad_order_creation',
+					args: {
+						order_form: frm.doc.name
+					},
+					callback: function() {
+						frm.reload_doc();
+					}
+				});
+			});
+		}
 	},
 	order_type(frm){
 		if(frm.doc.order_type=='Purchase'){
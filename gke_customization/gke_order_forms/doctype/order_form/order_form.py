@@ -19,15 +19,15 @@ from frappe.utils import (
 	flt,
 	formatdate,
 	get_link_to_form,
-	getdate,
 	now_datetime,
 	nowtime,
 	strip,
 	strip_html,
 )
-from frappe.utils.file_manager import save_file
-import openpyxl
-from io import BytesIO
+from gke_customization.gke_order_forms.attribute_domains import validate_attribute_values
+from gke_customization.gke_order_forms.order_form_export import export_order_form
+from gke_customization.gke_order_forms.timesheet_state import get_order_timesheets, set_timesheet_workflow_state
+from gke_customization.gke_order_forms.doctype.order_workflow_transition.order_workflow_transition import insert_transitions
 import requests
 import os
 
@@ -53,13 +53,15 @@ class OrderForm(Document):
 	# def on_cancel(self):
 	# 	delete_auto_created_cad_order(self)
 	def on_cancel(self):
-		orders = frappe.db.get_list("Order", filters={"cad_order_form": self.name}, fields="name")
+		orders = frappe.get_all("Order", filters={"cad_order_form": self.name}, fields=["name", "workflow_state"])
 		if orders:
-			for order in orders:
-				timesheets = frappe.db.get_list("Timesheet", filters={"order": order["name"]}, fields="name")
-				frappe.db.set_value("Order", order["name"], "workflow_state", "Cancelled")
-				for ts in timesheets:
-					frappe.db.set_value("Timesheet", ts["name"], "workflow_state", "Cancelled")
+			frappe.db.set_value("Order", {"cad_order_form": self.name}, "workflow_state", "Cancelled")
+			insert_transitions([
+				(order.name, order.workflow_state, "Cancelled", frappe.session.user, now_datetime(), None)
+				for order in orders if order.workflow_state != "Cancelled"
+			])
+			timesheets = get_order_timesheets([order.name for order in orders], fields=["name"])
+			set_timesheet_workflow_state([ts.name for ts in timesheets], "Cancelled")
 		frappe.db.set_value("Order Form", self.name, "workflow_state", "Cancelled")
 		self.reload()
 
@@ -88,238 +90,8 @@ class OrderForm(Document):
 					frappe.throw(_(f"Category & Sub Category mismatched in row #{row.idx}"))
 	
 	def validate_filed_value(self):
-		for row in self.get("order_details"):
-			if row.design_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Design Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.design_type not in attribute_list:
-					frappe.throw("Design Type is not Correct")
-
-			if row.diamond_quality:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Diamond Quality").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.diamond_quality not in attribute_list:
-					frappe.throw("Diamond Quality is not Correct")
-
-			if row.setting_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Setting Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.setting_type not in attribute_list:
-					frappe.throw("Setting Type is not Correct")
-			
-			if row.sub_setting_type1:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Sub Setting Type1").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.sub_setting_type1 not in attribute_list:
-					frappe.throw("Setting Type 1 is not Correct")
-			
-			if row.sub_setting_type2:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Sub Setting Type2").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.sub_setting_type2 not in attribute_list:
-					frappe.throw("Setting Type 2 is not Correct")
-			
-			if row.metal_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Metal Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.metal_type not in attribute_list:
-					frappe.throw("Metal Type is not Correct")
-
-			if row.metal_touch:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Metal Touch").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.metal_touch not in attribute_list:
-					frappe.throw("Metal Touch is not Correct")
-
-			if row.metal_colour:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Metal Colour").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.metal_colour not in attribute_list:
-					frappe.throw("Metal Colour is not Correct")
-
-			if row.diamond_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Diamond Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.diamond_type not in attribute_list:
-					frappe.throw("Diamond Type is not Correct")
-			
-			if row.sizer_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Sizer Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.sizer_type not in attribute_list:
-					frappe.throw("Sizer Type is not Correct")
-
-			if row.stone_changeable:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Stone Changeable").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.stone_changeable not in attribute_list:
-					frappe.throw("Stone Changeable is not Correct")
-
-			if row.feature:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Feature").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.feature not in attribute_list:
-					frappe.throw("Feature is not Correct")
-
-			if row.rhodium:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Rhodium").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.rhodium not in attribute_list:
-					frappe.throw("Rhodium is not Correct")
-
-			if row.enamal:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Enamal").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.enamal not in attribute_list:
-					frappe.throw("Enamal is not Correct")
-			
-			if row.gemstone_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Gemstone Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.gemstone_type not in attribute_list:
-					frappe.throw("Gemstone Type is not Correct")
-			
-			if row.gemstone_quality:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Gemstone Quality").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.gemstone_quality not in attribute_list:
-					frappe.throw("Gemstone Quality is not Correct")
-			
-			if row.mod_reason:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Mod Reason").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.mod_reason not in attribute_list:
-					frappe.throw("Mod Reason is not Correct")
-			
-			if row.finding_category:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Finding Category").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.finding_category not in attribute_list:
-					frappe.throw("Finding Category is not Correct")
-
-			if row.finding_subcategory:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Finding Sub-Category").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.finding_subcategory not in attribute_list:
-					frappe.throw("Finding Sub-Category is not Correct")
-			
-			if row.finding_size:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Finding Size").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.finding_size not in attribute_list:
-					frappe.throw("Finding Size is not Correct")
-			
-			if row.metal_target_from_range:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Metal Target Range").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.metal_target_from_range not in attribute_list:
-					frappe.throw("Metal Target Range is not Correct")
-
-			if row.diamond_target_from_range:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Diamond Target Range").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.diamond_target_from_range not in attribute_list:
-					frappe.throw("Diamond Target Range is not Correct")
-			
-			if row.detachable:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Detachable").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.detachable not in attribute_list:
-					frappe.throw("Detachable is not Correct")
-			
-			if row.lock_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Lock Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.lock_type not in attribute_list:
-					frappe.throw("Lock Type is not Correct")
-			
-			if row.capganthan:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Cap/Ganthan").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.capganthan not in attribute_list:
-					frappe.throw("Cap/Ganthan is not Correct")
-			
-			if row.charm:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Charm").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.charm not in attribute_list:
-					frappe.throw("Charm is not Correct")
-			
-			if row.back_chain:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Back Chain").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.back_chain not in attribute_list:
-					frappe.throw("ChBack Chainarm is not Correct")
-
-			if row.back_belt:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Back Belt").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.back_belt not in attribute_list:
-					frappe.throw("Back Belt is not Correct")
-
-			if row.black_bead:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Black Bead").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.black_bead not in attribute_list:
-					frappe.throw("Black Bead is not Correct")
-
-			if row.two_in_one:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","2 in 1").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.two_in_one not in attribute_list:
-					frappe.throw("2 in 1 is not Correct")
-
-			if row.chain_type:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Chain Type").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.chain_type not in attribute_list:
-					frappe.throw("Chain Type is not Correct")
-
-			# if row.customer_chain:
-			# 	attribute_list = []
-			# 	for i in frappe.get_doc("Item Attribute","Black Bead").item_attribute_values:
-			# 		attribute_list.append(i.attribute_value)
-			# 	if row.customer_chain not in attribute_list:
-			# 		frappe.throw("Black Bead is not Correct")
-
-			if row.nakshi_from:
-				attribute_list = []
-				for i in frappe.get_doc("Item Attribute","Nakshi From").item_attribute_values:
-					attribute_list.append(i.attribute_value)
-				if row.nakshi_from not in attribute_list:
-					frappe.throw("Nakshi From is not Correct")
-
+		# every attribute field of every row is checked against the cached Item Attribute values
+		validate_attribute_values(self.get("order_details"))
 
 		
 
@@ -331,14 +103,35 @@ from frappe.utils import get_link_to_form
 from frappe import _
 from datetime import datetime, time, timedelta
 
+# rows mapped to Orders per commit of the background job
+CAD_ORDER_CHUNK_SIZE = 20
+
+
 def create_cad_orders(self):
     
     if self.docstatus == 0 or self.workflow_state in ["Draft","Send For Approval", "Cancelled"]:
         frappe.msgprint(_("Order creation skipped because document is in Draft or Cancelled state."))
         return
 
-    doclist = []
+    # fail the submit early instead of in the job
+    get_cad_delivery_rules()
+
+    enqueue_cad_orders(self)
+    frappe.msgprint(_("{0} Orders are being created in the background. Progress is shown on this form.").format(len(self.order_details)))
+
 
+def enqueue_cad_orders(doc):
+    doc.db_set({"cad_order_status": "Queued", "cad_order_error": None}, update_modified=False)
+    frappe.enqueue(
+        "gke_customization.gke_order_forms.doctype.order_form.order_form.create_cad_orders_job",
+        queue="long",
+        timeout=3600,
+        order_form=doc.name,
+        enqueue_after_commit=True,
+    )
+
+
+def get_cad_delivery_rules():
     order_criteria = frappe.get_single("Order Criteria")
     criteria_rows = order_criteria.get("order")
     enabled_criteria = next((row for row in criteria_rows if not row.disable), None)
@@ -376,55 +169,122 @@ def create_cad_orders(self):
     else:
         ibm_timedelta = timedelta()
 
-    for row in self.order_details:
-        docname = make_cad_order(row.name, parent_doc=self)
+    return cad_days, cad_time, ibm_timedelta
 
-        if row.pre_order_form_details:
-            frappe.db.set_value("Pre Order Form Details", row.pre_order_form_details, "order_form_id", self.name)
 
-        order_datetime = now_datetime()
-        frappe.db.set_value("Order", docname, "order_date", order_datetime)
+def create_cad_orders_job(order_form):
+    """
+        Background job of Order Form submit. Rows are mapped to Orders in chunks, one commit per chunk.
+        Rows that already have an Order are skipped, so a failed or repeated run picks up where it stopped.
+    """
+    self = frappe.get_doc("Order Form", order_form)
+    if self.docstatus != 1:
+        return
+
+    cad_days, cad_time, ibm_timedelta = get_cad_delivery_rules()
 
-        if self.delivery_date:
-            frappe.db.set_value("Order", docname, "delivery_date", self.delivery_date)
+    existing = set(frappe.get_all(
+        "Order",
+        filters={"cad_order_form": self.name, "docstatus": ["<", 2]},
+        pluck="cad_order_form_detail",
+    ))
+    pending = [row for row in self.order_details if row.name not in existing]
+    created = len(self.order_details) - len(pending)
 
-        cad_delivery_datetime = datetime.combine(order_datetime.date() + timedelta(days=cad_days), cad_time)
-        ibm_delivery_datetime = cad_delivery_datetime + ibm_timedelta
+    self.db_set({"cad_order_status": "In Progress", "cad_orders_created": created}, update_modified=False)
+    frappe.db.commit()
 
-        frappe.db.set_value("Order", docname, "cad_delivery_date", cad_delivery_datetime)
-        frappe.db.set_value("Order", docname, "ibm_delivery_date", ibm_delivery_datetime)
+    doclist = []
+    for start in range(0, len(pending), CAD_ORDER_CHUNK_SIZE):
+        chunk = pending[start:start + CAD_ORDER_CHUNK_SIZE]
+        try:
+            for row in chunk:
+                order_datetime = now_datetime()
+                cad_delivery_datetime = datetime.combine(order_datetime.date() + timedelta(days=cad_days), cad_time)
+                values = {
+                    "order_date": order_datetime,
+                    "cad_delivery_date": cad_delivery_datetime,
+                    "ibm_delivery_date": cad_delivery_datetime + ibm_timedelta,
+                }
+                if self.delivery_date:
+                    values["delivery_date"] = self.delivery_date
+
+                docname = make_cad_order(row.name, parent_doc=self, values=values)
+
+                if row.pre_order_form_details:
+                    frappe.db.set_value("Pre Order Form Details", row.pre_order_form_details, "order_form_id", self.name)
+
+                doclist.append(get_link_to_form("Order", docname))
+        except Exception:
+            frappe.db.rollback()
+            self.db_set({
+                "cad_order_status": "Failed",
+                "cad_order_error": _("Row {0}: {1}").format(row.idx, frappe.get_traceback().strip().splitlines()[-1]),
+            }, update_modified=False)
+            frappe.db.commit()
+            frappe.log_error(frappe.get_traceback(), f"CAD Order Creation: {self.name}")
+            return
+
+        created += len(chunk)
+        self.db_set("cad_orders_created", created, update_modified=False)
+        frappe.db.commit()
+        frappe.publish_progress(
+            created * 100 / len(self.order_details),
+            title=_("Creating Orders"),
+            doctype="Order Form",
+            docname=self.name,
+            description=_("{0} of {1} Orders created").format(created, len(self.order_details)),
+        )
 
-        doclist.append(get_link_to_form("Order", docname))
+    self.db_set("cad_order_status", "Completed", update_modified=False)
+    frappe.db.commit()
 
     if doclist:
         msg = _("The following {0} were created: {1}").format(
             frappe.bold(_("Orders")), "<br>" + ", ".join(doclist)
         )
-        frappe.msgprint(msg)
+        frappe.publish_realtime("msgprint", msg, user=frappe.session.user)
+
+
+@frappe.whitelist()
+def retry_cad_order_creation(order_form):
+    doc = frappe.get_doc("Order Form", order_form)
+    doc.check_permission("submit")
+
+    if doc.docstatus != 1:
+        frappe.throw(_("Order Form {0} is not submitted").format(doc.name))
+    if doc.cad_order_status in ("Queued", "In Progress"):
+        frappe.throw(_("Order creation is already running for {0}").format(doc.name))
+
+    enqueue_cad_orders(doc)
 
 
 def delete_auto_created_cad_order(self):
 	for row in frappe.get_all("Order", filters={"order_form": self.name}):
 		frappe.delete_doc("Order", row.name)
 
-def make_cad_order(source_name, target_doc=None, parent_doc = None):
+def make_cad_order(source_name, target_doc=None, parent_doc = None, values=None):
 	def set_missing_values(source, target):
 		target.cad_order_form_detail = source.name
 		target.cad_order_form = source.parent
 		target.index = source.idx
 	
-	
-	design_type = frappe.get_doc('Order Form Detail',source_name).design_type
-	item_type = frappe.get_doc('Order Form Detail',source_name).item_type
-	# as_per_serial_no = frappe.get_doc('Order Form Detail',source_name).as_per_serial_no
-	mod_reason = frappe.get_doc('Order Form Detail',source_name).mod_reason
-	design_id = frappe.get_doc('Order Form Detail',source_name).design_id
-	is_repairing = frappe.get_doc('Order Form Detail',source_name).is_repairing
-	is_finding_order = frappe.get_doc('Order Form Detail',source_name).is_finding_order
+	# the row is already loaded with its parent
+	detail = next((row for row in parent_doc.get("order_details", []) if row.name == source_name), None)
+	if not detail:
+		detail = frappe.get_doc('Order Form Detail',source_name)
+
+	design_type = detail.design_type
+	item_type = detail.item_type
+	# as_per_serial_no = detail.as_per_serial_no
+	mod_reason = detail.mod_reason
+	design_id = detail.design_id
+	is_repairing = detail.is_repairing
+	is_finding_order = detail.is_finding_order
 	if design_type == 'Mod - Old Stylebio & Tag No':
 		if is_repairing == 1:
-			bom_or_cad = frappe.get_doc('Order Form Detail',source_name).bom_or_cad
-			item_type = frappe.get_doc('Order Form Detail',source_name).item_type
+			bom_or_cad = detail.bom_or_cad
+			item_type = detail.item_type
 		else:
 		# 	variant_of = frappe.db.get_value("Item",design_id,"variant_of")
 		# 	bom = frappe.db.get_value('Item',design_id,'master_bom')
@@ -493,6 +353,8 @@ def make_cad_order(source_name, target_doc=None, parent_doc = None):
 	doc.bom_or_cad = bom_or_cad
 	if design_type in ['New Design','Sketch Design']:
 		doc.workflow_type = 'CAD'
+	# dates are set before the insert so each Order is written once
+	doc.update(values or {})
 	
 	doc.save()
 	if design_type == 'As Per Design Type' and item_type == "No Variant No Suffix" and bom_or_cad == 'New BOM':
@@ -1337,710 +1199,19 @@ def make_from_pre_order_form(source_name, target_doc=None):
 # for customer order form 
 @frappe.whitelist()
 def gc_export_to_excel(order_form, doc):
-	order_form_doc = frappe.get_doc('Order Form', order_form)
-	doc = json.loads(doc)  
-	order_date_str = getdate(order_form_doc.order_date).strftime("%Y-%m-%d")
-	
-	file_name = f"GC_Format_{order_date_str}.xlsx" 
-
-	workbook = openpyxl.Workbook()
-	sheet = workbook.active
-	sheet.title = 'GC Format'
-
-	# Define headers
-	headers = [
-		# 'Date','Customer','Customer Name','Company',
-		'Code on Tag','Product Category',
-		'Product Wt','CFA','Brand',
-		'KT','Stone size',
-		'Stone Code',
-		'Stone Qty','Check stock code Duplicated',
-		'Brief CATPB',
-		'Remarks'
-		]
-	
-	sheet.append(headers)
-
-	# Store all rows in a list before writing to the sheet
-	rows_data = []
-	
-	for row in doc.get('order_details', []):
-		if row.get('design_id'):
-			bom_list = ''
-			if row.get('tag_no'): 
-				# frappe.throw(f"{row.get('tag_no')}")
-				bom_list = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'bom_type': 'Finish Goods'}, fields=['*'])
-			else:  
-				# 'bom_type': 'Template'
-				bom_list = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'name': row['bom']}, fields=['*'])
-
-			if bom_list:
-				bom_diamond = frappe.db.get_all("BOM Diamond Detail", 
-								filters={'parent': bom_list[0].get('name')}, fields=['*'])
-				max_rows = len(bom_diamond) or 1
-
-				for i in range(max_rows):
-					diamond = bom_diamond[i] if i < len(bom_diamond) else {}
-					
-					row_data = [
-						# order_form_doc.order_date if i == 0 else "",
-						# order_form_doc.customer_code if i == 0 else "",
-						# order_form_doc.company if i == 0 else "",
-
-						row.get('design_id', '') if i == 0 else "",
-						row.get('category', '') if i == 0 else "", 
-						f"{float(bom_list[0].get('gross_weight', 0)):0.3f}" if i == 0 else "",
-						'',
-						order_form_doc.customer_name if i == 0 else "",
-						row.get('metal_touch', '') if i == 0 else "",
-						f"{float(diamond.get('size_in_mm', 0)):0.2f} MM",
-						'',
-						f"{float(diamond.get('pcs', 0)):0.2f}",
-						'',
-						'',
-						''
-					]
-					rows_data.append(row_data)
-
-	if rows_data:
-		for row in rows_data:
-			sheet.append(row)
-	else:
-		frappe.throw("GC Sheet Can Not Download")
-
-	output = BytesIO()
-	workbook.save(output)
-	output.seek(0)
-
-	file_doc = save_file(
-		file_name,
-		output.getvalue(),
-		order_form_doc.doctype,
-		order_form_doc.name,
-		is_private=0
-	)
-	
-	return file_doc.file_url
-
+	return export_order_form("gc_format", order_form, doc)
 
 
 @frappe.whitelist()
 def creation_export_to_excel(order_form, doc):
-	order_form_doc = frappe.get_doc('Order Form', order_form)
-	doc = json.loads(doc)  
-	
-	order_date_str = getdate(order_form_doc.order_date).strftime("%Y-%m-%d")
-	file_name = f"Code_Creation_File_{order_date_str}.xlsx" 
-
-	workbook = openpyxl.Workbook()
-	sheet = workbook.active
-	sheet.title = 'Code Creation File'
-
-	headers = [
-		"S.No","Date","Collection Name","Theme Code","Designer","Karat","Complexity",
-		"CFA","Vendor Name","Vendor Ref Code","Category","Group","Individual wt",
-		"Total Wt","Catpb","Length","Size","Cart","Findings","Stone Quality",
-		"Shape","Metal Color","UOM","Gender","Remarks","Stone Combination"
-	]
-
-	sheet.append(headers) 
-	
-	rows_data = []
-
-	for row in doc.get('order_details', []):
-		if row['design_id']:
-			finish_bom_list = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'bom_type': 'Finish Goods'}, fields=['name'])
-			
-			finish_bom = ''
-			if len(finish_bom_list) > 1:
-				order = frappe.db.get_value("Order", 
-					{'cad_order_form': order_form, 'item': row['design_id']},'name')	
-				pmo = frappe.db.get_value("Parent Manufacturing Order",{'order_form_id': order}, 'name')
-				snc = frappe.db.get_value("Serial Number Creator",{'parent_manufacturing_order': pmo}, 'name')
-				fg_bom = frappe.db.get_value("BOM", {'custom_serial_number_creator': snc, 'item': row['design_id'], 'bom_type': 'Finish Goods'}, 'name')
-				finish_bom = fg_bom		
-			else:
-				for fg in finish_bom_list:
-					finish_bom = fg.get('name')
-			
-			final_bom = ''
-			if finish_bom:
-				final_bom = finish_bom
-			else:
-				final_bom = frappe.db.get_value("Item", {'name': row["design_id"],}, ['master_bom'])
-			
-			# frappe.throw(f"{final_bom}")
-			
-			if final_bom:
-				item_bom = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'name': final_bom}, fields=['*'])
-					
-				order_date = frappe.utils.formatdate(order_form_doc.order_date, "dd.MM.yyyy")
-				row_data = [
-					row.get('idx', ''),
-					order_date,
-					row.get('collection_name', '') ,
-					'',
-					'',
-					row.get('metal_touch', ''),
-					row.get('mfg_complexity_code', ''),
-					'',
-					order_form_doc.company,
-					row.get('design_id', ''),
-					row.get('category', ''),
-					'',
-					'', # item_bom[0].get('gross_weight', '') , #ind wt
-					'', # total wt
-					'', 
-					'',
-					'', 
-					'',
-					'', 
-					row.get('diamond_quality', ''),
-					'',
-					row.get('metal_colour', ''),
-					row.get('uomset_of', ''),
-					row.get('gender', ''),
-					'',
-					'',
-					
-				]
-				rows_data.append(row_data) 
+	return export_order_form("code_creation", order_form, doc)
 
-	# Write all rows to the Excel sheet at once
-	if rows_data:
-		for row in rows_data:
-			sheet.append(row)
-	else:
-		frappe.throw("Code creation Sheet Can Not Download , Check all details..")
-	output = BytesIO()
-	workbook.save(output)
-	output.seek(0)
-
-	file_doc = save_file(
-		file_name,
-		output.getvalue(),
-		order_form_doc.doctype,
-		order_form_doc.name,
-		is_private=0
-	)
-	
-	return file_doc.file_url
 
 @frappe.whitelist()
 def proto_export_to_excel(order_form, doc):
+	return export_order_form("proto_sheet", order_form, doc)
 
-	order_form_doc = frappe.get_doc('Order Form', order_form)
-	doc = json.loads(doc)
-
-	order_date_str = getdate(order_form_doc.order_date).strftime("%Y-%m-%d")
-	file_name = f"Proto_Sheet_{order_date_str}.xlsx"
-
-	workbook = openpyxl.Workbook()
-	sheet = workbook.active
-	sheet.title = 'Proto Sheet'
-	
-	# Store all rows in a list before writing to the sheet
-	rows_data = []
-	# frappe.throw(f"heree{order_form_doc.customer_name}")
-	if 'Caratlane' in order_form_doc.customer_name:
-		# Define headers
-		headers = [
-			"Caratlane SKU Code", "Item Code", "Vendor Style Code", "Images",
-			"Gold Kt", "Gold Colour", "Product Type", "Product Size", "Stone Type",
-			"Diamond Sieve Size/Col Stone", "Diamond Shape", "Diamond Sieve Size(mm Size)",
-			"Quantity", "Individual Stone Wt", "Total Stone Wt", "Setting Type", "Type",
-			"Stone Quality", "Stone Colour", "Cut", "Rate PCT", "Value", "Gross Weight",
-			"Metal Colour", "Metal Karat", "Quantity", "Gold Weight", "Finding Name",
-			"Finding Quantity", "Finding Weight", "Finding Colour", "Finding Karat","Finding Type", 
-			"Net Weight(Min)", "Net Weight(Avg)", "Net Weight(Max)",
-			"Diamond Weight(Min)", "Diamond Weight(Avg)", "Diamond Weight(Max)",
-			# "Gemstone Type", "Gemstone Shape", "Gemstone Quantity", "Gemstone Weight",
-			"Finishing Information", "Shipping Days", "Metal Rate", "Total Dia",
-			"Cent per gm", "Labor", "Per Pc Labor", "Wastage", "Total", "Total Price", "Technique"
-		]
-		sheet.append(headers)
-
-		# Loop through order details
-		for row in doc.get('order_details', []):
-			if row['design_id']:
-				finish_bom_list = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'bom_type': 'Template'}, fields=['name'])
-				
-				finish_bom = ''
-				if len(finish_bom_list) > 1:
-					order = frappe.db.get_value("Order", 
-						{'cad_order_form': order_form, 'item': row['design_id']},'name')	
-					pmo = frappe.db.get_value("Parent Manufacturing Order",{'order_form_id': order}, 'name')
-					snc = frappe.db.get_value("Serial Number Creator",{'parent_manufacturing_order': pmo}, 'name')
-					fg_bom = frappe.db.get_value("BOM", {'custom_serial_number_creator': snc, 'item': row['design_id'], 'bom_type': 'Finish Goods'}, 'name')
-					finish_bom = fg_bom		
-				else:
-					for fg in finish_bom_list:
-						finish_bom = fg.get('name')
-				
-				# frappe.throw(f"{finish_bom}")
-				
-				if finish_bom:
-					item_image = frappe.db.get_value("Item", {'name': row["design_id"]}, ['image'])
-					item_bom = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'name': finish_bom}, fields=['*'])
-					bom_metal = frappe.db.get_all("BOM Metal Detail", filters={'parent': finish_bom}, fields=['*'])
-					bom_diamond = frappe.db.get_all("BOM Diamond Detail", filters={'parent': finish_bom}, fields=['*'])
-					bom_finding = frappe.db.get_all("BOM Finding Detail", filters={'parent': finish_bom}, fields=['*'])
-					bom_gems = frappe.db.get_all("BOM Gemstone Detail", filters={'parent': finish_bom}, fields=['*'])
-									
-					# Get the maximum number of rows needed for this item
-					max_rows = max(len(bom_diamond), len(bom_finding), len(bom_metal), len(bom_gems)) or 1
-
-					for i in range(max_rows):
-						diamond = bom_diamond[i] if i < len(bom_diamond) else {}
-						finding = bom_finding[i] if i < len(bom_finding) else {}
-						metal = bom_metal[i] if i < len(bom_metal) else {}
-						gemstone = bom_gems[i] if i < len(bom_gems) else {}
-						
-						diamond_tolerance = set_tolerance(diamond.get('quantity', 0), order_form_doc.customer_code)
-						
-						row_data = [
-							"",  # Caratlane SKU Code
-							row.get('design_id', '') if i == 0 else "",  # Item Code (only first row)
-							"",  # Vendor Style Code
-							item_image if i == 0 else "",  # Images (only first row)
-							metal.get('metal_touch', '') if i == 0 else "",  # Gold Kt (only first row)
-							metal.get('metal_colour', '') if i == 0 else "",  # Gold Colour (only first row)
-							row.get('category', '') if i == 0 else "",  # Product Type (only first row)
-							row.get("product_size", "") if i == 0 else "",  # Product Size (only first row)
-							diamond.get('diamond_type', ''),  # Stone Type
-							diamond.get('sieve_size_range', ''),  # Diamond Sieve Size/Col Stone
-							diamond.get('stone_shape', ''),  # Diamond Shape
-							diamond.get('size_in_mm', ''),  # Diamond Sieve Size(mm Size)
-							diamond.get('pcs', ''),  # Quantity
-							diamond.get('weight_per_pcs', ''),  # Individual Stone Wt
-							"",  # Total Stone Wt (not available in the given structure)
-							diamond.get('sub_setting_type', ''),  # Setting Type
-							"",  # Type
-							diamond.get('quality', ''),  # Stone Quality
-							diamond.get('sieve_size_color', ''),  # Stone Colour
-							"", "", "",  # Cut, Rate PCT, Value
-							item_bom[0].get('gross_weight', '') if i == 0 else "",  # Gross Weight (only first row)
-							metal.get('metal_colour', ''),  # Metal Colour
-							metal.get('metal_touch', ''),  # Metal Karat
-							metal.get('quantity', ''),  # Quantity
-							metal.get('actual_quantity', ''),  # Gold Weight
-							finding.get('finding_category', ''),  # Finding Name
-							finding.get('qty', ''),  # Finding Quantity
-							finding.get('quantity', ''),  # Finding Weight
-							finding.get('metal_colour', ''),  # Finding Colour
-							finding.get('metal_touch', ''),  # Finding Karat
-							"", # Finding Type
-							"", "", # Net Weights
-							item_bom[0].get('metal_and_finding_weight', '') if i == 0 else "",
-							# "", "", "", #, Diamond Weights
-							diamond_tolerance.get('min_diamond', ''),  # Diamond Weight (Min)
-							diamond_tolerance.get('diamond_weight', ''),  # Diamond Weight (Avg)
-							diamond_tolerance.get('max_diamond', ''),  # Diamond Weight (Max)
-							# "", "", "", "",  
-							# gemstone.get('stone_type', ''),  # Gemstone Type
-							# gemstone.get('stone_shape', ''),  # Gemstone Shape
-							# gemstone.get('pcs', ''),  # Gemstone Quantity
-							# gemstone.get('total_weight', ''),  # Gemstone Weight
-							"", "", 
-							metal.get('rate'), #metal rate 
-							"", "", "", "", "", "", "", "", ""  # Remaining empty fields
-						]
-						rows_data.append(row_data)
-
-						# if i == 0 and item_image:
-						# 	try:
-						# 		file_path = get_file(item_image)  # Fetch image file path
-						# 		img = Image(file_path)
-						# 		img.width, img.height = 100, 100  # Resize image
-						# 		img_cell = f"D{row_index}"  # Column "D" (Images), row based on row_index
-						# 		sheet.add_image(img, img_cell)
-						# 	except Exception as e:
-						# 		frappe.log_error(f"Image Insert Error: {str(e)}", "Proto Export")
-	
-	elif 'Reliance' in order_form_doc.customer_name:
-		# Define headers
-		headers = [
-			"Sr. NO.","Collection Name", "Vendor Name", "Vendor Design Code", "Proto Image", "Article", 
-			"Metal Color", "Purity", "Stone Clarity", "Approx Net Wt (gms)", "Approx Dia Wt (cts)", 
-			"Approx Color Stone Wt (cts)", "Size", "Findings", "Design Approved By", "Catrgory Approved By", 
-			"Sourcing Approved By", "NPD Approved By", "QA Approved By", "QA Remarks", "Remark"
-		]
-		sheet.append(headers)
-
-		# Loop through order details
-		for row in doc.get('order_details', []):
-			if row['design_id']:
-				finish_bom_list = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'bom_type': 'Finish Goods'}, fields=['name'])
-				
-				finish_bom = ''
-				if len(finish_bom_list) > 1:
-					order = frappe.db.get_value("Order", 
-						{'cad_order_form': order_form, 'item': row['design_id']},'name')	
-					pmo = frappe.db.get_value("Parent Manufacturing Order",{'order_form_id': order}, 'name')
-					snc = frappe.db.get_value("Serial Number Creator",{'parent_manufacturing_order': pmo}, 'name')
-					fg_bom = frappe.db.get_value("BOM", {'custom_serial_number_creator': snc, 'item': row['design_id'], 'bom_type': 'Finish Goods'}, 'name')
-					finish_bom = fg_bom		
-				else:
-					for fg in finish_bom_list:
-						finish_bom = fg.get('name')
-				
-				final_bom = ''
-				if finish_bom:
-					final_bom = finish_bom
-				else:
-					final_bom = frappe.db.get_value("Item", {'name': row["design_id"],}, ['master_bom'])
-								
-				# frappe.throw(f"{finish_bom}")
-				
-				if final_bom:
-					item_bom = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'name': final_bom}, fields=['*'])
-
-					realiance_quality = frappe.db.get_value("Customer Prolif Detail", 
-						{'parent': order_form_doc.customer_code, 'gk_d': row.get('diamond_quality')  },
-						['customer_prolif']
-						) 
-					realiance_quality if realiance_quality else ''
-
-					codes = frappe.db.get_all(
-						"Reliance Size Master", 
-						filters={
-							'customer': order_form_doc.customer_code,
-							'item_category': row.get('category')
-						},
-						or_filters=[
-							['product_size', 'like', f"{row.get('product_size')}%"]
-						],
-						fields=['code','product_size'],
-						# as_dict=1
-					)
-					order_size = float(row.get('product_size'))
-					
-					code_categories = frappe.db.get_value(
-						"Customer Category Detail",
-						{
-							'parent': order_form_doc.customer_code,
-							'gk_category': row.get('category') ,
-							'gk_sub_category': row.get('subcategory') 
-					  	},
-						['customer_category','customer_subcategory','code_category','article'],
-						as_dict=True
-					)
-
-					row_data = [
-						row.get('idx') ,
-						row.get('collection_name', '') ,
-						"GK", #order_form_doc.company,
-						row.get('design_id', '') ,  
-						"",
-						code_categories['article'], # row.get('category', ''),
-						f"{row.get('metal_colour', '')} {row.get('metal_type', '')}",
-						row.get('metal_touch', ''),
-						realiance_quality, # row.get('diamond_quality', ''),
-						item_bom[0].get('metal_and_finding_weight', '') ,
-						item_bom[0].get('diamond_weight', '') , 
-						"",
-						"", # row.get('product_size', ''),
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",						
-					]
-					rows_data.append(row_data)
-
-	elif 'Novel' in order_form_doc.customer_name:
-		# Define headers
-		headers = [
-			"SR. NO.","Design Selecion Date","Collection Name","Vendor Name","Order Type","Image","Theme Code","Vendor/ Designer Ref Code","Set Code",
-			"Product Group","Product SubGroup","Product Category","Sub Category","Category, Sub-Category Code","Size","Size (UOM)","KT","Metal Color",
-			"Diamond Quality","Stone Proliferation","Qty","UOM","Findings","Proto Remarks in PO","Metal Purity","Gross Wt.","Gold Weight","Diamond Carat Weight",
-			"Polki Wt.","Other Stone Weight","Polki Quality","Gender","Design Source/Route","TOTAL LABOUR AMOUNT","DIAMOND HANDLING AMOUNT","TOTAL DIAMOND AMOUNT",
-			"COLORSTONE HANDLING AMOUNT","COLORSTONE AMOUNT","GOLD AMOUNT","LOSS AMOUNT","ADDITIONAL CHARGES","TOTAL VALUE","Design Complexity","Need state",
-			"Primary Design language","Name of the Design Motif","Modularity Flag","Modularity description","Finish Type","Colour Stone Name","Colour Stone Type",
-			"Colorstone Color Family","Enamel Color Family","Bangle"
-			]
-
-		sheet.append(headers)
-		# Loop through order details
-		for row in doc.get('order_details', []):
-			if row['design_id']:
-				finish_bom_list = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'bom_type': 'Finish Goods'}, fields=['name'])
-				
-				finish_bom = ''
-				if len(finish_bom_list) > 1:
-					order = frappe.db.get_value("Order", 
-						{'cad_order_form': order_form, 'item': row['design_id']},'name')	
-					pmo = frappe.db.get_value("Parent Manufacturing Order",{'order_form_id': order}, 'name')
-					snc = frappe.db.get_value("Serial Number Creator",{'parent_manufacturing_order': pmo}, 'name')
-					fg_bom = frappe.db.get_value("BOM", {'custom_serial_number_creator': snc, 'item': row['design_id'], 'bom_type': 'Finish Goods'}, 'name')
-					finish_bom = fg_bom		
-				else:
-					for fg in finish_bom_list:
-						finish_bom = fg.get('name')
-				
-				final_bom = ''
-				if finish_bom:
-					final_bom = finish_bom
-				else:
-					final_bom = frappe.db.get_value("Item", {'name': row["design_id"],}, ['master_bom'])
-				
-				# frappe.throw(f"{final_bom}")
-				
-				if final_bom:
-					item_bom = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'name': final_bom}, fields=['*'])
-					order_date_fmt = frappe.utils.formatdate(order_form_doc.order_date, "dd-MM-yyyy")
-					
-					novel_quality = frappe.db.get_value("Customer Prolif Detail", 
-						{'parent': order_form_doc.customer_code, 'gk_d': row.get('diamond_quality')  },
-						['customer_prolif']
-						) 
-					novel_quality if novel_quality else ''
-					
-					product_size = row.get('product_size')
-					order_size = float(product_size)
-
-					code_entry = frappe.db.get_value(
-						"Novel Size Master",
-						{
-							'customer': order_form_doc.customer_code,
-							'item_category': row.get('category'),
-							'product_size_in': product_size
-						},
-						['code', 'product_size'],
-						as_dict=True
-					)
-
-					code_size = code_entry['code'] if code_entry else order_size
-
-					metal_purity = float(item_bom[0].get('metal_purity', 0))
-					converted_purity = round(metal_purity / 100, 2)
-
-					code_categories = frappe.db.get_value(
-						"Customer Category Detail",
-						{
-							'parent': order_form_doc.customer_code,
-							'gk_category': row.get('category') ,
-							'gk_sub_category': row.get('subcategory') 
-					  	},
-						['customer_category','customer_subcategory','code_category'],
-						as_dict=True
-					)
-
-					# frappe.throw(f"{code_category['code_category']}")
-					
-					row_data = [
-						row.get('idx') ,
-						order_date_fmt,
-						row.get('collection_name', '') ,
-						order_form_doc.company,
-						f"{order_form_doc.flow_type} Order",
-						"",
-						"",
-						row.get('design_id', ''),
-						row.get('category', ''),
-						"Studded",
-						"Studded-DIS",
-						code_categories['customer_category'], #category
-						code_categories['customer_subcategory'], #subcategory
-						code_categories['code_category'], #code
-						code_size,
-						"",
-						row.get('metal_touch', ''),
-						row.get('metal_colour', ''),
-						novel_quality,
-						"",
-						row.get('qty', ''),
-						row.get('uomset_of', ''),
-						"", #finding
-						"",
-						converted_purity , #metal purity
-						item_bom[0].get('gross_weight', '') , #gross wt
-						item_bom[0].get('metal_and_finding_weight', 'metal_weight') , #gold wt
-						item_bom[0].get('diamond_weight', '') , #diam wt
-						"",
-						"",
-						"",
-						row.get('gender', ''),
-						"",
-						"", #labour amount
-						"", #diam handling amt
-						"", #diam amt
-						"", #colorstone handling amt
-						"", #colorstone amt
-						"", #gold amt
-						"", #loss amt
-						"", #additional charge
-						"", #total value
-						row.get('mfg_complexity_code', ''),
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						"",
-						]
-					rows_data.append(row_data)
-
-	
-	# Write all rows to the Excel sheet at once
-	if rows_data:
-		for row in rows_data:
-			sheet.append(row)
-	else:
-		frappe.throw("Proto Sheet Can Not Download")
-
-	# Save the workbook to a BytesIO stream
-	output = BytesIO()
-	workbook.save(output)
-	output.seek(0)
-
-	file_doc = save_file(
-		file_name,
-		output.getvalue(),
-		order_form_doc.doctype,
-		order_form_doc.name,
-		is_private=0
-	)
-
-	return file_doc.file_url
 
 @frappe.whitelist()
-def get_variant_format(order_form, doc): 
-	
-	order_form_doc = frappe.get_doc('Order Form', order_form)
-	doc = json.loads(doc)
-
-	order_date_str = getdate(order_form_doc.order_date).strftime("%Y-%m-%d")
-	file_name = f"Variant_Format_{order_date_str}.xlsx"
-
-	workbook = openpyxl.Workbook()
-	sheet = workbook.active
-	sheet.title = 'Variant Format'
-
-	rows_data = []
-
-	if 'Reliance' in order_form_doc.customer_name:
-		headers = [
-			"Vendor Code","Article","Vendor design code", "Purity","Set of", "Metal Color", 
-			"Dia quality", "Variant Size","Net Wt","Dia pcs", "Dia Wt",
-			"Color Stone pcs", "Color Stone Wt", "Gross Wt", "Remark"
-		]
-		sheet.append(headers)
-
-		# Loop through order details
-		for row in doc.get('order_details', []):
-			if row['design_id']:
-				finish_bom_list = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'bom_type': 'Finish Goods'}, fields=['name'])
-				
-				finish_bom = ''
-				if len(finish_bom_list) > 1:
-					order = frappe.db.get_value("Order", 
-						{'cad_order_form': order_form, 'item': row['design_id']},'name')	
-					pmo = frappe.db.get_value("Parent Manufacturing Order",{'order_form_id': order}, 'name')
-					snc = frappe.db.get_value("Serial Number Creator",{'parent_manufacturing_order': pmo}, 'name')
-					fg_bom = frappe.db.get_value("BOM", {'custom_serial_number_creator': snc, 'item': row['design_id'], 'bom_type': 'Finish Goods'}, 'name')
-					finish_bom = fg_bom		
-				else:
-					for fg in finish_bom_list:
-						finish_bom = fg.get('name')
-				
-				final_bom = ''
-				if finish_bom:
-					final_bom = finish_bom
-				else:
-					final_bom = frappe.db.get_value("Item", {'name': row["design_id"],}, ['master_bom'])
-								
-				# frappe.throw(f"{finish_bom}")
-				
-				if final_bom:
-					item_bom = frappe.db.get_list("BOM", filters={'item': row["design_id"], 'name': final_bom}, fields=['*'])
-					
-					realiance_quality = frappe.db.get_value("Customer Prolif Detail", 
-						{'parent': order_form_doc.customer_code, 'gk_d': row.get('diamond_quality')  },
-						['customer_prolif']
-						) 
-					realiance_quality if realiance_quality else ''
-
-					code_categories = frappe.db.get_value(
-						"Customer Category Detail",
-						{
-							'parent': order_form_doc.customer_code,
-							'gk_category': row.get('category') ,
-							'gk_sub_category': row.get('subcategory') 
-					  	},
-						['customer_category','customer_subcategory','code_category','article'],
-						as_dict=True
-					)
-
-					row_data = [
-						"",
-						code_categories['code_category'],
-						row.get('design_id', '') ,  
-						row.get('metal_touch', ''),
-						"",
-						f"{row.get('metal_colour', '')} {row.get('metal_type', '')}",
-						realiance_quality,
-						"", # row.get('product_size', ''),
-						item_bom[0].get('metal_and_finding_weight', '') ,
-						item_bom[0].get('total_diamond_pcs', '') ,
-						item_bom[0].get('diamond_weight', '') , 
-						"",
-						"",
-						item_bom[0].get('gross_weight', '') , 
-						"",
-
-					]
-					rows_data.append(row_data)
-				# Write all rows to the Excel sheet at once
-	
-	if rows_data:
-		for row in rows_data:
-			sheet.append(row)
-	else:
-		frappe.throw("Proto Sheet Can Not Download")
-
-	# Save the workbook to a BytesIO stream
-	output = BytesIO()
-	workbook.save(output)
-	output.seek(0)
-
-	file_doc = save_file(
-		file_name,
-		output.getvalue(),
-		order_form_doc.doctype,
-		order_form_doc.name,
-		is_private=0
-	)
-
-	return file_doc.file_url
-
-def set_tolerance(diamond_weight, customer):
-	data_json = {}
-	if diamond_weight:
-		tolerance_data = frappe.db.get_all('Diamond Tolerance Table',
-			filters={'weight_type': 'Weight wise', 'parent': customer}, 
-			fields=['from_diamond', 'to_diamond', 'plus_percent', 'minus_percent'])
-
-		for row in tolerance_data:
-			if row['from_diamond'] <= diamond_weight <= row['to_diamond']:
-				plus_percent = row['plus_percent']
-				minus_percent = row['minus_percent']
-
-				max_diamond_weight = diamond_weight + plus_percent
-				min_diamond_weight = diamond_weight - minus_percent
-				
-				data_json['diamond_weight'] = round(diamond_weight, 3)
-				data_json['max_diamond'] = round(max_diamond_weight, 3)
-				data_json['min_diamond'] = round(min_diamond_weight, 3)
-				
-	return data_json
-
-
+def get_variant_format(order_form, doc):
+	return export_order_form("variant_format", order_form, doc)
@@ -0,0 +1,53 @@
+# Copyright (c) 2026, Gurukrupa Export and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now_datetime
+
+
+class OrderWorkflowTransition(Document):
+	pass
+
+
+def on_doctype_update():
+	# turnaround APIs and reports filter by target state and date
+	frappe.db.add_index("Order Workflow Transition", ["to_state", "transition_time"])
+
+
+def insert_transitions(rows):
+	"""Bulk insert (order, from_state, to_state, user, transition_time, version) tuples"""
+	if not rows:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Order Workflow Transition",
+		fields=[
+			"name", "creation", "modified", "modified_by", "owner", "docstatus", "idx",
+			"order", "from_state", "to_state", "user", "transition_time", "version",
+		],
+		values=[(frappe.generate_hash(length=10), now, now, user, user, 0, 0, *row) for row in rows],
+	)
+
+
+def delete_transitions(orders):
+	"""Drop the log of Orders being deleted; it blocks the delete otherwise"""
+	if orders:
+		frappe.db.delete("Order Workflow Transition", {"order": ["in", list(orders)]})
+
+
+def log_workflow_transition(doc):
+	"""Record the workflow_state change of an Order being saved"""
+	before = doc.get_doc_before_save()
+	from_state = before.workflow_state if before else None
+
+	# logged once per save, whichever hooks call this
+	marker = (from_state, doc.workflow_state)
+	if doc.flags.logged_workflow_transition == marker:
+		return
+
+	if doc.workflow_state and doc.workflow_state != from_state:
+		doc.flags.logged_workflow_transition = marker
+		insert_transitions([(doc.name, from_state, doc.workflow_state, frappe.session.user, now_datetime(), None)])
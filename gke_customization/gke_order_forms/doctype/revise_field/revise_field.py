@@ -4,6 +4,7 @@
 import frappe
 from frappe.model.document import Document
 from frappe import _
+from gke_customization.gke_order_forms.doctype.variant_signature.variant_signature import update_variant_signatures
 
 class ReviseField(Document):
 	def validate(self):
@@ -66,6 +67,7 @@ class ReviseField(Document):
 					updated = True
 
 		if updated:
+			update_variant_signatures([item_doc.name])
 			frappe.msgprint(_("Item attributes updated in Item <b>{0}</b>").format(item_doc.name))
 
 
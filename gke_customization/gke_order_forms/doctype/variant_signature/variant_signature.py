@@ -0,0 +1,126 @@
+# Copyright (c) 2026, Gurukrupa Export and contributors
+# For license information, please see license.txt
+
+import hashlib
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cstr, now_datetime
+from gke_customization.gke_catalog.utils import chunked, get_child_rows
+
+
+class VariantSignature(Document):
+	pass
+
+
+def on_doctype_update():
+	# exact lookups probe (variant_of, signature)
+	frappe.db.add_index("Variant Signature", ["variant_of", "signature"])
+	# posting lists of the partial attribute lookups
+	frappe.db.add_index("Item Variant Attribute", ["attribute", "attribute_value"])
+
+
+def normalize_value(value):
+	# "91.9", "91.90" and 91.9 are the same attribute value
+	value = cstr(value).strip().lower()
+	try:
+		return repr(float(value))
+	except ValueError:
+		return value
+
+
+def get_signature(attributes):
+	"""Hash of the sorted, normalized (attribute, value) pairs of a variant; `attributes` is a dict or pairs"""
+	if isinstance(attributes, dict):
+		attributes = attributes.items()
+	pairs = sorted((cstr(attribute).strip().lower(), normalize_value(value)) for attribute, value in attributes)
+	return hashlib.sha1(json.dumps(pairs).encode()).hexdigest()
+
+
+def _write_signatures(rows):
+	now = now_datetime()
+	user = frappe.session.user
+
+	for chunk in chunked(rows):
+		placeholders = ", ".join(["(%s, %s, %s, %s, %s, 0, 0, %s, %s, %s, %s)"] * len(chunk))
+		values = []
+		for item, variant_of, signature, attribute_count in chunk:
+			values.extend([item, now, now, user, user, item, variant_of, signature, attribute_count])
+		frappe.db.sql(
+			f"""
+			INSERT INTO `tabVariant Signature`
+				(name, creation, modified, modified_by, owner, docstatus, idx,
+				item, variant_of, signature, attribute_count)
+			VALUES {placeholders}
+			ON DUPLICATE KEY UPDATE
+				modified = VALUES(modified),
+				modified_by = VALUES(modified_by),
+				variant_of = VALUES(variant_of),
+				signature = VALUES(signature),
+				attribute_count = VALUES(attribute_count)
+			""",
+			values,
+		)
+
+
+def update_variant_signatures(items):
+	"""Recompute the signatures of `items`; items that are not variants lose theirs"""
+	items = {item for item in items if item}
+	if not items:
+		return
+
+	variants = {}
+	for chunk in chunked(sorted(items)):
+		for row in frappe.get_all("Item", filters={"name": ["in", chunk], "variant_of": ["is", "set"]}, fields=["name", "variant_of"]):
+			variants[row.name] = row.variant_of
+
+	attributes = get_child_rows(
+		"Item Variant Attribute", variants, ["attribute", "attribute_value"], filters={"parenttype": "Item"}
+	)
+	_write_signatures([
+		(
+			item,
+			variant_of,
+			get_signature((row.attribute, row.attribute_value) for row in attributes.get(item, [])),
+			len(attributes.get(item, [])),
+		)
+		for item, variant_of in variants.items()
+	])
+
+	stale = items - set(variants)
+	if stale:
+		frappe.db.delete("Variant Signature", {"name": ["in", list(stale)]})
+
+
+def delete_variant_signature(item):
+	frappe.db.delete("Variant Signature", {"name": item})
+
+
+def find_variants(template, attributes):
+	"""Variants of `template` whose attributes are exactly `attributes`, by one indexed probe"""
+	return frappe.get_all(
+		"Variant Signature",
+		filters={"variant_of": template, "signature": get_signature(attributes)},
+		pluck="item",
+	)
+
+
+def rebuild_variant_signatures():
+	"""Signatures of every variant, walked by name in chunks"""
+	frappe.db.delete("Variant Signature")
+
+	last = ""
+	while True:
+		items = frappe.get_all(
+			"Item",
+			filters={"variant_of": ["is", "set"], "name": [">", last]},
+			order_by="name asc",
+			limit_page_length=1000,
+			pluck="name",
+		)
+		if not items:
+			break
+		update_variant_signatures(items)
+		frappe.db.commit()
+		last = items[-1]
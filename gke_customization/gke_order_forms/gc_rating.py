@@ -0,0 +1,111 @@
+from bisect import bisect_left
+
+import frappe
+
+RATING_BANDS_VERSION_KEY = "gke_gc_rating_bands_version"
+
+# site -> (version, RatingBands), built once per worker and version
+_bands = {}
+
+
+def parse_band(range_text):
+    """(lower, upper, lower_inclusive, upper_inclusive) of "a-b", "Above x" or "Below x"; None bounds are open"""
+    range_text = (range_text or "").strip()
+    if '-' in range_text:
+        lower, upper = [float(x.strip()) for x in range_text.split('-')]
+        return lower, upper, True, True
+    if 'Above' in range_text:
+        return float(range_text.replace('Above', '').strip()), None, False, False
+    if 'Below' in range_text:
+        return None, float(range_text.replace('Below', '').strip()), False, False
+    return None
+
+
+def in_band(value, band):
+    lower, upper, lower_inclusive, upper_inclusive = band
+    if lower is not None and (value < lower or (value == lower and not lower_inclusive)):
+        return False
+    if upper is not None and (value > upper or (value == upper and not upper_inclusive)):
+        return False
+    return True
+
+
+class RatingBands:
+    """
+        GC Ratio Master rows compiled to elementary intervals. Every band bound is a break point;
+        the rating of each point and of each open interval between two points is resolved once,
+        first matching row winning as in the table, so a lookup is a bisection.
+    """
+
+    def __init__(self, rows):
+        bands = []
+        self.invalid = []
+        for row in rows:
+            try:
+                band = parse_band(row.metal_to_gold_ratio_group)
+            except ValueError:
+                band = None
+            if band:
+                bands.append((band, row.rating))
+            else:
+                self.invalid.append(row.metal_to_gold_ratio_group)
+
+        self.points = sorted({bound for band, rating in bands for bound in band[:2] if bound is not None})
+
+        # segment 2 * i is the open interval before points[i], 2 * i + 1 the point itself
+        self.ratings = []
+        for index in range(2 * len(self.points) + 1):
+            value = self.representative(index)
+            self.ratings.append(next((rating for band, rating in bands if in_band(value, band)), None))
+
+    def representative(self, index):
+        position, is_point = divmod(index, 2)
+        if is_point:
+            return self.points[position]
+        if not self.points:
+            return 0.0
+        if position == 0:
+            return self.points[0] - 1
+        if position == len(self.points):
+            return self.points[-1] + 1
+        return (self.points[position - 1] + self.points[position]) / 2
+
+    def rating(self, value):
+        position = bisect_left(self.points, value)
+        is_point = position < len(self.points) and self.points[position] == value
+        return self.ratings[2 * position + 1 if is_point else 2 * position]
+
+
+def get_rating_bands():
+    version = frappe.cache().get_value(RATING_BANDS_VERSION_KEY) or 0
+
+    cached = _bands.get(frappe.local.site)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    rows = frappe.get_all(
+        "GC Ratio",
+        filters={"parenttype": "GC Ratio Master", "parentfield": "gc_ratio"},
+        fields=["metal_to_gold_ratio_group", "rating"],
+        order_by="idx asc",
+    )
+    bands = RatingBands(rows)
+    if bands.invalid:
+        frappe.log_error(frappe.as_json(bands.invalid), "GC Ratio Master: invalid range values")
+    _bands[frappe.local.site] = (version, bands)
+
+    return bands
+
+
+def get_gc_rating(ratio):
+    return get_rating_bands().rating(float(ratio))
+
+
+def clear_rating_bands(doc=None, method=None):
+    # doc event on GC Ratio Master; bumped once the bands are committed, so no worker builds
+    # the new version from the rows visible before the commit
+    frappe.db.after_commit.add(bump_rating_bands_version)
+
+
+def bump_rating_bands_version():
+    frappe.cache().set_value(RATING_BANDS_VERSION_KEY, frappe.generate_hash(length=10))
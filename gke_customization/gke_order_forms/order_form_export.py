@@ -0,0 +1,628 @@
+from collections import defaultdict
+from io import BytesIO
+
+import frappe
+import openpyxl
+from frappe import _
+from frappe.utils import cstr, flt, getdate, get_url
+from frappe.utils.file_manager import save_file
+from gke_customization.gke_catalog.utils import chunked
+
+# forms with more design rows than this are exported by a background job
+EXPORT_BACKGROUND_ROWS = 100
+
+BOM_FIELDS = [
+    "name", "item", "gross_weight", "metal_and_finding_weight", "diamond_weight",
+    "total_diamond_pcs", "metal_purity",
+]
+
+# BOM child tables used by the exports and the columns read from them
+BOM_CHILD_FIELDS = {
+    "BOM Diamond Detail": [
+        "diamond_type", "sieve_size_range", "stone_shape", "size_in_mm", "pcs", "quantity",
+        "weight_per_pcs", "sub_setting_type", "quality", "sieve_size_color",
+    ],
+    "BOM Metal Detail": ["metal_touch", "metal_colour", "quantity", "actual_quantity", "rate"],
+    "BOM Finding Detail": ["finding_category", "qty", "quantity", "metal_colour", "metal_touch"],
+    "BOM Gemstone Detail": ["stone_shape"],
+}
+
+
+def get_all_in(doctype, field, values, fields, get_list=False, **kwargs):
+    """get_all/get_list with an `IN` filter on `field`, sent in chunks"""
+    method = frappe.get_list if get_list else frappe.get_all
+    filters = kwargs.pop("filters", {})
+    rows = []
+    for chunk in chunked(sorted({value for value in values if value})):
+        rows.extend(method(doctype, filters={**filters, field: ["in", chunk]}, fields=fields, **kwargs))
+    return rows
+
+
+def set_tolerance(diamond_weight, customer, tolerance_data=None):
+    data_json = {}
+    if diamond_weight:
+        if tolerance_data is None:
+            tolerance_data = get_tolerance_data(customer)
+
+        for row in tolerance_data:
+            if row['from_diamond'] <= diamond_weight <= row['to_diamond']:
+                plus_percent = row['plus_percent']
+                minus_percent = row['minus_percent']
+
+                max_diamond_weight = diamond_weight + plus_percent
+                min_diamond_weight = diamond_weight - minus_percent
+
+                data_json['diamond_weight'] = round(diamond_weight, 3)
+                data_json['max_diamond'] = round(max_diamond_weight, 3)
+                data_json['min_diamond'] = round(min_diamond_weight, 3)
+
+    return data_json
+
+
+def get_tolerance_data(customer):
+    return frappe.db.get_all('Diamond Tolerance Table',
+        filters={'weight_type': 'Weight wise', 'parent': customer},
+        fields=['from_diamond', 'to_diamond', 'plus_percent', 'minus_percent'])
+
+
+class OrderFormExport:
+    """
+        Data of one Order Form export. Items, BOMs, BOM child rows and the customer
+        masters are read with a few bulk queries instead of per design row.
+    """
+
+    def __init__(self, order_form_doc, rows):
+        self.doc = order_form_doc
+        self.customer = order_form_doc.customer_code
+        self.rows = [frappe._dict(row) for row in rows if row.get("design_id")]
+        design_ids = {row.design_id for row in self.rows}
+
+        self.items = {
+            item.name: item
+            for item in get_all_in("Item", "name", design_ids, ["name", "master_bom", "image"])
+        }
+
+        # (item, bom_type) -> BOM names, latest first
+        self.item_boms = defaultdict(list)
+        for bom in get_all_in(
+            "BOM", "item", design_ids, ["name", "item", "bom_type"], get_list=True,
+            filters={"bom_type": ["in", ["Finish Goods", "Template"]]}, order_by="modified desc",
+        ):
+            self.item_boms[(bom.item, bom.bom_type)].append(bom.name)
+
+        self.serial_boms = self.get_serial_boms(
+            {item for (item, bom_type), names in self.item_boms.items() if len(names) > 1}
+        )
+        self.boms = {}
+        self.bom_children = {}
+
+    def get_serial_boms(self, design_ids):
+        """
+            Finish Goods BOM made for this Order Form, for items with more than one BOM:
+            Order -> Parent Manufacturing Order -> Serial Number Creator -> BOM
+        """
+        if not design_ids:
+            return {}
+
+        orders = {}
+        for order in get_all_in(
+            "Order", "item", design_ids, ["name", "item"], filters={"cad_order_form": self.doc.name}
+        ):
+            orders.setdefault(order.item, order.name)
+
+        pmos = {}
+        for pmo in get_all_in(
+            "Parent Manufacturing Order", "order_form_id", orders.values(), ["name", "order_form_id"]
+        ):
+            pmos.setdefault(pmo.order_form_id, pmo.name)
+
+        sncs = {}
+        for snc in get_all_in(
+            "Serial Number Creator", "parent_manufacturing_order", pmos.values(), ["name", "parent_manufacturing_order"]
+        ):
+            sncs.setdefault(snc.parent_manufacturing_order, snc.name)
+
+        boms = {}
+        for bom in get_all_in(
+            "BOM", "custom_serial_number_creator", sncs.values(), ["name", "item", "custom_serial_number_creator"],
+            filters={"bom_type": "Finish Goods"},
+        ):
+            boms.setdefault((bom.custom_serial_number_creator, bom.item), bom.name)
+
+        serial_boms = {}
+        for design_id, order in orders.items():
+            snc = sncs.get(pmos.get(order))
+            if snc and boms.get((snc, design_id)):
+                serial_boms[design_id] = boms[(snc, design_id)]
+        return serial_boms
+
+    def get_finish_bom(self, design_id, bom_type="Finish Goods", use_master_bom=True):
+        names = self.item_boms.get((design_id, bom_type), [])
+        if len(names) > 1:
+            bom = self.serial_boms.get(design_id)
+        else:
+            bom = names[0] if names else None
+
+        if not bom and use_master_bom:
+            bom = self.items.get(design_id, {}).get("master_bom")
+        return bom
+
+    def get_latest_bom(self, design_id, bom_type="Finish Goods"):
+        names = self.item_boms.get((design_id, bom_type), [])
+        return names[0] if names else None
+
+    def load_boms(self, names, children=()):
+        names = {name for name in names if name} - set(self.boms)
+        for bom in get_all_in("BOM", "name", names, BOM_FIELDS, get_list=True):
+            self.boms[bom.name] = bom
+
+        for child_doctype in children:
+            rows = self.bom_children.setdefault(child_doctype, defaultdict(list))
+            for row in get_all_in(
+                child_doctype, "parent", names, ["parent", *BOM_CHILD_FIELDS[child_doctype]],
+                filters={"parenttype": "BOM"}, order_by="idx asc",
+            ):
+                rows[row.parent].append(row)
+
+    def get_bom(self, design_id, bom_name):
+        # the exports read a BOM only through its item
+        bom = self.boms.get(bom_name)
+        return bom if bom and bom.item == design_id else None
+
+    def get_children(self, child_doctype, bom_name):
+        return self.bom_children.get(child_doctype, {}).get(bom_name, [])
+
+    @property
+    def prolif(self):
+        if not hasattr(self, "_prolif"):
+            self._prolif = {}
+            for row in frappe.get_all(
+                "Customer Prolif Detail", filters={"parent": self.customer}, fields=["gk_d", "customer_prolif"]
+            ):
+                self._prolif.setdefault(row.gk_d, row.customer_prolif)
+        return self._prolif
+
+    @property
+    def categories(self):
+        if not hasattr(self, "_categories"):
+            self._categories = {}
+            for row in frappe.get_all(
+                "Customer Category Detail",
+                filters={"parent": self.customer},
+                fields=["gk_category", "gk_sub_category", "customer_category", "customer_subcategory", "code_category", "article"],
+            ):
+                self._categories.setdefault((row.gk_category, row.gk_sub_category), row)
+        return self._categories
+
+    def get_category(self, row):
+        return self.categories.get((row.category, row.subcategory)) or frappe._dict()
+
+
+def build_gc_format(export):
+    headers = [
+        'Code on Tag', 'Product Category',
+        'Product Wt', 'CFA', 'Brand',
+        'KT', 'Stone size',
+        'Stone Code',
+        'Stone Qty', 'Check stock code Duplicated',
+        'Brief CATPB',
+        'Remarks'
+    ]
+
+    # a tagged design uses its latest Finish Goods BOM, others the BOM of the row
+    row_boms = [
+        (row, export.get_latest_bom(row.design_id) if row.get("tag_no") else row.get("bom"))
+        for row in export.rows
+    ]
+    export.load_boms([bom for row, bom in row_boms], children=["BOM Diamond Detail"])
+
+    def rows():
+        for row, bom_name in row_boms:
+            bom = export.get_bom(row.design_id, bom_name)
+            if not bom:
+                continue
+
+            bom_diamond = export.get_children("BOM Diamond Detail", bom.name)
+            for i in range(len(bom_diamond) or 1):
+                diamond = bom_diamond[i] if i < len(bom_diamond) else {}
+                yield [
+                    row.get('design_id', '') if i == 0 else "",
+                    row.get('category', '') if i == 0 else "",
+                    f"{flt(bom.gross_weight):0.3f}" if i == 0 else "",
+                    '',
+                    export.doc.customer_name if i == 0 else "",
+                    row.get('metal_touch', '') if i == 0 else "",
+                    f"{flt(diamond.get('size_in_mm')):0.2f} MM",
+                    '',
+                    f"{flt(diamond.get('pcs')):0.2f}",
+                    '',
+                    '',
+                    ''
+                ]
+
+    return headers, rows()
+
+
+def build_code_creation(export):
+    headers = [
+        "S.No", "Date", "Collection Name", "Theme Code", "Designer", "Karat", "Complexity",
+        "CFA", "Vendor Name", "Vendor Ref Code", "Category", "Group", "Individual wt",
+        "Total Wt", "Catpb", "Length", "Size", "Cart", "Findings", "Stone Quality",
+        "Shape", "Metal Color", "UOM", "Gender", "Remarks", "Stone Combination"
+    ]
+
+    row_boms = [(row, export.get_finish_bom(row.design_id)) for row in export.rows]
+    export.load_boms([bom for row, bom in row_boms])
+    order_date = frappe.utils.formatdate(export.doc.order_date, "dd.MM.yyyy")
+
+    def rows():
+        for row, bom_name in row_boms:
+            if not export.get_bom(row.design_id, bom_name):
+                continue
+            yield [
+                row.get('idx', ''),
+                order_date,
+                row.get('collection_name', ''),
+                '',
+                '',
+                row.get('metal_touch', ''),
+                row.get('mfg_complexity_code', ''),
+                '',
+                export.doc.company,
+                row.get('design_id', ''),
+                row.get('category', ''),
+                '', '', '', '', '', '', '', '',
+                row.get('diamond_quality', ''),
+                '',
+                row.get('metal_colour', ''),
+                row.get('uomset_of', ''),
+                row.get('gender', ''),
+                '',
+                '',
+            ]
+
+    return headers, rows()
+
+
+def build_caratlane_proto(export):
+    headers = [
+        "Caratlane SKU Code", "Item Code", "Vendor Style Code", "Images",
+        "Gold Kt", "Gold Colour", "Product Type", "Product Size", "Stone Type",
+        "Diamond Sieve Size/Col Stone", "Diamond Shape", "Diamond Sieve Size(mm Size)",
+        "Quantity", "Individual Stone Wt", "Total Stone Wt", "Setting Type", "Type",
+        "Stone Quality", "Stone Colour", "Cut", "Rate PCT", "Value", "Gross Weight",
+        "Metal Colour", "Metal Karat", "Quantity", "Gold Weight", "Finding Name",
+        "Finding Quantity", "Finding Weight", "Finding Colour", "Finding Karat", "Finding Type",
+        "Net Weight(Min)", "Net Weight(Avg)", "Net Weight(Max)",
+        "Diamond Weight(Min)", "Diamond Weight(Avg)", "Diamond Weight(Max)",
+        "Finishing Information", "Shipping Days", "Metal Rate", "Total Dia",
+        "Cent per gm", "Labor", "Per Pc Labor", "Wastage", "Total", "Total Price", "Technique"
+    ]
+
+    row_boms = [
+        (row, export.get_finish_bom(row.design_id, "Template", use_master_bom=False))
+        for row in export.rows
+    ]
+    export.load_boms([bom for row, bom in row_boms], children=list(BOM_CHILD_FIELDS))
+    tolerance_data = get_tolerance_data(export.customer)
+
+    def rows():
+        for row, bom_name in row_boms:
+            bom = export.get_bom(row.design_id, bom_name)
+            if not bom:
+                continue
+
+            item_image = export.items.get(row.design_id, {}).get("image")
+            bom_metal = export.get_children("BOM Metal Detail", bom.name)
+            bom_diamond = export.get_children("BOM Diamond Detail", bom.name)
+            bom_finding = export.get_children("BOM Finding Detail", bom.name)
+            bom_gems = export.get_children("BOM Gemstone Detail", bom.name)
+
+            for i in range(max(len(bom_diamond), len(bom_finding), len(bom_metal), len(bom_gems)) or 1):
+                diamond = bom_diamond[i] if i < len(bom_diamond) else {}
+                finding = bom_finding[i] if i < len(bom_finding) else {}
+                metal = bom_metal[i] if i < len(bom_metal) else {}
+
+                diamond_tolerance = set_tolerance(diamond.get('quantity', 0), export.customer, tolerance_data)
+
+                yield [
+                    "",  # Caratlane SKU Code
+                    row.get('design_id', '') if i == 0 else "",  # Item Code
+                    "",  # Vendor Style Code
+                    item_image if i == 0 else "",  # Images
+                    metal.get('metal_touch', '') if i == 0 else "",  # Gold Kt
+                    metal.get('metal_colour', '') if i == 0 else "",  # Gold Colour
+                    row.get('category', '') if i == 0 else "",  # Product Type
+                    row.get("product_size", "") if i == 0 else "",  # Product Size
+                    diamond.get('diamond_type', ''),  # Stone Type
+                    diamond.get('sieve_size_range', ''),  # Diamond Sieve Size/Col Stone
+                    diamond.get('stone_shape', ''),  # Diamond Shape
+                    diamond.get('size_in_mm', ''),  # Diamond Sieve Size(mm Size)
+                    diamond.get('pcs', ''),  # Quantity
+                    diamond.get('weight_per_pcs', ''),  # Individual Stone Wt
+                    "",  # Total Stone Wt
+                    diamond.get('sub_setting_type', ''),  # Setting Type
+                    "",  # Type
+                    diamond.get('quality', ''),  # Stone Quality
+                    diamond.get('sieve_size_color', ''),  # Stone Colour
+                    "", "", "",  # Cut, Rate PCT, Value
+                    bom.gross_weight if i == 0 else "",  # Gross Weight
+                    metal.get('metal_colour', ''),  # Metal Colour
+                    metal.get('metal_touch', ''),  # Metal Karat
+                    metal.get('quantity', ''),  # Quantity
+                    metal.get('actual_quantity', ''),  # Gold Weight
+                    finding.get('finding_category', ''),  # Finding Name
+                    finding.get('qty', ''),  # Finding Quantity
+                    finding.get('quantity', ''),  # Finding Weight
+                    finding.get('metal_colour', ''),  # Finding Colour
+                    finding.get('metal_touch', ''),  # Finding Karat
+                    "",  # Finding Type
+                    "", "",  # Net Weights
+                    bom.metal_and_finding_weight if i == 0 else "",
+                    diamond_tolerance.get('min_diamond', ''),  # Diamond Weight (Min)
+                    diamond_tolerance.get('diamond_weight', ''),  # Diamond Weight (Avg)
+                    diamond_tolerance.get('max_diamond', ''),  # Diamond Weight (Max)
+                    "", "",
+                    metal.get('rate'),  # metal rate
+                    "", "", "", "", "", "", "", "", ""
+                ]
+
+    return headers, rows()
+
+
+def build_reliance_proto(export):
+    headers = [
+        "Sr. NO.", "Collection Name", "Vendor Name", "Vendor Design Code", "Proto Image", "Article",
+        "Metal Color", "Purity", "Stone Clarity", "Approx Net Wt (gms)", "Approx Dia Wt (cts)",
+        "Approx Color Stone Wt (cts)", "Size", "Findings", "Design Approved By", "Catrgory Approved By",
+        "Sourcing Approved By", "NPD Approved By", "QA Approved By", "QA Remarks", "Remark"
+    ]
+
+    row_boms = [(row, export.get_finish_bom(row.design_id)) for row in export.rows]
+    export.load_boms([bom for row, bom in row_boms])
+
+    def rows():
+        for row, bom_name in row_boms:
+            bom = export.get_bom(row.design_id, bom_name)
+            if not bom:
+                continue
+            yield [
+                row.get('idx'),
+                row.get('collection_name', ''),
+                "GK",
+                row.get('design_id', ''),
+                "",
+                export.get_category(row).article,
+                f"{row.get('metal_colour', '')} {row.get('metal_type', '')}",
+                row.get('metal_touch', ''),
+                export.prolif.get(row.get('diamond_quality')),
+                bom.metal_and_finding_weight,
+                bom.diamond_weight,
+                "", "", "", "", "", "", "", "", "", "",
+            ]
+
+    return headers, rows()
+
+
+def build_novel_proto(export):
+    headers = [
+        "SR. NO.", "Design Selecion Date", "Collection Name", "Vendor Name", "Order Type", "Image", "Theme Code", "Vendor/ Designer Ref Code", "Set Code",
+        "Product Group", "Product SubGroup", "Product Category", "Sub Category", "Category, Sub-Category Code", "Size", "Size (UOM)", "KT", "Metal Color",
+        "Diamond Quality", "Stone Proliferation", "Qty", "UOM", "Findings", "Proto Remarks in PO", "Metal Purity", "Gross Wt.", "Gold Weight", "Diamond Carat Weight",
+        "Polki Wt.", "Other Stone Weight", "Polki Quality", "Gender", "Design Source/Route", "TOTAL LABOUR AMOUNT", "DIAMOND HANDLING AMOUNT", "TOTAL DIAMOND AMOUNT",
+        "COLORSTONE HANDLING AMOUNT", "COLORSTONE AMOUNT", "GOLD AMOUNT", "LOSS AMOUNT", "ADDITIONAL CHARGES", "TOTAL VALUE", "Design Complexity", "Need state",
+        "Primary Design language", "Name of the Design Motif", "Modularity Flag", "Modularity description", "Finish Type", "Colour Stone Name", "Colour Stone Type",
+        "Colorstone Color Family", "Enamel Color Family", "Bangle"
+    ]
+
+    row_boms = [(row, export.get_finish_bom(row.design_id)) for row in export.rows]
+    export.load_boms([bom for row, bom in row_boms])
+    order_date = frappe.utils.formatdate(export.doc.order_date, "dd-MM-yyyy")
+
+    size_codes = {}
+    for size in frappe.get_all(
+        "Novel Size Master", filters={"customer": export.customer}, fields=["item_category", "product_size_in", "code"]
+    ):
+        size_codes.setdefault((size.item_category, cstr(size.product_size_in)), size.code)
+
+    def rows():
+        for row, bom_name in row_boms:
+            bom = export.get_bom(row.design_id, bom_name)
+            if not bom:
+                continue
+
+            product_size = row.get('product_size')
+            code_size = size_codes.get((row.get('category'), cstr(product_size))) or flt(product_size)
+            code_categories = export.get_category(row)
+
+            yield [
+                row.get('idx'),
+                order_date,
+                row.get('collection_name', ''),
+                export.doc.company,
+                f"{export.doc.flow_type} Order",
+                "",
+                "",
+                row.get('design_id', ''),
+                row.get('category', ''),
+                "Studded",
+                "Studded-DIS",
+                code_categories.customer_category,
+                code_categories.customer_subcategory,
+                code_categories.code_category,
+                code_size,
+                "",
+                row.get('metal_touch', ''),
+                row.get('metal_colour', ''),
+                export.prolif.get(row.get('diamond_quality')),
+                "",
+                row.get('qty', ''),
+                row.get('uomset_of', ''),
+                "",  # finding
+                "",
+                round(flt(bom.metal_purity) / 100, 2),  # metal purity
+                bom.gross_weight,  # gross wt
+                bom.metal_and_finding_weight,  # gold wt
+                bom.diamond_weight,  # diam wt
+                "",
+                "",
+                "",
+                row.get('gender', ''),
+                "",
+                "", "", "", "", "", "", "", "", "",  # amounts
+                row.get('mfg_complexity_code', ''),
+                "", "", "", "", "", "", "", "", "", "", "",
+            ]
+
+    return headers, rows()
+
+
+def build_proto_sheet(export):
+    customer_name = export.doc.customer_name or ""
+    if 'Caratlane' in customer_name:
+        return build_caratlane_proto(export)
+    if 'Reliance' in customer_name:
+        return build_reliance_proto(export)
+    if 'Novel' in customer_name:
+        return build_novel_proto(export)
+    return [], []
+
+
+def build_variant_format(export):
+    if 'Reliance' not in (export.doc.customer_name or ""):
+        return [], []
+
+    headers = [
+        "Vendor Code", "Article", "Vendor design code", "Purity", "Set of", "Metal Color",
+        "Dia quality", "Variant Size", "Net Wt", "Dia pcs", "Dia Wt",
+        "Color Stone pcs", "Color Stone Wt", "Gross Wt", "Remark"
+    ]
+
+    row_boms = [(row, export.get_finish_bom(row.design_id)) for row in export.rows]
+    export.load_boms([bom for row, bom in row_boms])
+
+    def rows():
+        for row, bom_name in row_boms:
+            bom = export.get_bom(row.design_id, bom_name)
+            if not bom:
+                continue
+            yield [
+                "",
+                export.get_category(row).code_category,
+                row.get('design_id', ''),
+                row.get('metal_touch', ''),
+                "",
+                f"{row.get('metal_colour', '')} {row.get('metal_type', '')}",
+                export.prolif.get(row.get('diamond_quality')),
+                "",
+                bom.metal_and_finding_weight,
+                bom.total_diamond_pcs,
+                bom.diamond_weight,
+                "",
+                "",
+                bom.gross_weight,
+                "",
+            ]
+
+    return headers, rows()
+
+
+# `file_field`: Order Form field holding the latest file, set by the form on a direct export
+# and by export_order_form_job on a background one
+EXPORT_FORMATS = {
+    "gc_format": frappe._dict(
+        title="GC Format", file_name="GC_Format_{0}.xlsx", build=build_gc_format,
+        empty="GC Sheet Can Not Download", file_field="gc_format_file",
+    ),
+    "code_creation": frappe._dict(
+        title="Code Creation File", file_name="Code_Creation_File_{0}.xlsx", build=build_code_creation,
+        empty="Code creation Sheet Can Not Download , Check all details..", file_field="code_creation_file",
+    ),
+    "proto_sheet": frappe._dict(
+        title="Proto Sheet", file_name="Proto_Sheet_{0}.xlsx", build=build_proto_sheet,
+        empty="Proto Sheet Can Not Download", file_field="proto_sheet_file",
+    ),
+    "variant_format": frappe._dict(
+        title="Variant Format", file_name="Variant_Format_{0}.xlsx", build=build_variant_format,
+        empty="Variant Format Can Not Download", file_field=None,
+    ),
+}
+
+
+def write_export(export_format, order_form, rows):
+    """Build the workbook in openpyxl write-only mode, attach it to the Order Form and return the file url"""
+    config = EXPORT_FORMATS[export_format]
+    order_form_doc = frappe.get_doc("Order Form", order_form)
+    headers, data = config.build(OrderFormExport(order_form_doc, rows))
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(config.title)
+    if headers:
+        sheet.append(headers)
+
+    count = 0
+    for row in data:
+        sheet.append(row)
+        count += 1
+
+    if not count:
+        frappe.throw(_(config.empty))
+
+    output = BytesIO()
+    workbook.save(output)
+
+    file_name = config.file_name.format(getdate(order_form_doc.order_date).strftime("%Y-%m-%d"))
+    file_doc = save_file(file_name, output.getvalue(), order_form_doc.doctype, order_form_doc.name, is_private=0)
+    return file_doc.file_url
+
+
+def export_order_form(export_format, order_form, doc):
+    """
+        Whitelisted entry of the Order Form exports. `doc` is the form as sent by the client.
+        Large forms are exported in the background and the user gets a download link when it is ready.
+    """
+    frappe.has_permission("Order Form", "read", order_form, throw=True)
+
+    if isinstance(doc, str):
+        doc = frappe.parse_json(doc)
+    rows = [row for row in doc.get("order_details", []) if row.get("design_id")]
+
+    if len(rows) <= EXPORT_BACKGROUND_ROWS:
+        return write_export(export_format, order_form, rows)
+
+    frappe.enqueue(
+        "gke_customization.gke_order_forms.order_form_export.export_order_form_job",
+        queue="long",
+        timeout=3600,
+        export_format=export_format,
+        order_form=order_form,
+        rows=rows,
+    )
+    frappe.msgprint(_("{0} is being prepared in the background. You will be notified when it is ready.").format(
+        _(EXPORT_FORMATS[export_format].title)
+    ))
+
+
+def export_order_form_job(export_format, order_form, rows):
+    config = EXPORT_FORMATS[export_format]
+    title = _(config.title)
+    try:
+        file_url = write_export(export_format, order_form, rows)
+        if config.file_field:
+            frappe.db.set_value("Order Form", order_form, config.file_field, file_url)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), f"Order Form Export: {order_form}")
+        frappe.publish_realtime(
+            "msgprint", _("{0} for {1} could not be created").format(title, order_form), user=frappe.session.user
+        )
+        return
+
+    frappe.publish_realtime(
+        "msgprint",
+        _("{0} for {1} is ready: {2}").format(
+            title, order_form, f'<a href="{get_url(file_url)}" target="_blank">{_("Download")}</a>'
+        ),
+        user=frappe.session.user,
+    )
@@ -0,0 +1,164 @@
+import hashlib
+import string
+import threading
+from itertools import combinations
+
+import frappe
+from frappe import _
+
+LETTERS = string.ascii_uppercase
+DIGITS = string.digits
+
+# New codes hold 3 letters and 2 digits. The random codes named so far hold 2 letters and
+# 3 digits, so an allocated code can never meet an existing one.
+CODE_LENGTH = 5
+LETTER_POSITIONS = list(combinations(range(CODE_LENGTH), 3))
+LETTER_SPACE = len(LETTERS) ** 3
+DIGIT_SPACE = len(DIGITS) ** 2
+CODE_SPACE = len(LETTER_POSITIONS) * LETTER_SPACE * DIGIT_SPACE
+
+# sequence numbers handed to a worker per counter increment
+BLOCK_SIZE = 50
+
+# margin added when the counter is seeded again from existing names, covering blocks
+# still held by workers
+RESEED_GAP = 100 * BLOCK_SIZE
+
+SEQUENCE_KEY = "gke_short_code_sequence"
+
+FEISTEL_HALF_BITS = (CODE_SPACE - 1).bit_length() // 2 + 1
+FEISTEL_HALF_MASK = (1 << FEISTEL_HALF_BITS) - 1
+FEISTEL_ROUNDS = 4
+
+# (site, doctype) -> ShortCodeAllocator, one per worker
+_allocators = {}
+
+
+def encode_index(index):
+    """Code of an index in [0, CODE_SPACE)"""
+    layout, rest = divmod(index, LETTER_SPACE * DIGIT_SPACE)
+    letters, digits = divmod(rest, DIGIT_SPACE)
+
+    letter_chars = [LETTERS[letters // 676], LETTERS[letters // 26 % 26], LETTERS[letters % 26]]
+    digit_chars = [DIGITS[digits // 10], DIGITS[digits % 10]]
+
+    code = []
+    for position in range(CODE_LENGTH):
+        code.append(letter_chars.pop(0) if position in LETTER_POSITIONS[layout] else digit_chars.pop(0))
+    return "".join(code)
+
+
+def decode_code(code):
+    """Index of a code, None when it is not a 3 letter, 2 digit code"""
+    if len(code) != CODE_LENGTH:
+        return None
+    positions = tuple(position for position, char in enumerate(code) if char in LETTERS)
+    if positions not in LETTER_POSITIONS or any(code[p] not in DIGITS for p in range(CODE_LENGTH) if p not in positions):
+        return None
+
+    letters = [LETTERS.index(code[p]) for p in positions]
+    digits = [int(code[p]) for p in range(CODE_LENGTH) if p not in positions]
+    return (
+        LETTER_POSITIONS.index(positions) * LETTER_SPACE * DIGIT_SPACE
+        + (letters[0] * 676 + letters[1] * 26 + letters[2]) * DIGIT_SPACE
+        + digits[0] * 10 + digits[1]
+    )
+
+
+def _round(key, round_no, half):
+    digest = hashlib.blake2b(f"{key}:{round_no}:{half}".encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big") & FEISTEL_HALF_MASK
+
+
+def _feistel(value, key):
+    left, right = value >> FEISTEL_HALF_BITS, value & FEISTEL_HALF_MASK
+    for round_no in range(FEISTEL_ROUNDS):
+        left, right = right, left ^ _round(key, round_no, right)
+    return (left << FEISTEL_HALF_BITS) | right
+
+
+def _feistel_inverse(value, key):
+    left, right = value >> FEISTEL_HALF_BITS, value & FEISTEL_HALF_MASK
+    for round_no in reversed(range(FEISTEL_ROUNDS)):
+        left, right = right ^ _round(key, round_no, left), left
+    return (left << FEISTEL_HALF_BITS) | right
+
+
+def permute(sequence, key):
+    """
+        Keyed bijection of [0, CODE_SPACE): a Feistel network over the enclosing power of two,
+        walked again while the result falls outside the code space
+    """
+    value = _feistel(sequence, key)
+    while value >= CODE_SPACE:
+        value = _feistel(value, key)
+    return value
+
+
+def unpermute(index, key):
+    value = _feistel_inverse(index, key)
+    while value >= CODE_SPACE:
+        value = _feistel_inverse(value, key)
+    return value
+
+
+class ShortCodeAllocator:
+    """
+        Unique, non-sequential codes for one doctype. Sequence numbers come from a shared
+        counter in blocks of BLOCK_SIZE; each one is permuted into a code, so a worker names
+        BLOCK_SIZE documents per counter increment and never reads the table.
+    """
+
+    def __init__(self, doctype, prefix, reserve=None):
+        self.doctype = doctype
+        self.prefix = prefix
+        self.reserve = reserve or self.reserve_block
+        self.block = iter(())
+        self.lock = threading.Lock()
+
+    def next_code(self):
+        with self.lock:
+            sequence = next(self.block, None)
+            if sequence is None:
+                start = self.reserve(BLOCK_SIZE)
+                self.block = iter(range(start, start + BLOCK_SIZE))
+                sequence = next(self.block)
+
+        if sequence >= CODE_SPACE:
+            frappe.throw(_("Short codes of {0} are exhausted").format(self.doctype))
+        return encode_index(permute(sequence, self.doctype))
+
+    def next_name(self):
+        return f"{self.prefix}{self.next_code()}"
+
+    def reserve_block(self, size):
+        """First sequence number of a new block; the counter is seeded from existing names when missing"""
+        cache = frappe.cache()
+        key = cache.make_key(f"{SEQUENCE_KEY}:{self.doctype}")
+
+        if cache.get(key) is None:
+            with cache.lock(f"{key}:seed", timeout=300):
+                if cache.get(key) is None:
+                    cache.set(key, self.get_seed())
+
+        return cache.incrby(key, size) - size
+
+    def get_seed(self):
+        """Next sequence number after every allocated name of the doctype, plus RESEED_GAP"""
+        last = -1
+        for name in frappe.get_all(self.doctype, filters={"name": ["like", f"{self.prefix}%"]}, pluck="name"):
+            index = decode_code(name[len(self.prefix):])
+            if index is not None:
+                last = max(last, unpermute(index, self.doctype))
+        return last + 1 + RESEED_GAP if last >= 0 else 0
+
+
+def get_allocator(doctype, prefix):
+    key = (frappe.local.site, doctype)
+    if key not in _allocators:
+        _allocators[key] = ShortCodeAllocator(doctype, prefix)
+    return _allocators[key]
+
+
+def get_short_name(doctype, prefix):
+    return get_allocator(doctype, prefix).next_name()
@@ -0,0 +1,87 @@
+# Copyright (c) 2026, Gurukrupa Export and Contributors
+# See license.txt
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gke_customization.gke_order_forms.short_code import (
+    BLOCK_SIZE,
+    CODE_SPACE,
+    SEQUENCE_KEY,
+    ShortCodeAllocator,
+    decode_code,
+    encode_index,
+    permute,
+    unpermute,
+)
+
+WORKERS = 16
+CODES_PER_WORKER = 2000
+
+
+class TestShortCode(FrappeTestCase):
+    def test_permutation_round_trip(self):
+        for sequence in list(range(5000)) + list(range(CODE_SPACE - 5000, CODE_SPACE)):
+            index = permute(sequence, "Manufacturing Operation")
+            self.assertLess(index, CODE_SPACE)
+            self.assertEqual(unpermute(index, "Manufacturing Operation"), sequence)
+
+            code = encode_index(index)
+            self.assertEqual(len(code), 5)
+            self.assertEqual(sum(char.isalpha() for char in code), 3)
+            self.assertEqual(decode_code(code), index)
+
+    def test_legacy_codes_are_outside_the_code_space(self):
+        # random codes named before the allocator hold 2 letters and 3 digits
+        for code in ("AB123", "1A2B3", "123AB"):
+            self.assertIsNone(decode_code(code))
+
+    def test_concurrent_workers_get_unique_codes(self):
+        counter = {"next": 0}
+        counter_lock = threading.Lock()
+
+        def reserve(size):
+            with counter_lock:
+                start = counter["next"]
+                counter["next"] += size
+                return start
+
+        # one allocator per simulated worker, several threads per allocator
+        allocators = [ShortCodeAllocator("Manufacturing Operation", "MOP-", reserve=reserve) for _ in range(4)]
+
+        def allocate(worker):
+            allocator = allocators[worker % len(allocators)]
+            return [allocator.next_name() for _ in range(CODES_PER_WORKER)]
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            names = [name for batch in executor.map(allocate, range(WORKERS)) for name in batch]
+
+        self.assertEqual(len(names), WORKERS * CODES_PER_WORKER)
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_redis_blocks_are_disjoint(self):
+        cache = frappe.cache()
+        doctype = "ToDo"
+        key = cache.make_key(f"{SEQUENCE_KEY}:{doctype}")
+        cache.delete(key)
+
+        # seeds the counter; no ToDo is named with the prefix, so it starts at 0
+        seeding = ShortCodeAllocator(doctype, "SC-TEST-")
+        self.assertEqual(seeding.reserve_block(BLOCK_SIZE), 0)
+
+        allocators = [
+            ShortCodeAllocator(doctype, "SC-TEST-", reserve=lambda size: cache.incrby(key, size) - size)
+            for _ in range(WORKERS)
+        ]
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            names = [
+                name
+                for batch in executor.map(lambda allocator: [allocator.next_code() for _ in range(500)], allocators)
+                for name in batch
+            ]
+
+        self.assertEqual(len(set(names)), WORKERS * 500)
+        cache.delete(key)
@@ -0,0 +1,64 @@
+import frappe
+from gke_customization.gke_catalog.utils import chunked
+
+
+def get_order_timesheets(orders, fields=("name", "docstatus", "workflow_state")):
+    orders = {order for order in orders if order}
+    timesheets = []
+    for chunk in chunked(sorted(orders)):
+        timesheets.extend(frappe.get_all("Timesheet", filters={"order": ["in", chunk]}, fields=list(fields)))
+    return timesheets
+
+
+def set_timesheet_workflow_state(names, workflow_state):
+    """One UPDATE per chunk; workflow_state only, docstatus is left as is"""
+    for chunk in chunked(sorted(set(names))):
+        frappe.db.set_value("Timesheet", {"name": ["in", chunk]}, "workflow_state", workflow_state)
+
+
+def cancel_order_timesheets(orders):
+    """
+        Cancel every Timesheet of `orders`. Drafts are closed with set-based updates;
+        submitted Timesheets need a real cancel and are cancelled by a background job.
+        Returns the Timesheets found.
+    """
+    timesheets = get_order_timesheets(orders)
+    if not timesheets:
+        return timesheets
+
+    drafts = [ts.name for ts in timesheets if ts.docstatus == 0]
+    submitted = [ts.name for ts in timesheets if ts.docstatus == 1]
+
+    # a draft has nothing to reverse, so it is marked cancelled without loading it
+    for chunk in chunked(drafts):
+        frappe.db.set_value("Timesheet", {"name": ["in", chunk]}, {"docstatus": 2, "workflow_state": "Cancelled"})
+    set_timesheet_workflow_state([ts.name for ts in timesheets if ts.docstatus == 2], "Cancelled")
+
+    if submitted:
+        frappe.enqueue(
+            "gke_customization.gke_order_forms.timesheet_state.cancel_submitted_timesheets",
+            queue="long",
+            timeout=3600,
+            names=submitted,
+            enqueue_after_commit=True,
+        )
+
+    return timesheets
+
+
+def cancel_submitted_timesheets(names):
+    """Background job; each cancel runs in a savepoint and the batch is committed once"""
+    cancelled = []
+    for name in names:
+        frappe.db.savepoint("cancel_timesheet")
+        try:
+            doc = frappe.get_doc("Timesheet", name)
+            if doc.docstatus == 1:
+                doc.cancel()
+            cancelled.append(name)
+        except Exception:
+            frappe.db.rollback(save_point="cancel_timesheet")
+            frappe.log_error(frappe.get_traceback(), f"Timesheet Cancel: {name}")
+
+    set_timesheet_workflow_state(cancelled, "Cancelled")
+    frappe.db.commit()
@@ -0,0 +1,142 @@
+import json
+from bisect import bisect_right
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+
+# a price list row is identified by these fields plus its band
+PRICE_KEY_FIELDS = ["customer", "price_list", "diamond_type", "stone_shape", "diamond_quality"]
+
+PRICE_FIELDS = ["name", "rate", "handling_rate"]
+
+PRICE_INDEX_VERSION_KEY = "gke_diamond_price_index_version"
+
+# site -> (version, DiamondPriceIndex), built once per worker and version
+_indexes = {}
+
+
+def size_key(value):
+    # size_in_mm is compared as a number when it is one, "1.10" and "1.1" are the same size
+    try:
+        return round(float(value), 3)
+    except (TypeError, ValueError):
+        return value
+
+
+class PriceBands:
+    """Weight bands of one price key, sorted by from_weight for a bisect lookup"""
+
+    def __init__(self):
+        self.bands = {}
+
+    def add(self, row):
+        # a later effective_from replaces an earlier row of the same band
+        self.bands[(flt(row.from_weight), flt(row.to_weight))] = row
+
+    def freeze(self):
+        bands = sorted(self.bands.items())
+        self.from_weights = [from_weight for (from_weight, to_weight), row in bands]
+        self.to_weights = [to_weight for (from_weight, to_weight), row in bands]
+        self.rows = [row for band, row in bands]
+        del self.bands
+
+    def find(self, weight):
+        position = bisect_right(self.from_weights, weight) - 1
+        if position >= 0 and weight <= self.to_weights[position]:
+            return self.rows[position]
+
+
+class DiamondPriceIndex:
+    """
+        Diamond Price List rows grouped by (customer, price_list, diamond_type, stone_shape,
+        diamond_quality). Weight bands are searched by bisection, sieve size ranges and
+        sizes in mm are exact dictionary lookups.
+    """
+
+    def __init__(self, rows):
+        self.weights = {}
+        self.sieve_size_ranges = {}
+        self.sizes_in_mm = {}
+
+        for row in rows:
+            key = tuple(row[field] for field in PRICE_KEY_FIELDS)
+            price = frappe._dict({field: row[field] for field in PRICE_FIELDS})
+
+            if row.price_list_type == "Sieve Size Range":
+                self.sieve_size_ranges.setdefault(key, {})[row.sieve_size_range] = price
+            elif row.price_list_type == "Size (in mm)":
+                self.sizes_in_mm.setdefault(key, {})[size_key(row.size_in_mm)] = price
+            else:
+                price.from_weight, price.to_weight = row.from_weight, row.to_weight
+                self.weights.setdefault(key, PriceBands()).add(price)
+
+        for bands in self.weights.values():
+            bands.freeze()
+
+    def lookup(self, query):
+        """
+            Price row for a query holding the PRICE_KEY_FIELDS and one of
+            `weight` (per stone, in cts), `sieve_size_range` or `size_in_mm`
+        """
+        key = tuple(query.get(field) for field in PRICE_KEY_FIELDS)
+
+        if query.get("sieve_size_range"):
+            return self.sieve_size_ranges.get(key, {}).get(query["sieve_size_range"])
+
+        if query.get("size_in_mm"):
+            return self.sizes_in_mm.get(key, {}).get(size_key(query["size_in_mm"]))
+
+        if query.get("weight") is not None and key in self.weights:
+            return self.weights[key].find(flt(query["weight"]))
+
+
+def get_diamond_price_index():
+    version = frappe.cache().get_value(PRICE_INDEX_VERSION_KEY) or 0
+
+    cached = _indexes.get(frappe.local.site)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    rows = frappe.get_all(
+        "Diamond Price List",
+        fields=[
+            *PRICE_KEY_FIELDS, *PRICE_FIELDS, "price_list_type",
+            "from_weight", "to_weight", "sieve_size_range", "size_in_mm",
+        ],
+        order_by="effective_from asc, creation asc",
+    )
+    index = DiamondPriceIndex(rows)
+    _indexes[frappe.local.site] = (version, index)
+
+    return index
+
+
+def clear_diamond_price_index(doc=None, method=None):
+    # bumped once the rows are committed, so no worker rebuilds the new version from old rows
+    frappe.db.after_commit.add(bump_price_index_version)
+
+
+def bump_price_index_version():
+    frappe.cache().set_value(PRICE_INDEX_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def get_rate(query):
+    return get_diamond_price_index().lookup(frappe._dict(query))
+
+
+@frappe.whitelist()
+def get_diamond_rates(queries):
+    """
+        Batch rate lookup. `queries` is a JSON list of
+        {customer, price_list, diamond_type, stone_shape, diamond_quality,
+        weight | sieve_size_range | size_in_mm}.
+        Returns a list in the same order with {name, rate, handling_rate} or None when no band matches.
+    """
+    if isinstance(queries, str):
+        queries = json.loads(queries)
+    if not isinstance(queries, list):
+        frappe.throw(_("queries must be a list"))
+
+    index = get_diamond_price_index()
+    return [index.lookup(frappe._dict(query)) for query in queries]
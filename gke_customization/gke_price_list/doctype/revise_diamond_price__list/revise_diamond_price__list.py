@@ -3,6 +3,7 @@
 
 import frappe
 from frappe.model.document import Document
+from gke_customization.gke_price_list.diamond_price_index import clear_diamond_price_index
 
 class ReviseDiamondPriceList(Document):
     def before_save(self):
@@ -85,6 +86,7 @@ class ReviseDiamondPriceList(Document):
             frappe.db.set_value('Diamond Price List',i.diamond_price_list,{'rate':i.revised_rate,'effective_from':self.date,'supplier_fg_purchase_rate':i.supplier_fg_purchase_rate})
             if not i.diamond_price_list:
                 crate_price_list(self,i)
+        clear_diamond_price_index()
         frappe.msgprint("Price List Updated")
 
 def crate_price_list(self,row):
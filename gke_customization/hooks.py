@@ -147,7 +147,8 @@ scheduler_events = {
         "gke_customization.gke_hrms.utils.check_sadwitch_rule",
         "gke_customization.gke_hrms.doc_events.leave_allocation.get_earned_leave_allocation",
         "gke_customization.gke_hrms.doc_events.leave_allocation.infirmary_leave_allocation",
-        "gke_customization.gke_hrms.doc_events.leave_allocation.compOff_leave_allocation"    
+        "gke_customization.gke_hrms.doc_events.leave_allocation.compOff_leave_allocation",
+        "gke_customization.gke_catalog.doctype.catalogue_counter.catalogue_counter.reconcile_catalogue_counters",
     ],
     "cron": {
         "0 6 * * *": [
@@ -274,9 +275,6 @@ doc_events = {
 "Journal Entry": {
     "on_submit": "gke_customization.gke_order_forms.doc_events.journal_entry.on_submit"
 },
-# "Item": {
-#     "before_validate": "gke_customization.gke_order_forms.doc_events.item.before_validate"
-# },
 # "Department IR": {
 #     "autoname": "gke_customization.gke_order_forms.doc_events.department_ir.autoname"
 # },
@@ -288,12 +286,27 @@ doc_events = {
 },
 "Sales Order":{
     "validate":"gke_customization.gke_customization.doc_events.sales_order.validate",
+    "on_update": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_cancel": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_update_after_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_trash": "gke_customization.gke_catalog.api.documents.clear_document_version",
 },
 "Sales Invoice":{
     "validate":"gke_customization.gke_customization.doc_events.sales_invoice.validate",
+    "on_update": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_cancel": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_update_after_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_trash": "gke_customization.gke_catalog.api.documents.clear_document_version",
 },
 "Delivery Note":{
     "validate":"gke_customization.gke_customization.doc_events.delivery_note.validate",
+    "on_update": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_cancel": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_update_after_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_trash": "gke_customization.gke_catalog.api.documents.clear_document_version",
 },
 "Batch": {
     "autoname": "jewellery_erpnext.jewellery_erpnext.customization.batch.batch.autoname",
@@ -304,6 +317,82 @@ doc_events = {
     "on_update": "gke_customization.gke_order_forms.doc_events.timesheet.on_update"
     
 },
+"Item": {
+    "on_update": [
+        "gke_customization.gke_catalog.doc_events.catalogue.on_item_update",
+        "gke_customization.gke_catalog.api.documents.clear_document_version",
+        "gke_customization.gke_order_forms.doc_events.item.on_update",
+        "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_item",
+        "gke_customization.gke_order_forms.doctype.item_reference_membership.item_reference_membership.update_reference_groups",
+    ],
+    "on_trash": [
+        "gke_customization.gke_catalog.doc_events.catalogue.on_item_trash",
+        "gke_customization.gke_catalog.api.documents.clear_document_version",
+        "gke_customization.gke_order_forms.doc_events.item.on_trash",
+        "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_item",
+        "gke_customization.gke_order_forms.doctype.item_reference_membership.item_reference_membership.remove_from_reference_groups",
+    ],
+    "after_delete": "gke_customization.gke_catalog.doc_events.catalogue.on_item_after_delete",
+},
+"BOM": {
+    "on_update": "gke_customization.gke_catalog.doc_events.catalogue.on_bom_update",
+    "on_cancel": "gke_customization.gke_catalog.doc_events.catalogue.on_bom_update",
+    "on_update_after_submit": "gke_customization.gke_catalog.doc_events.catalogue.on_bom_update",
+    "on_trash": "gke_customization.gke_catalog.doc_events.catalogue.on_bom_trash",
+    "after_delete": "gke_customization.gke_catalog.doc_events.catalogue.on_bom_after_delete",
+},
+"Attribute Value": {
+    "on_update": "gke_customization.gke_catalog.doc_events.attribute_value.on_update",
+    "on_trash": "gke_customization.gke_catalog.doc_events.attribute_value.on_trash",
+},
+"Item Attribute": {
+    "on_update": "gke_customization.gke_order_forms.attribute_domains.clear_attribute_domains",
+    "on_trash": "gke_customization.gke_order_forms.attribute_domains.clear_attribute_domains",
+},
+"GC Ratio Master": {
+    "on_update": "gke_customization.gke_order_forms.gc_rating.clear_rating_bands",
+},
+"Customer Attributes": {
+    "on_update": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_customer_attributes",
+    "on_trash": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_customer_attributes",
+},
+"Customer Design Information Sheet": {
+    "on_update": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_design_sheet",
+    "on_trash": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_design_sheet",
+},
+"Titan Size Master": {
+    "on_update": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_size_master",
+    "on_trash": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_size_master",
+},
+"Reliance Size Master": {
+    "on_update": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_size_master",
+    "on_trash": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_size_master",
+},
+"Novel Size Master": {
+    "on_update": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_size_master",
+    "on_trash": "gke_customization.gke_order_forms.customer_code_decoder.clear_decoder_for_size_master",
+},
+"File": {
+    "after_insert": "gke_customization.gke_catalog.doc_events.file.after_insert",
+},
+"Order": {
+    "on_update": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_cancel": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_update_after_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_trash": "gke_customization.gke_catalog.api.documents.clear_document_version",
+},
+"Sketch Order": {
+    "on_update": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_cancel": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_update_after_submit": "gke_customization.gke_catalog.api.documents.clear_document_version",
+    "on_trash": "gke_customization.gke_catalog.api.documents.clear_document_version",
+},
+"Diamond Price List": {
+    "on_update": "gke_customization.gke_price_list.diamond_price_index.clear_diamond_price_index",
+    "on_trash": "gke_customization.gke_price_list.diamond_price_index.clear_diamond_price_index",
+},
 # "Stock Entry": {
 #     "before_validate": "gke_customization.gke_order_forms.doc_events.stock_entry.before_validate",
 # }
@@ -0,0 +1,45 @@
+import json
+
+import frappe
+from gke_customization.gke_order_forms.doctype.order_workflow_transition.order_workflow_transition import insert_transitions
+
+BATCH_SIZE = 5000
+
+
+def execute():
+	"""Rebuild the Order workflow history from Version, one keyset batch at a time"""
+	frappe.reload_doc("gke_order_forms", "doctype", "order_workflow_transition")
+	frappe.db.delete("Order Workflow Transition", {"version": ["is", "set"]})
+
+	last_creation, last_name = "1900-01-01", ""
+	while True:
+		versions = frappe.db.sql(
+			"""
+			SELECT name, docname, data, owner, creation
+			FROM `tabVersion`
+			WHERE ref_doctype = 'Order'
+				AND data LIKE '%%workflow_state%%'
+				AND (creation > %(creation)s OR (creation = %(creation)s AND name > %(name)s))
+			ORDER BY creation, name
+			LIMIT %(limit)s
+			""",
+			{"creation": last_creation, "name": last_name, "limit": BATCH_SIZE},
+			as_dict=True,
+		)
+		if not versions:
+			break
+
+		rows = []
+		for version in versions:
+			try:
+				changed = json.loads(version.data).get("changed") or []
+			except Exception:
+				continue
+
+			for change in changed:
+				if len(change) >= 3 and change[0] == "workflow_state" and change[2] and change[1] != change[2]:
+					rows.append((version.docname, change[1], change[2], version.owner, version.creation, version.name))
+
+		insert_transitions(rows)
+		frappe.db.commit()
+		last_creation, last_name = versions[-1].creation, versions[-1].name
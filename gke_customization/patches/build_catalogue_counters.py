@@ -0,0 +1,7 @@
+import frappe
+from gke_customization.gke_catalog.doctype.catalogue_counter.catalogue_counter import rebuild_catalogue_counters
+
+
+def execute():
+	frappe.reload_doc("gke_catalog", "doctype", "catalogue_counter")
+	rebuild_catalogue_counters()
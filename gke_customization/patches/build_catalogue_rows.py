@@ -0,0 +1,7 @@
+import frappe
+from gke_customization.gke_catalog.doctype.catalogue_row.catalogue_row import rebuild_catalogue_rows
+
+
+def execute():
+	frappe.reload_doc("gke_catalog", "doctype", "catalogue_row")
+	rebuild_catalogue_rows()
@@ -0,0 +1,7 @@
+import frappe
+from gke_customization.gke_order_forms.doctype.item_reference_membership.item_reference_membership import rebuild_reference_groups
+
+
+def execute():
+	frappe.reload_doc("gke_order_forms", "doctype", "item_reference_membership")
+	rebuild_reference_groups()
@@ -0,0 +1,7 @@
+import frappe
+from gke_customization.gke_order_forms.doctype.variant_signature.variant_signature import rebuild_variant_signatures
+
+
+def execute():
+	frappe.reload_doc("gke_order_forms", "doctype", "variant_signature")
+	rebuild_variant_signatures()
@@ -0,0 +1,5 @@
+from gke_customization.gke_custom_export.doctype.solitaire_calculator.solitaire_calculator import seed_sequence_series
+
+
+def execute():
+	seed_sequence_series()
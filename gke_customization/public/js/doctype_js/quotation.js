@@ -1,4 +1,17 @@
 frappe.ui.form.on('Quotation', {
+    onload(frm) {
+        // large Order selections are saved by a background job (make_quotation_batch),
+        // which leaves this form on the snapshot it was sent
+        frappe.realtime.off("quotation_batch_saved");
+        frappe.realtime.on("quotation_batch_saved", function (data) {
+            if (!cur_frm || cur_frm.doctype !== "Quotation" || cur_frm.doc.name !== data.source) return;
+            if (cur_frm.is_new()) {
+                frappe.set_route("Form", "Quotation", data.name);
+            } else {
+                cur_frm.reload_doc();
+            }
+        });
+    },
     refresh(frm) {
         frm.add_custom_button(__("Order"), function () {
             let dialog = new frappe.ui.form.MultiSelectDialog({